@@ -0,0 +1,338 @@
+import argparse
+import json
+import platform
+import zipfile
+from functools import partial
+from pathlib import Path
+
+import pytest
+from _pytest.reports import TestReport
+from pytest_fold.spill import SPILLFILE, SpillReader
+from pytest_fold.utils import MARKERS, SectionInfo, artifact_paths, merge_reports
+from pytest_fold.warningsummary import WARNINGSFILE
+
+# Version of the bundle layout below, checked when opening a bundle
+BUNDLE_FORMAT = 2
+
+# Tests per member of a bundle: reading one test decompresses its member's tests
+# too, but compressing tests together makes for much smaller bundles, and reading
+# every test goes through far fewer members
+TESTS_PER_MEMBER = 250
+
+# Members of a bundle, a zip file, each compressed on its own:
+#   manifest.json            format, run id, versions, and the members below
+#   output/unmarked.txt      the console output
+#   output/marked-<N>.txt    the marked console output, a member per section,
+#                            each starting with its marker (the first has none)
+#   tests/<N>.json           tests N * TESTS_PER_MEMBER onwards: each test's phase
+#                            reports, as pytest serializes them for pytest-xdist
+#                            rather than as pickles, with the fields all phases
+#                            share (SHARED) stored once per test, and without
+#                            their tracebacks and captured output (DEFERRED)
+#   tests/<N>-output.json    the same tests' phases' DEFERRED fields
+#   warnings.json            the run's aggregated warnings, if any
+#   spill.bin                captured output over --fold-capture-budget, if any
+MANIFEST = "manifest.json"
+UNMARKED = "output/unmarked.txt"
+
+# Report attributes every phase of a test has the same value of
+SHARED = ("nodeid", "location", "keywords")
+
+# Report attributes stored apart from the rest, as they make up most of a bundle
+# and are only needed to show a test (see BundledReport)
+DEFERRED = ("longrepr", "sections")
+
+# Report attributes left out of a bundle: xdist's WorkerController, and cProfile
+# stats (marshalled, so tied to the Python version that wrote them)
+_UNBUNDLED = ("node", "pyfold_cprofile")
+
+
+def _marked_chunks(marked_file: Path):
+    """(section name, text) of the marked output file, split before each marker"""
+    markers = {marker: name for name, marker in MARKERS.items()}
+    name, lines = "", []
+    with open(marked_file, encoding="utf-8", errors="replace") as marked:
+        for line in marked:
+            if line.strip() in markers:
+                yield name, "".join(lines)
+                name, lines = markers[line.strip()], []
+            lines.append(line)
+    yield name, "".join(lines)
+
+
+def _test_data(phases: dict) -> tuple:
+    """A test's phase reports as stored in a bundle, and their DEFERRED fields"""
+    phase_data, phase_output = [], []
+    for report in phases.values():
+        data = report._to_json()
+        for name in _UNBUNDLED + SHARED:
+            data.pop(name, None)
+        phase_output.append({name: data.pop(name) for name in DEFERRED})
+        phase_data.append(data)
+    report = next(iter(phases.values()))
+    test = {name: getattr(report, name) for name in SHARED}
+    test["phases"] = phase_data
+    return test, phase_output
+
+
+class _Deferred:
+    """A BundledReport attribute read from the bundle when first used"""
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+
+    def __get__(self, report, owner=None):
+        if report is None:
+            return self
+        if self.name not in report.__dict__:
+            report.__dict__.update(report._pyfold_read_output())
+        return report.__dict__[self.name]
+
+    def __set__(self, report, value) -> None:
+        report.__dict__[self.name] = value
+
+
+class BundledReport(TestReport):
+    """
+    A phase report read from a bundle. Its DEFERRED attributes (the phase's
+    traceback and captured output) are read from the bundle when first used, so
+    opening a bundle decompresses only the tests' outcomes, durations and the like.
+    """
+
+    longrepr = _Deferred()
+    sections = _Deferred()
+
+
+def _phase_output(output: dict) -> dict:
+    """A phase report's DEFERRED attributes, from their data in a bundle"""
+    # Only longrepr needs deserializing; the other fields just make up a report
+    report = TestReport._from_json(
+        {
+            "nodeid": "",
+            "location": None,
+            "keywords": {},
+            "outcome": "passed",
+            "when": "call",
+            **output,
+        }
+    )
+    deferred = {name: getattr(report, name) for name in DEFERRED}
+    # Tuples come back from JSON as lists: a skip's (path, lineno, reason), and
+    # each section's (title, content)
+    if isinstance(deferred["longrepr"], list):
+        deferred["longrepr"] = tuple(deferred["longrepr"])
+    deferred["sections"] = [tuple(section) for section in deferred["sections"]]
+    return deferred
+
+
+def _test_reports(test: dict, read_output) -> list:
+    """
+    A test's phase reports, from their data in a bundle; 'read_output(phase)'
+    reads the DEFERRED data of its 'phase'th phase
+    """
+    shared = {name: test[name] for name in SHARED}
+    reports = []
+    for phase, data in enumerate(test["phases"]):
+        report = BundledReport._from_json(
+            {
+                **data,
+                **shared,
+                "keywords": dict(test["keywords"]),
+                "longrepr": None,
+                "sections": [],
+            }
+        )
+        for name in DEFERRED:
+            del report.__dict__[name]
+        report._pyfold_read_output = partial(read_output, phase)
+        reports.append(report)
+    return reports
+
+
+class BundledSection(SectionInfo):
+    """A section of a bundled run's marked output, read when first used"""
+
+    def __init__(self, section: SectionInfo, read) -> None:
+        super().__init__(
+            name=section.name,
+            label=section.label,
+            matcher=section.matcher,
+            outcome=section.outcome,
+        )
+        self._read = read
+        self._content = None
+
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            self._content = self._read()
+        return self._content
+
+    @content.setter
+    def content(self, content: str) -> None:
+        self._content = content
+
+
+def write_bundle(path: Path, run_dir: Path, reports: list) -> None:
+    """
+    Write a finished run (its directory's artifacts and its reports) to bundle
+    'path', member by member, so it is never held in memory as a whole
+    """
+    _, marked_file, unmarked_file = artifact_paths(run_dir)
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "run": run_dir.name,
+        "pytest": pytest.__version__,
+        "python": platform.python_version(),
+        "sections": [],  # [section name, member]
+        "tests": 0,
+        "tests_per_member": TESTS_PER_MEMBER,
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as bundle:
+        bundle.write(unmarked_file, UNMARKED)
+        for number, (name, text) in enumerate(_marked_chunks(marked_file)):
+            member = f"output/marked-{number}.txt"
+            bundle.writestr(member, text)
+            manifest["sections"].append([name, member])
+        tests = list(merge_reports(reports).values())
+        for start in range(0, len(tests), TESTS_PER_MEMBER):
+            serialized, output = zip(
+                *(
+                    _test_data(phases)
+                    for phases in tests[start : start + TESTS_PER_MEMBER]
+                )
+            )
+            member = start // TESTS_PER_MEMBER
+            bundle.writestr(
+                f"tests/{member}.json", json.dumps(serialized, default=repr)
+            )
+            bundle.writestr(
+                f"tests/{member}-output.json", json.dumps(output, default=repr)
+            )
+        manifest["tests"] = len(tests)
+        for name in (WARNINGSFILE, SPILLFILE):
+            if (run_dir / name).exists():
+                bundle.write(run_dir / name, name)
+        bundle.writestr(MANIFEST, json.dumps(manifest))
+
+
+class RunBundle:
+    """
+    A run read from a bundle written with --fold-bundle, for the TUIs' --bundle
+    option. Opening it reads only the zip file's directory and the manifest; each
+    section of the output and each test's reports are decompressed when asked for,
+    and the tests' tracebacks and captured output when first used.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.zip = zipfile.ZipFile(self.path)
+        try:
+            self.manifest = json.loads(self.zip.read(MANIFEST))
+        except KeyError:
+            raise ValueError(f"{path} is not a pytest-fold bundle") from None
+        if self.manifest.get("format") != BUNDLE_FORMAT:
+            raise ValueError(
+                f"{path} has bundle format {self.manifest.get('format')}, "
+                f"this version of pytest-fold reads format {BUNDLE_FORMAT}"
+            )
+        self.run_id = self.manifest["run"]
+        self.tests_per_member = self.manifest["tests_per_member"]
+        # The output member last read, as a test's neighbours are often shown next
+        self._output = (None, None)
+
+    def __len__(self) -> int:
+        return self.manifest["tests"]
+
+    def _text(self, member: str) -> str:
+        return self.zip.read(member).decode("utf-8", errors="replace")
+
+    def unmarked_output(self) -> str:
+        return self._text(UNMARKED)
+
+    def section(self, name: str) -> str:
+        """
+        The marked output of one section (a key of MARKERS), marker included; ''
+        if the run's output had no such section
+        """
+        for section, member in self.manifest["sections"]:
+            if section == name:
+                return self._text(member)
+        return ""
+
+    def sections(self, sections: dict) -> dict:
+        """
+        Results' sections ({name: SectionInfo}), each reading its content from its
+        member (marker excluded) when first used
+        """
+        return {
+            name: BundledSection(section, partial(self._section_content, name))
+            for name, section in sections.items()
+        }
+
+    def _section_content(self, name: str) -> str:
+        if name == "LAST_LINE":
+            # The last line of the marked output
+            sections = self.manifest["sections"]
+            lines = self._text(sections[-1][1]).splitlines(keepends=True)
+            return lines[-1] if lines else ""
+        # As in MarkedSections, a section runs on to the next section's marker,
+        # which the last line's marker is not
+        marker_name = f"pytest_fold_{name.lower()}"
+        texts = []
+        for section, member in self.manifest["sections"]:
+            if texts and section != "pytest_fold_last_line":
+                break
+            if texts or section == marker_name:
+                texts.append(self._text(member))
+        return "".join(texts).partition("\n")[2]
+
+    def _member_tests(self, member: int) -> list:
+        return json.loads(self.zip.read(f"tests/{member}.json"))
+
+    def _phase_output(self, number: int, phase: int) -> dict:
+        """The DEFERRED attributes of the 'number'th test's 'phase'th phase"""
+        member, offset = divmod(number, self.tests_per_member)
+        if self._output[0] != member:
+            output = json.loads(self.zip.read(f"tests/{member}-output.json"))
+            self._output = (member, output)
+        return _phase_output(self._output[1][offset][phase])
+
+    def test_reports(self, number: int) -> list:
+        """The phase reports of the bundle's 'number'th test"""
+        member, offset = divmod(number, self.tests_per_member)
+        return _test_reports(
+            self._member_tests(member)[offset], partial(self._phase_output, number)
+        )
+
+    def reports(self):
+        """Every test's phase reports, a member's tests at a time"""
+        members = -(-len(self) // self.tests_per_member)
+        for member in range(members):
+            for offset, test in enumerate(self._member_tests(member)):
+                number = member * self.tests_per_member + offset
+                yield from _test_reports(test, partial(self._phase_output, number))
+
+    def spill_reader(self) -> SpillReader:
+        """A reader of the run's spilled captured output (see spill.py), or None"""
+        if SPILLFILE not in self.zip.namelist():
+            return None
+        return SpillReader(lambda: self.zip.open(SPILLFILE))
+
+    def warnings(self) -> dict:
+        """The run's aggregated warnings (see warningsummary.py), or None"""
+        try:
+            return json.loads(self.zip.read(WARNINGSFILE))
+        except KeyError:
+            return None
+
+
+def bundle_from_args(parser: argparse.ArgumentParser, args) -> RunBundle:
+    """Open the bundle given with the TUIs' --bundle option, or None"""
+    if not args.bundle:
+        return None
+    try:
+        return RunBundle(args.bundle)
+    except (OSError, ValueError, zipfile.BadZipFile) as error:
+        parser.error(f"cannot open bundle: {error}")
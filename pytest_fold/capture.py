@@ -0,0 +1,200 @@
+import queue
+import re
+import tempfile
+import threading
+import time
+
+from _pytest._io.terminalwriter import TerminalWriter
+from pytest_fold.profiling import profiler
+from pytest_fold.utils import (
+    test_session_starts_matcher,
+    errors_section_matcher,
+    failures_section_matcher,
+    warnings_summary_matcher,
+    passes_section_matcher,
+    short_test_summary_matcher,
+    lastline_matcher,
+    MARKERS,
+)
+
+# Section matchers checked against every terminal write, paired with the marker
+# line written to the marked output file when a match is found
+SECTION_MATCHERS = (
+    (
+        "test_session_starts",
+        test_session_starts_matcher,
+        MARKERS["pytest_fold_test_session_starts"],
+    ),
+    ("errors_section", errors_section_matcher, MARKERS["pytest_fold_errors_section"]),
+    (
+        "failures_section",
+        failures_section_matcher,
+        MARKERS["pytest_fold_failures_section"],
+    ),
+    (
+        "warnings_summary",
+        warnings_summary_matcher,
+        MARKERS["pytest_fold_warnings_summary"],
+    ),
+    ("passes_section", passes_section_matcher, MARKERS["pytest_fold_passes_section"]),
+    (
+        "short_test_summary",
+        short_test_summary_matcher,
+        MARKERS["pytest_fold_short_test_summary"],
+    ),
+    ("last_line", lastline_matcher, MARKERS["pytest_fold_last_line"]),
+)
+
+# Default number of pending terminal writes the asynchronous capture will hold
+# before the test loop blocks waiting for the writer thread
+DEFAULT_QUEUE_SIZE = 10000
+
+
+class TerminalCapture:
+    """
+    Records everything Pytest writes to the terminal into two temporary files:
+    one with pytest-fold's section markers inserted ('marked'), one without ('unmarked').
+
+    Pytest hands TerminalWriter.write fragments of lines (progress dots, '[ 42%]'
+    suffixes, etc.), so fragments are assembled into complete lines before being
+    classified, and complete lines are written to the files in large batches.
+    """
+
+    # Write batched lines to the temporary files once this many characters are pending
+    chunk_size = 256 * 1024
+
+    def __init__(self) -> None:
+        self.marked_file = tempfile.TemporaryFile("wb+")
+        self.unmarked_file = tempfile.TemporaryFile("wb+")
+        # created once, while Pytest's capture is suspended, so markup is decided by
+        # the real terminal and not re-evaluated on every write
+        self.markup_writer = TerminalWriter()
+
+        # fragments of the line currently being assembled: plain text for the
+        # section matchers, marked-up text for the output files
+        self._line = []
+        self._marked_line = []
+
+        # complete lines waiting to be written
+        self._marked_chunk = []
+        self._unmarked_chunk = []
+        self._pending = 0
+
+    def mark_sections(self, line: str) -> None:
+        """Queue a marker line ahead of any line that opens a results section"""
+        for name, matcher, marker in SECTION_MATCHERS:
+            if profiler.enabled:
+                start = time.perf_counter()
+                matched = re.search(matcher, line)
+                profiler.add(f"tee_write: match {name}", time.perf_counter() - start)
+            else:
+                matched = re.search(matcher, line)
+            if matched:
+                self._marked_chunk.append(marker + "\n")
+
+    def _add_fragment(self, fragment: str, kwargs: dict) -> None:
+        self._line.append(fragment)
+        # Mark up the fragment by passing it to an instance of TerminalWriter's
+        # 'markup' method (a no-op when no markup was requested)
+        self._marked_line.append(
+            self.markup_writer.markup(fragment, **kwargs) if kwargs else fragment
+        )
+
+    def _end_line(self) -> None:
+        """Classify the assembled line and move it to the pending batch"""
+        self.mark_sections("".join(self._line))
+        marked_up = "".join(self._marked_line)
+        self._line = []
+        self._marked_line = []
+
+        # The same marked-up text goes to both files; only the marked file
+        # carries the section marker lines
+        self._marked_chunk.append(marked_up)
+        self._unmarked_chunk.append(marked_up)
+        self._pending += len(marked_up)
+        if self._pending >= self.chunk_size:
+            self.flush()
+
+    def record(self, s: str, kwargs: dict) -> None:
+        """Split one terminal write into line fragments and assemble them"""
+        # Do not pass "flush" to TerminalWriter's 'markup' or it will throw an error.
+        kwargs.pop("flush") if "flush" in kwargs.keys() else None
+
+        *complete, partial = s.split("\n")
+        for fragment in complete:
+            if fragment:
+                self._add_fragment(fragment, kwargs)
+            self._line.append("\n")
+            self._marked_line.append("\n")
+            self._end_line()
+        if partial:
+            self._add_fragment(partial, kwargs)
+
+    def flush(self) -> None:
+        """Write all pending complete lines to the temporary files"""
+        with profiler.timer("tee_write: flush", self._pending):
+            self.marked_file.write("".join(self._marked_chunk).encode("utf-8"))
+            self.unmarked_file.write("".join(self._unmarked_chunk).encode("utf-8"))
+        self._marked_chunk = []
+        self._unmarked_chunk = []
+        self._pending = 0
+
+    def write(self, s: str, **kwargs) -> None:
+        """Entry point called for every terminal write"""
+        self.record(s, kwargs)
+
+    def close(self) -> tuple:
+        """Return (marked, unmarked) output as bytes and release the temporary files"""
+        if self._line:
+            self._end_line()
+        self.flush()
+
+        self.marked_file.seek(0)
+        marked = self.marked_file.read()
+        self.marked_file.close()
+
+        self.unmarked_file.seek(0)
+        unmarked = self.unmarked_file.read()
+        self.unmarked_file.close()
+        return marked, unmarked
+
+
+class AsyncTerminalCapture(TerminalCapture):
+    """
+    TerminalCapture variant that hands each raw (string, kwargs) pair to a bounded
+    queue, so the test loop only pays for a queue put. A writer thread does the
+    classification, markup and batched file writes; 'close' drains the queue.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_QUEUE_SIZE) -> None:
+        super().__init__()
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.error = None
+        self.thread = threading.Thread(
+            target=self._run, name="pytest-fold-writer", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if self.error is not None:
+                # keep consuming so the producer never blocks on a full queue
+                continue
+            try:
+                self.record(*item)
+            except Exception as error:
+                self.error = error
+
+    def write(self, s: str, **kwargs) -> None:
+        self.queue.put((s, kwargs))
+
+    def close(self) -> tuple:
+        with profiler.timer("tee_write: drain"):
+            self.queue.put(None)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+        return super().close()
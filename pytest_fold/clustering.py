@@ -0,0 +1,134 @@
+import hashlib
+import re
+from collections import namedtuple
+
+# Innermost traceback frames that make up a failure's signature
+SIGNATURE_FRAMES = 3
+
+# Temporary directories, and other volatile parts of exception messages, replaced
+# before hashing so that the same root cause hashes the same in every test it breaks
+TEMP_PATH_PATTERNS = (
+    (
+        re.compile(
+            r"(?:/tmp|/var/folders|/private/var|[A-Za-z]:\\[^\s]*\\Temp)[^\s:'\",)\]]*"
+        ),
+        "<tmp>",
+    ),
+    (re.compile(r"pytest-of-[^\s/\\]+[/\\]pytest-\d+[^\s:'\",)\]]*"), "<tmp>"),
+)
+VOLATILE_PATTERNS = TEMP_PATH_PATTERNS + (
+    (re.compile(r"0x[0-9a-fA-F]+"), "<addr>"),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "<str>"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "<n>"),
+)
+
+# 'path:lineno' or 'path:lineno: ExceptionType' lines of a plain-text traceback
+location_matcher = re.compile(r"^(\S+?):(\d+)(?:: (\w[\w.]*))?$", re.MULTILINE)
+
+# A root cause and the (nodeid, failed report) of each test it broke
+Cluster = namedtuple("Cluster", "key exception location message tests")
+
+
+def normalize(text: str, patterns: tuple = VOLATILE_PATTERNS) -> str:
+    """Replace temp paths, addresses, quoted strings and numbers with placeholders"""
+    for pattern, placeholder in patterns:
+        text = pattern.sub(placeholder, text)
+    return text
+
+
+def failing_report(phases: dict):
+    """The report of the phase that failed, or None"""
+    return next((report for report in phases.values() if report.failed), None)
+
+
+def failure_signature(report, frames: int = SIGNATURE_FRAMES) -> tuple:
+    """
+    (exception type, innermost location, normalized message, [innermost frames]) of a
+    failed report, from its structured traceback when it has one (also for chained
+    exceptions, whose last traceback is the one raised), or parsed from its text
+    """
+    reprtraceback = getattr(report.longrepr, "reprtraceback", None)
+    entries = getattr(reprtraceback, "reprentries", None)
+    if entries:
+        locations = [
+            (entry.reprfileloc.path, entry.reprfileloc.lineno)
+            for entry in entries
+            if getattr(entry, "reprfileloc", None)
+        ]
+        last = entries[-1]
+        exception = getattr(getattr(last, "reprfileloc", None), "message", "")
+        lines = getattr(last, "lines", ())
+    else:
+        text = report.longreprtext
+        found = location_matcher.findall(text)
+        locations = [(path, int(lineno)) for path, lineno, _ in found]
+        exception = found[-1][2] if found else ""
+        lines = text.splitlines()
+    message = next(
+        (line[1:].strip() for line in lines if line.startswith("E ")),
+        "",
+    )
+    locations = [
+        (normalize(path, TEMP_PATH_PATTERNS), lineno)
+        for path, lineno in locations[-frames:]
+    ]
+    location = "%s:%s" % locations[-1] if locations else ""
+    return exception, location, normalize(message), locations
+
+
+def signature_key(signature: tuple) -> str:
+    exception, _, message, locations = signature
+    data = "\0".join([exception, message] + ["%s:%s" % loc for loc in locations])
+    return hashlib.sha1(data.encode("utf-8", "replace")).hexdigest()[:12]
+
+
+class FailureClusters:
+    """
+    Groups failed and errored tests by root cause: tests whose innermost traceback
+    frames, exception type and normalized exception message match share a cluster.
+    One pass over the failures, so it scales linearly with their number.
+    """
+
+    def __init__(self, reports_by_nodeid: dict) -> None:
+        self.clusters = {}
+        for nodeid, phases in reports_by_nodeid.items():
+            report = failing_report(phases)
+            if report is None:
+                continue
+            signature = failure_signature(report)
+            key = signature_key(signature)
+            cluster = self.clusters.get(key)
+            if cluster is None:
+                exception, location, message, _ = signature
+                cluster = self.clusters[key] = Cluster(
+                    key, exception, location, message, []
+                )
+            cluster.tests.append((nodeid, report))
+
+    def by_size(self) -> list:
+        """Clusters, largest first"""
+        return sorted(
+            self.clusters.values(), key=lambda cluster: len(cluster.tests), reverse=True
+        )
+
+    def views(self) -> dict:
+        """{cluster label: its signature, one example traceback and its tests}"""
+        views = {}
+        for cluster in self.by_size():
+            label = f"{len(cluster.tests)} x {cluster.exception or 'failure'}"
+            if cluster.location:
+                label += f" at {cluster.location}"
+            label += f" [{cluster.key[:6]}]"
+            example_nodeid, example = cluster.tests[0]
+            views[label] = "\n".join(
+                [
+                    f"{len(cluster.tests)} tests failed with:",
+                    f"  {cluster.message or cluster.exception}",
+                    "",
+                    *(f"  {nodeid}" for nodeid, _ in cluster.tests),
+                    "",
+                    f"Example: {example_nodeid}",
+                    example.longreprtext,
+                ]
+            )
+        return views
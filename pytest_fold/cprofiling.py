@@ -0,0 +1,160 @@
+import argparse
+import cProfile
+import heapq
+import io
+import marshal
+import pstats
+from collections.abc import Mapping
+from pathlib import Path
+
+from _pytest.mark import KeywordMatcher
+from _pytest.mark.expression import Expression
+
+# Subdirectory of a run's directory holding the profiled tests' pstats files
+CPROFILEDIR = "cprofile"
+
+# Sort orders offered for each profiled test, and how many functions to list
+SORT_KEYS = ("cumulative", "tottime")
+STATS_LINES = 40
+
+
+def parse_cprofile_spec(spec: str) -> tuple:
+    """
+    Parse a '--fold-cprofile' value into ("slowest", N), ("keyword", Expression)
+    or ("all", None):
+        slowest:N   keep the profiles of the N slowest calls
+        -k-style keyword expression, e.g. 'slow and not network'
+        all         keep every test's profile
+    """
+    if spec == "all":
+        return "all", None
+    if spec.startswith("slowest:"):
+        try:
+            count = int(spec.split(":", 1)[1])
+        except ValueError:
+            count = 0
+        if count <= 0:
+            raise argparse.ArgumentTypeError(f"expected 'slowest:N' with N > 0: {spec}")
+        return "slowest", count
+    try:
+        return "keyword", Expression.compile(spec)
+    except Exception as error:
+        raise argparse.ArgumentTypeError(
+            f"invalid keyword expression '{spec}': {error}"
+        ) from error
+
+
+class CallProfiler:
+    """
+    Runs selected tests' call phase under cProfile and returns the collected stats
+    (in pstats' marshalled dump format) for attaching to the call report.
+
+    With 'slowest:N', every call is profiled but this process only hands back
+    profiles that are among the N slowest it has seen so far; the controller makes
+    the final selection across processes (see 'write_profiles').
+    """
+
+    def __init__(self, spec: tuple) -> None:
+        self.mode, self.arg = spec
+        self._slowest = []  # min-heap of the N slowest call durations seen
+
+    def wants(self, item) -> bool:
+        if self.mode == "keyword":
+            return self.arg.evaluate(KeywordMatcher.from_item(item))
+        return True
+
+    def start(self) -> cProfile.Profile:
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def stop(self, profile: cProfile.Profile, seconds: float) -> bytes:
+        """Stop profiling; the marshalled stats, or None if the call is not kept"""
+        profile.disable()
+        if self.mode == "slowest":
+            if len(self._slowest) < self.arg:
+                heapq.heappush(self._slowest, seconds)
+            elif seconds > self._slowest[0]:
+                heapq.heapreplace(self._slowest, seconds)
+            else:
+                return None
+        profile.create_stats()
+        return marshal.dumps(profile.stats)
+
+
+def write_profiles(reports: list, run_dir: Path, spec: tuple) -> int:
+    """
+    Write the kept profiles carried by the call reports to '<run_dir>/cprofile/' as
+    pstats files, recording each file's name on its report in place of the stats.
+    Returns the number of files written.
+    """
+    profiled = {}
+    for report in reports:
+        stats = report.__dict__.pop("pyfold_cprofile", None)
+        if stats is not None:
+            profiled[report.nodeid] = (report, stats)
+    kept = profiled.values()
+    if spec[0] == "slowest":
+        kept = heapq.nlargest(spec[1], kept, key=lambda item: item[0].duration)
+
+    profile_dir = run_dir / CPROFILEDIR
+    for index, (report, stats) in enumerate(kept):
+        profile_dir.mkdir(exist_ok=True)
+        filename = f"{index:05d}.prof"
+        (profile_dir / filename).write_bytes(stats)
+        report.pyfold_cprofile_file = filename
+    return len(kept)
+
+
+def format_stats(path: Path, sort: str, lines: int = STATS_LINES) -> str:
+    """A pstats listing of the profile at 'path', sorted by 'sort'"""
+    stream = io.StringIO()
+    stats = pstats.Stats(str(path), stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(lines)
+    return stream.getvalue()
+
+
+class CallProfiles(Mapping):
+    """
+    The profiled tests of a run, as {'<nodeid> [<sort>]': pstats listing} for the
+    TUIs' view lists. Listings are rendered from the pstats files when first looked
+    up, so opening a run with many profiles stays cheap.
+    """
+
+    def __init__(self, reports_by_nodeid: dict, run_dir: Path = None) -> None:
+        self.paths = {}
+        self._rendered = {}
+        if run_dir is None:
+            return
+        for nodeid, phases in reports_by_nodeid.items():
+            filename = getattr(phases.get("call"), "pyfold_cprofile_file", None)
+            if filename:
+                for sort in SORT_KEYS:
+                    self.paths[f"{nodeid} [{sort}]"] = (
+                        run_dir / CPROFILEDIR / filename,
+                        sort,
+                    )
+
+    def test_text(self, nodeid: str) -> str:
+        """
+        A profiled test's listing by cumulative time, headed for showing after its
+        output in the outcome lists; '' if the test was not profiled
+        """
+        label = f"{nodeid} [{SORT_KEYS[0]}]"
+        if label not in self.paths:
+            return ""
+        return (
+            f"\n  # cProfile of the call phase, by {SORT_KEYS[0]} time\n{self[label]}"
+        )
+
+    def __getitem__(self, label: str) -> str:
+        if label not in self._rendered:
+            path, sort = self.paths[label]
+            self._rendered[label] = format_stats(path, sort)
+        return self._rendered[label]
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
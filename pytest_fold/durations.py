@@ -0,0 +1,175 @@
+import heapq
+from bisect import bisect_right
+from collections import defaultdict
+
+PHASES = ("setup", "call", "teardown")
+
+# Histogram bucket upper bounds, in seconds
+HISTOGRAM_BOUNDS = (0.001, 0.01, 0.1, 1.0, 10.0, 60.0)
+
+
+def _bucket_label(index: int) -> str:
+    def fmt(seconds):
+        return f"{seconds * 1000:g}ms" if seconds < 1 else f"{seconds:g}s"
+
+    if index == 0:
+        return f"< {fmt(HISTOGRAM_BOUNDS[0])}"
+    if index == len(HISTOGRAM_BOUNDS):
+        return f">= {fmt(HISTOGRAM_BOUNDS[-1])}"
+    return f"{fmt(HISTOGRAM_BOUNDS[index - 1])} - {fmt(HISTOGRAM_BOUNDS[index])}"
+
+
+def module_of(nodeid: str) -> str:
+    return nodeid.split("::", 1)[0]
+
+
+def class_of(nodeid: str) -> str:
+    """'path::Class' for tests in a class, or '' for module-level tests"""
+    parts = nodeid.split("::")
+    return "::".join(parts[:-1]) if len(parts) > 2 else ""
+
+
+class Durations:
+    """
+    Per-test setup/call/teardown durations, taken from the 'duration' of each
+    TestReport, with aggregations for finding what a run spends its time on.
+    """
+
+    def __init__(self, reports_by_nodeid: dict) -> None:
+        # {nodeid: {"setup": s, "call": s, "teardown": s}}
+        self.phases = {
+            nodeid: {
+                when: getattr(report, "duration", 0.0) or 0.0
+                for when, report in phases.items()
+            }
+            for nodeid, phases in reports_by_nodeid.items()
+        }
+        self.totals = {
+            nodeid: sum(phases.values()) for nodeid, phases in self.phases.items()
+        }
+
+    def slowest(self, k: int = 20, phase: str = None) -> list:
+        """Top-k (nodeid, seconds) by total time, or by one phase's time"""
+        if phase is None:
+            return heapq.nlargest(k, self.totals.items(), key=lambda item: item[1])
+        return heapq.nlargest(
+            k,
+            (
+                (nodeid, phases.get(phase, 0.0))
+                for nodeid, phases in self.phases.items()
+            ),
+            key=lambda item: item[1],
+        )
+
+    def phase_totals(self) -> dict:
+        """Total seconds spent in each phase across the run"""
+        totals = dict.fromkeys(PHASES, 0.0)
+        for phases in self.phases.values():
+            for when, seconds in phases.items():
+                totals[when] += seconds
+        return totals
+
+    def totals_by(self, key) -> list:
+        """[(group, seconds, test count)] for groups given by key(nodeid), slowest first"""
+        seconds = defaultdict(float)
+        counts = defaultdict(int)
+        for nodeid, total in self.totals.items():
+            group = key(nodeid)
+            if not group:
+                continue
+            seconds[group] += total
+            counts[group] += 1
+        return sorted(
+            ((group, seconds[group], counts[group]) for group in seconds),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    def histogram(self) -> list:
+        """[(bucket label, test count)] of per-test total durations"""
+        counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        for total in self.totals.values():
+            counts[bisect_right(HISTOGRAM_BOUNDS, total)] += 1
+        return [(_bucket_label(index), count) for index, count in enumerate(counts)]
+
+    def views(self, k: int = 50) -> dict:
+        """Text renderings of each aggregation, keyed by view name, for the TUIs"""
+        totals = self.phase_totals()
+        summary = [f"{len(self.totals)} tests, {sum(totals.values()):.3f}s total"]
+        summary += [
+            f"  {when:<9} {seconds:>10.3f}s" for when, seconds in totals.items()
+        ]
+
+        slowest = [f"{'total':>10}  {'setup':>9}  {'call':>9}  {'teardown':>9}  test"]
+        for nodeid, total in self.slowest(k):
+            phases = self.phases[nodeid]
+            slowest.append(
+                f"{total:>9.3f}s  "
+                + "  ".join(f"{phases.get(when, 0.0):>8.3f}s" for when in PHASES)
+                + f"  {nodeid}"
+            )
+
+        def grouped(key):
+            return [
+                f"{seconds:>10.3f}s  {count:>6} tests  {group}"
+                for group, seconds, count in self.totals_by(key)
+            ]
+
+        histogram = self.histogram()
+        widest = max((count for _, count in histogram), default=0) or 1
+        bars = [
+            f"{label:>16}  {count:>7}  {'#' * round(40 * count / widest)}"
+            for label, count in histogram
+        ]
+
+        return {
+            "Summary": "\n".join(summary),
+            f"Slowest {k}": "\n".join(slowest),
+            "By module": "\n".join(grouped(module_of)),
+            "By class": "\n".join(grouped(class_of)),
+            "Histogram": "\n".join(bars),
+        }
+
+
+class FixtureCosts:
+    """
+    Setup cost per fixture, from the instantiations timed by the plugin and the
+    fixture names recorded on each setup report. A broad-scoped fixture that is
+    instantiated nearly as often as it is used is a candidate for a wider scope
+    or caching.
+    """
+
+    def __init__(self, reports_by_nodeid: dict) -> None:
+        # {(name, scope): [instantiations, total seconds, tests using it]}
+        self.costs = defaultdict(lambda: [0, 0.0, 0])
+        for phases in reports_by_nodeid.values():
+            for report in phases.values():
+                for name, scope, seconds in getattr(report, "pyfold_fixtures", ()):
+                    cost = self.costs[(name, scope)]
+                    cost[0] += 1
+                    cost[1] += seconds
+            setup = phases.get("setup")
+            for name, scope in getattr(setup, "pyfold_fixturenames", ()):
+                self.costs[(name, scope)][2] += 1
+
+    def by_total(self) -> list:
+        """[(name, scope, instantiations, total, mean, tests using it)], costliest first"""
+        return sorted(
+            (
+                (name, scope, count, total, total / count if count else 0.0, used)
+                for (name, scope), (count, total, used) in self.costs.items()
+            ),
+            key=lambda item: item[3],
+            reverse=True,
+        )
+
+    def views(self) -> dict:
+        """Text rendering of per-fixture setup cost, for the TUIs"""
+        lines = [
+            f"{'total':>10}  {'mean':>9}  {'setups':>7}  {'used by':>7}  {'scope':<9} fixture"
+        ]
+        for name, scope, count, total, mean, used in self.by_total():
+            lines.append(
+                f"{total:>9.3f}s  {mean:>8.3f}s  {count:>7}  {used:>7}  {scope:<9} {name}"
+            )
+        return {"Fixture setup": "\n".join(lines)}
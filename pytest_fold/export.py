@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from xml.etree import ElementTree
+from xml.sax.saxutils import quoteattr
+
+from pytest_fold.query import OUTCOMES, RunIndex
+from pytest_fold.runstore import RunStore
+
+# Command line outcome names by category, as written to JSON lines
+OUTCOME_NAMES = {category: name for name, category in OUTCOMES.items()}
+
+# Characters XML 1.0 does not allow, which captured output may well contain
+_XML_ILLEGAL = re.compile("[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+
+def xml_text(text: str) -> str:
+    """'text' with the characters XML cannot hold shown as '#xNN', as pytest does"""
+    return _XML_ILLEGAL.sub(lambda match: "#x%02X" % ord(match.group()), text)
+
+
+def junit_names(nodeid: str) -> tuple:
+    """
+    A test's JUnit (classname, name): 'tests/test_a.py::TestX::test_y[1]' gives
+    ('tests.test_a.TestX', 'test_y[1]'), as in pytest's own --junitxml
+    """
+    path, bracket, params = nodeid.partition("[")
+    names = path.split("::")
+    names[0] = re.sub(r"\.py$", "", names[0].replace("/", "."))
+    names[-1] += bracket + params
+    return ".".join(names[:-1]), names[-1]
+
+
+def junit_testcase(index: RunIndex, position: int) -> ElementTree.Element:
+    test = index.tests[position]
+    details = index.details(position)
+    classname, name = junit_names(test.nodeid)
+    testcase = ElementTree.Element(
+        "testcase", classname=classname, name=name, time="%.3f" % test.duration
+    )
+    message = xml_text(details.get("message", ""))
+    if test.category in ("FAILED", "ERROR"):
+        tag = "failure" if test.category == "FAILED" else "error"
+        result = ElementTree.SubElement(testcase, tag, message=message)
+        result.text = xml_text(details.get("traceback", ""))
+    elif test.category in ("SKIPPED", "XFAIL"):
+        kind = "pytest.skip" if test.category == "SKIPPED" else "pytest.xfail"
+        ElementTree.SubElement(testcase, "skipped", type=kind, message=message)
+    for tag, fields in (
+        ("system-out", ("caplog", "capstdout")),
+        ("system-err", ("capstderr",)),
+    ):
+        text = "".join(details.get(field, "") for field in fields)
+        if text:
+            ElementTree.SubElement(testcase, tag).text = xml_text(text)
+    return testcase
+
+
+def write_junitxml(index: RunIndex, out) -> None:
+    """
+    Write a run's tests to text stream 'out' as a JUnit XML test suite, one test
+    case at a time; the suite's counts come from the index, so it is written first
+    """
+    categories = Counter(test.category for test in index.tests)
+    suite = {
+        "name": "pytest",
+        "errors": categories["ERROR"],
+        "failures": categories["FAILED"],
+        "skipped": categories["SKIPPED"] + categories["XFAIL"],
+        "tests": len(index.tests),
+        "time": "%.3f" % sum(test.duration for test in index.tests),
+    }
+    attributes = "".join(
+        f" {name}={quoteattr(str(value))}" for name, value in suite.items()
+    )
+    out.write('<?xml version="1.0" encoding="utf-8"?>\n')
+    out.write(f"<testsuites><testsuite{attributes}>\n")
+    for position in range(len(index.tests)):
+        testcase = junit_testcase(index, position)
+        out.write(ElementTree.tostring(testcase, encoding="unicode") + "\n")
+    out.write("</testsuite></testsuites>\n")
+
+
+def write_jsonl(index: RunIndex, out) -> None:
+    """Write a run's tests to text stream 'out' as JSON lines, one test per line"""
+    for position, test in enumerate(index.tests):
+        details = index.details(position)
+        record = {
+            "nodeid": test.nodeid,
+            "outcome": OUTCOME_NAMES.get(test.category, test.category.lower()),
+            "duration": test.duration,
+            "message": details.get("message", ""),
+            "traceback": details.get("traceback", ""),
+            "log": details.get("caplog", ""),
+            "stdout": details.get("capstdout", ""),
+            "stderr": details.get("capstderr", ""),
+        }
+        out.write(json.dumps(record) + "\n")
+
+
+def export_run(run_dir: Path, junitxml: str = None, jsonl: str = None) -> None:
+    """
+    Export a stored run to a JUnit XML file and/or a JSON lines file ('-': stdout).
+    The run's index (see query.py) is loaded whole, so memory grows with the number
+    of tests: every test's nodeid, outcome, title, keywords and duration. Each
+    test's traceback and captured output are read from the details file as it is
+    written, so those are in memory one test at a time. A run stored without an
+    index is read from its pickled reports, output and all.
+    """
+    with RunIndex(run_dir) as index:
+        for path, write in ((junitxml, write_junitxml), (jsonl, write_jsonl)):
+            if not path:
+                continue
+            if path == "-":
+                write(index, sys.stdout)
+                continue
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as out:
+                write(index, out)
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        prog="foldexport",
+        description="Export a stored pytest-fold run as JUnit XML and/or JSON lines",
+    )
+    parser.add_argument(
+        "--run",
+        metavar="RUN_ID",
+        default=None,
+        help="export a stored run instead of the latest one",
+    )
+    parser.add_argument(
+        "--junitxml", metavar="PATH", help="write JUnit XML to PATH ('-': stdout)"
+    )
+    parser.add_argument(
+        "--jsonl",
+        metavar="PATH",
+        help="write one JSON object per test to PATH ('-': stdout)",
+    )
+    args = parser.parse_args(argv)
+    if not args.junitxml and not args.jsonl:
+        parser.error("nothing to export: give --junitxml and/or --jsonl")
+    if args.junitxml == "-" and args.jsonl == "-":
+        parser.error("only one of --junitxml and --jsonl can be written to stdout")
+
+    run_dir = RunStore().open_run(args.run)
+    if run_dir is None:
+        parser.error(
+            f"no stored run with id '{args.run}'" if args.run else "no stored runs"
+        )
+    try:
+        export_run(run_dir, args.junitxml, args.jsonl)
+    except BrokenPipeError:
+        # The output's reader (e.g. 'head') stopped reading; exit quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+from bisect import bisect_left
+from itertools import accumulate
+
+# Outcome categories counted per group, in display order, with their labels
+CATEGORIES = (
+    ("FAILED", "failed"),
+    ("ERROR", "errored"),
+    ("PASSED", "passed"),
+    ("SKIPPED", "skipped"),
+    ("XFAIL", "xfailed"),
+    ("XPASS", "xpassed"),
+)
+CATEGORY_INDEX = {category: index for index, (category, _) in enumerate(CATEGORIES)}
+
+# Children listed when a group is expanded; the rest are summed up in one entry
+CHILDREN_SHOWN = 200
+
+# Nodeid separators ('/', '::' and the '[' of parameter ids) in sort keys: sorting
+# below any other character, they keep each group's tests contiguous
+SEPARATOR = "\x01"
+AFTER_GROUP = "\x02"
+
+
+def sort_key(nodeid: str) -> str:
+    """
+    The nodeid with its separators replaced by SEPARATOR (one per character, so
+    offsets into either are the same); parameter ids are left as they are
+    """
+    bracket = nodeid.find("[") if nodeid.endswith("]") else -1
+    base = nodeid if bracket < 0 else nodeid[:bracket]
+    key = base.replace("::", SEPARATOR * 2).replace("/", SEPARATOR)
+    return key if bracket < 0 else key + SEPARATOR + nodeid[bracket + 1 :]
+
+
+def part_end(key: str, start: int) -> int:
+    """End offset of the part of a sort key after the separator at 'start'"""
+    if key.startswith(SEPARATOR * 2, start):
+        start += 2
+    elif key.startswith(SEPARATOR, start):
+        start += 1
+    end = key.find(SEPARATOR, start)
+    return end if end >= 0 else len(key)
+
+
+class Group:
+    """
+    A node of a TestTree: a directory, module, class, function or test, covering
+    the tests [lo, hi) of the tree's sorted test table. Outcome counts and the total
+    duration come from the table's cumulative sums, and children are found by
+    bisecting it, so neither depends on how many tests the group has.
+    """
+
+    __slots__ = ("tree", "lo", "hi", "end", "name", "_children")
+
+    def __init__(self, tree, lo: int, hi: int, start: int, end: int) -> None:
+        self.tree = tree
+        self.lo = lo
+        self.hi = hi
+        self.end = end  # length of the nodeid prefix shared by the group's tests
+        self.name = tree.nodeids[lo][start:end].lstrip(":/") if end else ""
+        self._children = None
+
+    @property
+    def key(self) -> str:
+        """The nodeid prefix shared by the group's tests"""
+        return self.tree.nodeids[self.lo][: self.end]
+
+    @property
+    def size(self) -> int:
+        return self.hi - self.lo
+
+    @property
+    def counts(self) -> list:
+        """Number of tests per outcome, in CATEGORIES order"""
+        return [
+            bisect_left(positions, self.hi) - bisect_left(positions, self.lo)
+            for positions in self.tree.positions
+        ]
+
+    @property
+    def seconds(self) -> float:
+        return (
+            self.tree.cumulative_seconds[self.hi]
+            - self.tree.cumulative_seconds[self.lo]
+        )
+
+    @property
+    def nodeid(self) -> str:
+        """The test's nodeid if the group is a single test, else ''"""
+        if self.size == 1 and len(self.tree.keys[self.lo]) == self.end:
+            return self.tree.nodeids[self.lo]
+        return ""
+
+    @property
+    def title(self) -> str:
+        """The test's title if the group is a single test, else ''"""
+        return self.tree.titles[self.lo] if self.nodeid else ""
+
+    def children(self) -> list:
+        """
+        The groups one level down, in nodeid order. A chain of groups with a single
+        child each (e.g. 'tests/unit/api') is compacted into one group.
+        """
+        if self._children is None:
+            keys = self.tree.keys
+            lo = self.lo
+            if len(keys[lo]) == self.end:
+                lo += 1  # the group's own test
+            self._children = []
+            while lo < self.hi:
+                end = part_end(keys[lo], self.end)
+                hi = bisect_left(keys, keys[lo][:end] + AFTER_GROUP, lo, self.hi)
+                self._children.append(self.tree.group(lo, hi, self.end, end))
+                lo = hi
+        return self._children
+
+    def summary(self) -> str:
+        """'<tests> tests: <count> failed, ... in <seconds>s', leaving out zero counts"""
+        counts = ", ".join(
+            f"{count} {label}"
+            for count, (_, label) in zip(self.counts, CATEGORIES)
+            if count
+        )
+        return f"{self.size} tests: {counts} in {self.seconds:.3f}s"
+
+    def label(self) -> str:
+        if self.title:
+            category = CATEGORIES[self.tree.categories[self.lo]][0]
+            return f"{self.name}  {category} {self.seconds:.3f}s"
+        return f"{self.name}  ({self.summary()})"
+
+    def shown_children(self, limit: int = CHILDREN_SHOWN) -> tuple:
+        """(the first 'limit' children, summary of the rest or '')"""
+        children = self.children()
+        rest = children[limit:]
+        if not rest:
+            return children, ""
+        tests = sum(child.size for child in rest)
+        return children[:limit], f"... {len(rest)} more groups ({tests} tests)"
+
+
+class TestTree:
+    """
+    Tests grouped into a prefix tree of their nodeids: directories, modules,
+    classes, functions and parameter ids, each with outcome counts and durations.
+
+    The tests are sorted once by nodeid, with separators sorting first so that every
+    group's tests are contiguous, and per-outcome positions and cumulative durations
+    are recorded. Groups are then created only when their parent is expanded, so
+    opening a run of any size shows its top-level groups right away.
+    """
+
+    def __init__(self, test_infos, totals: dict) -> None:
+        # totals: {nodeid: total seconds} (see Durations)
+        test_infos = list(test_infos)
+        keys = [sort_key(test_info.nodeid) for test_info in test_infos]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        tests = [test_infos[index] for index in order]
+        self.keys = [keys[index] for index in order]
+        self.nodeids = [test_info.nodeid for test_info in tests]
+        self.titles = [test_info.title for test_info in tests]
+        self.categories = [
+            CATEGORY_INDEX.get(test_info.category, CATEGORY_INDEX["PASSED"])
+            for test_info in tests
+        ]
+        # Sorted table positions of the tests with each outcome, in CATEGORIES order
+        self.positions = [[] for _ in CATEGORIES]
+        for position, category in enumerate(self.categories):
+            self.positions[category].append(position)
+        self.cumulative_seconds = list(
+            accumulate((totals.get(nodeid, 0.0) for nodeid in self.nodeids), initial=0)
+        )
+        self.root = Group(self, 0, len(tests), 0, 0)
+
+    def group(self, lo: int, hi: int, start: int, end: int) -> Group:
+        """The group of tests [lo, hi), sharing the nodeid prefix up to 'end'"""
+        keys = self.keys
+        # While no test is the group itself and all share the next part, compact
+        while len(keys[lo]) > end:
+            next_end = part_end(keys[lo], end)
+            last = keys[hi - 1]
+            if last[:next_end] != keys[lo][:next_end] or (
+                len(last) > next_end and last[next_end] != SEPARATOR
+            ):
+                break
+            end = next_end
+        return Group(self, lo, hi, start, end)
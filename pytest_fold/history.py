@@ -0,0 +1,400 @@
+import argparse
+import hashlib
+import sqlite3
+import statistics
+import time
+from pathlib import Path
+
+from strip_ansi import strip_ansi
+from pytest_fold.utils import RUNSTOREDIR, merge_reports, report_category
+
+HISTORYFILE = RUNSTOREDIR / "history.db"
+
+# A test's call duration is "slower than usual" when it exceeds the median of its
+# last REGRESSION_WINDOW runs by more than REGRESSION_K median absolute deviations,
+# and by at least REGRESSION_MIN_SECONDS; at least REGRESSION_MIN_RUNS prior runs
+# are needed to form a baseline
+REGRESSION_WINDOW = 20
+REGRESSION_K = 3.0
+REGRESSION_MIN_RUNS = 5
+REGRESSION_MIN_SECONDS = 0.05
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT,
+    started REAL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    nodeid TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    test INTEGER NOT NULL REFERENCES tests(id),
+    run INTEGER NOT NULL REFERENCES runs(id),
+    outcome TEXT NOT NULL,
+    setup REAL,
+    call REAL,
+    teardown REAL,
+    keywords TEXT,
+    tb_hash TEXT,
+    PRIMARY KEY (test, run)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_by_run ON results (run, outcome);
+CREATE INDEX IF NOT EXISTS runs_by_run_id ON runs (run_id);
+"""
+
+# Joins each result of a run ('cur') to the same test's result in the last
+# earlier run that ran it ('prev'), so that runs of a subset of the tests (-k,
+# reruns, ...) are not taken as the previous run of the tests they left out;
+# with 'results' keyed (test, run), the subquery is one index lookup per test
+PREVIOUS_RESULT = """
+LEFT JOIN results AS prev ON prev.test = cur.test AND prev.run = (
+    SELECT MAX(run) FROM results WHERE test = cur.test AND run < cur.run
+)
+"""
+
+
+def traceback_hash(phases: dict) -> str:
+    """Short hash of the (ANSI-stripped) traceback of a test's failing phase, if any"""
+    for report in phases.values():
+        if report.failed and report.longrepr:
+            text = strip_ansi(report.longreprtext)
+            return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+    return None
+
+
+class RunHistory:
+    """
+    SQLite database of per-test outcomes and phase durations across runs.
+    Tests are stored once in 'tests'; 'results' is keyed (test, run) so a test's
+    history is a single index range scan, and indexed by (run, outcome) for
+    run-to-run comparisons.
+    """
+
+    def __init__(self, path: Path = HISTORYFILE) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def record_run(
+        self, reports: list, run_id: str = None, started: float = None
+    ) -> int:
+        """Store one run's TestReports; returns the new run's key"""
+        merged = merge_reports(reports)
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (run_id, started, finished) VALUES (?, ?, ?)",
+                (run_id, started, time.time()),
+            )
+            run = cursor.lastrowid
+
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tests (nodeid) VALUES (?)",
+                ((nodeid,) for nodeid in merged),
+            )
+            test_ids = dict(self.conn.execute("SELECT nodeid, id FROM tests"))
+
+            rows = []
+            for nodeid, phases in merged.items():
+                durations = {
+                    when: getattr(report, "duration", None)
+                    for when, report in phases.items()
+                }
+                keywords = set()
+                for report in phases.values():
+                    keywords.update(report.keywords)
+                rows.append(
+                    (
+                        test_ids[nodeid],
+                        run,
+                        report_category(phases),
+                        durations.get("setup"),
+                        durations.get("call"),
+                        durations.get("teardown"),
+                        " ".join(sorted(keywords)),
+                        traceback_hash(phases),
+                    )
+                )
+            self.conn.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return run
+
+    def runs(self, limit: int = 20) -> list:
+        """Return (key, run_id, finished, total, failing) for the most recent runs"""
+        return self.conn.execute(
+            """
+            SELECT runs.id, runs.run_id, runs.finished, COUNT(results.test),
+                   SUM(results.outcome IN ('FAILED', 'ERROR'))
+            FROM runs LEFT JOIN results ON results.run = runs.id
+            GROUP BY runs.id ORDER BY runs.id DESC LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+
+    def run_key(self, run_id: str = None) -> int:
+        """Return the key of the run stored for 'run_id' (default: the latest run)"""
+        if run_id is None:
+            row = self.conn.execute("SELECT MAX(id) FROM runs").fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT MAX(id) FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return row[0]
+
+    def newly_failing(self, run: int = None) -> list:
+        """
+        Nodeids failing (or erroring) in 'run' that were not failing the last time
+        they ran before it
+        """
+        run = run or self.run_key()
+        return [
+            nodeid
+            for (nodeid,) in self.conn.execute(
+                f"""
+                SELECT tests.nodeid
+                FROM results AS cur
+                JOIN tests ON tests.id = cur.test
+                {PREVIOUS_RESULT}
+                WHERE cur.run = ? AND cur.outcome IN ('FAILED', 'ERROR')
+                  AND (prev.outcome IS NULL OR prev.outcome NOT IN ('FAILED', 'ERROR'))
+                ORDER BY tests.nodeid
+                """,
+                (run,),
+            )
+        ]
+
+    def newly_passing(self, run: int = None) -> list:
+        """Nodeids failing the last time they ran before 'run' that no longer fail"""
+        run = run or self.run_key()
+        return [
+            nodeid
+            for (nodeid,) in self.conn.execute(
+                f"""
+                SELECT tests.nodeid
+                FROM results AS cur
+                JOIN tests ON tests.id = cur.test
+                {PREVIOUS_RESULT}
+                WHERE cur.run = ? AND cur.outcome NOT IN ('FAILED', 'ERROR')
+                  AND prev.outcome IN ('FAILED', 'ERROR')
+                ORDER BY tests.nodeid
+                """,
+                (run,),
+            )
+        ]
+
+    def outcome_history(self, nodeid: str, limit: int = 500) -> list:
+        """Return (run_id, finished, outcome, call_duration, tb_hash), newest first"""
+        return self.conn.execute(
+            """
+            SELECT runs.run_id, runs.finished, results.outcome, results.call,
+                   results.tb_hash
+            FROM tests
+            JOIN results ON results.test = tests.id
+            JOIN runs ON runs.id = results.run
+            WHERE tests.nodeid = ?
+            ORDER BY results.run DESC LIMIT ?
+            """,
+            (nodeid, limit),
+        ).fetchall()
+
+    def call_durations(self, run: int) -> dict:
+        """{nodeid: call duration} for one run"""
+        return dict(
+            self.conn.execute(
+                """
+                SELECT tests.nodeid, results.call
+                FROM results JOIN tests ON tests.id = results.test
+                WHERE results.run = ? AND results.call IS NOT NULL
+                """,
+                (run,),
+            )
+        )
+
+    def slower_than_usual(
+        self,
+        run: int = None,
+        window: int = REGRESSION_WINDOW,
+        k: float = REGRESSION_K,
+        min_runs: int = REGRESSION_MIN_RUNS,
+        min_seconds: float = REGRESSION_MIN_SECONDS,
+    ) -> dict:
+        """
+        {nodeid: (duration, baseline median, MAD, baseline runs)} for tests in 'run'
+        whose call duration exceeds median + k * MAD of their last 'window' runs
+        before it (the runs that ran them, so subset runs don't thin the baseline)
+        """
+        run = run or self.run_key()
+        current = self.call_durations(run)
+        baselines = {}
+        for nodeid, duration in self.conn.execute(
+            """
+            SELECT tests.nodeid, recent.call
+            FROM (
+                SELECT test, call,
+                       ROW_NUMBER() OVER (PARTITION BY test ORDER BY run DESC) AS age
+                FROM results
+                WHERE run < ? AND call IS NOT NULL
+                  AND test IN (SELECT test FROM results WHERE run = ?)
+            ) AS recent
+            JOIN tests ON tests.id = recent.test
+            WHERE recent.age <= ?
+            """,
+            (run, run, window),
+        ):
+            baselines.setdefault(nodeid, []).append(duration)
+
+        slower = {}
+        for nodeid, durations in baselines.items():
+            if len(durations) < min_runs:
+                continue
+            median = statistics.median(durations)
+            mad = statistics.median(abs(d - median) for d in durations)
+            duration = current[nodeid]
+            if duration > median + k * mad and duration - median >= min_seconds:
+                slower[nodeid] = (duration, median, mad, len(durations))
+        return slower
+
+
+def format_regression(duration: float, median: float, mad: float, runs: int) -> str:
+    """Describe one slower_than_usual() entry"""
+    increase = f" (+{100 * (duration - median) / median:.0f}%)" if median else ""
+    return (
+        f"call took {duration:.3f}s in this run{increase}; "
+        f"usual: median {median:.3f}s, MAD {mad:.3f}s over the previous {runs} runs"
+    )
+
+
+def slower_for_run(run_dir: Path = None, path: Path = HISTORYFILE) -> dict:
+    """
+    For the TUIs: {nodeid: description} of tests slower than usual in the given
+    stored run (default: latest); empty if no history has been recorded
+    """
+    if not Path(path).exists():
+        return {}
+    history = RunHistory(path)
+    try:
+        run = history.run_key(run_dir.name if run_dir else None)
+        if run is None:
+            return {}
+        return {
+            nodeid: format_regression(*stats)
+            for nodeid, stats in history.slower_than_usual(run).items()
+        }
+    finally:
+        history.close()
+
+
+def format_outcome_history(rows: list) -> str:
+    """Render outcome_history() rows as text, one run per line"""
+    lines = []
+    for run_id, finished, outcome, call, tb_hash in rows:
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(finished))
+        call = f"{call:.3f}s" if call is not None else "-"
+        lines.append(
+            f"{when}  {run_id or '-':<24} {outcome:<8} {call:>10}  {tb_hash or ''}"
+        )
+    return "\n".join(lines)
+
+
+def history_for_run(run_dir: Path = None, path: Path = HISTORYFILE) -> dict:
+    """
+    For the TUIs: {"Newly failing": {nodeid: history_text}, "Newly passing": {...}}
+    comparing the given stored run (default: latest) with the run before it;
+    empty if no history has been recorded
+    """
+    if not Path(path).exists():
+        return {}
+    history = RunHistory(path)
+    try:
+        run = history.run_key(run_dir.name if run_dir else None)
+        if run is None:
+            return {}
+        return {
+            label: {
+                nodeid: format_outcome_history(history.outcome_history(nodeid))
+                for nodeid in nodeids
+            }
+            for label, nodeids in (
+                ("Newly failing", history.newly_failing(run)),
+                ("Newly passing", history.newly_passing(run)),
+            )
+        }
+    finally:
+        history.close()
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        prog="foldhistory", description="Query pytest-fold's run history database"
+    )
+    parser.add_argument("--db", default=HISTORYFILE, help="history database path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    runs = commands.add_parser("runs", help="list recent runs")
+    runs.add_argument("--limit", type=int, default=20)
+    new = commands.add_parser(
+        "new-failures",
+        help="tests failing in a run that were not the last time they ran before it",
+    )
+    new.add_argument("--run", metavar="RUN_ID", default=None)
+    fixed = commands.add_parser(
+        "fixed", help="tests failing the last time they ran that no longer fail"
+    )
+    fixed.add_argument("--run", metavar="RUN_ID", default=None)
+    slower = commands.add_parser(
+        "slower", help="tests whose call duration regressed against recent runs"
+    )
+    slower.add_argument("--run", metavar="RUN_ID", default=None)
+    slower.add_argument("--window", type=int, default=REGRESSION_WINDOW)
+    slower.add_argument("-k", type=float, default=REGRESSION_K)
+    hist = commands.add_parser("history", help="outcome history of one test")
+    hist.add_argument("nodeid")
+    hist.add_argument("--limit", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    if not Path(args.db).exists():
+        parser.error(
+            f"no history database at {args.db} (run pytest with --fold-history)"
+        )
+    history = RunHistory(args.db)
+    try:
+        if args.command == "runs":
+            for key, run_id, finished, total, failing in history.runs(args.limit):
+                when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(finished))
+                print(
+                    f"{key}\t{run_id or '-'}\t{when}\t{total} tests\t{failing or 0} failing"
+                )
+        elif args.command in ("new-failures", "fixed"):
+            run = history.run_key(args.run)
+            if run is None:
+                parser.error(f"no run '{args.run}' in history")
+            query = (
+                history.newly_failing
+                if args.command == "new-failures"
+                else history.newly_passing
+            )
+            for nodeid in query(run):
+                print(nodeid)
+        elif args.command == "slower":
+            run = history.run_key(args.run)
+            if run is None:
+                parser.error(f"no run '{args.run}' in history")
+            slow = history.slower_than_usual(run, window=args.window, k=args.k)
+            for nodeid, stats in sorted(slow.items(), key=lambda item: -item[1][0]):
+                print(f"{nodeid}\t{format_regression(*stats)}")
+        elif args.command == "history":
+            print(
+                format_outcome_history(history.outcome_history(args.nodeid, args.limit))
+            )
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import ast
+from collections import defaultdict
+from itertools import chain
+
+from _pytest.mark.expression import IDENT_PREFIX, Scanner, expression
+
+# Maps a bytearray of 0/1 flags to the digits of a binary number
+_FLAG_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+
+
+def bitset(indexes, size: int) -> int:
+    """The bitset, over 'size' items, with the bits of 'indexes' set"""
+    flags = bytearray(size)
+    for index in indexes:
+        flags[index] = 1
+    return int(flags[::-1].translate(_FLAG_DIGITS), 2) if flags else 0
+
+
+def set_bits(bits: int, limit: int = None) -> list:
+    """Indexes of the bits set in a bitset, in order, at most 'limit' of them"""
+    flags = bin(bits)[:1:-1]  # character i is bit i
+    indexes = []
+    index = flags.find("1")
+    while index >= 0 and len(indexes) != limit:
+        indexes.append(index)
+        index = flags.find("1", index + 1)
+    return indexes
+
+
+def parse_keyword_expression(text: str) -> ast.expr:
+    """
+    Parse a -k-style expression such as 'slow and not network' with pytest's own
+    parser, into its AST; raises ValueError if it is invalid
+    """
+    try:
+        return expression(Scanner(text)).body
+    except Exception as error:
+        raise ValueError(f"invalid keyword expression '{text}': {error}") from error
+
+
+class KeywordIndex:
+    """
+    Keyword/marker index over a run's tests, for -k-style filtering across outcomes.
+
+    Each distinct keyword (markers, names of the test and its parents, and the
+    test's module path) maps to the tests carrying it. Selections are bitsets over
+    the test table, as Python ints with bit i set for test i, so 'and', 'or' and
+    'not' in an expression, and restricting to an outcome, are each one bitwise
+    operation however many tests there are. A word's bitset is built the first time
+    it is used and cached. Like -k, words match keywords case-insensitively, as
+    substrings, so 'network' matches a 'network_io' marker and 'tests/unit' every
+    module under that directory.
+    """
+
+    def __init__(self, test_infos) -> None:
+        # One entry per test (nodeid), even where tests share a title
+        self.titles = []
+        self.nodeids = []
+        by_category = defaultdict(list)
+        by_keyword = defaultdict(list)
+        for index, test_info in enumerate(test_infos):
+            self.titles.append(test_info.title)
+            self.nodeids.append(test_info.nodeid)
+            by_category[test_info.category].append(index)
+            for keyword in test_info.keywords:
+                by_keyword[keyword].append(index)
+            by_keyword[test_info.nodeid.split("::")[0]].append(index)
+        by_keyword.pop("", None)
+        # Lowercased once per distinct keyword rather than once per test
+        self.postings = {}  # {lowercased keyword: [test index, ...]}
+        for keyword, indexes in by_keyword.items():
+            lowered = keyword.lower()
+            if lowered in self.postings:
+                self.postings[lowered] = self.postings[lowered] + indexes
+            else:
+                self.postings[lowered] = indexes
+        # All keywords, one per line, for finding the keywords containing a word
+        self.vocabulary = "\n".join(self.postings)
+        self.everything = (1 << len(self.titles)) - 1
+        # {category ('PASSED', 'FAILED', ...): bitset of its tests}
+        self.outcomes = {
+            category: self.bitset(indexes) for category, indexes in by_category.items()
+        }
+        self._word_bitsets = {}
+
+    def bitset(self, indexes) -> int:
+        """The bitset with the bits of 'indexes' set"""
+        return bitset(indexes, len(self.titles))
+
+    def _keywords_containing(self, word: str) -> list:
+        vocabulary = self.vocabulary
+        keywords = []
+        position = vocabulary.find(word)
+        while position >= 0:
+            start = vocabulary.rfind("\n", 0, position) + 1
+            end = vocabulary.find("\n", position)
+            if end < 0:
+                end = len(vocabulary)
+            keywords.append(vocabulary[start:end])
+            position = vocabulary.find(word, end)
+        return keywords
+
+    def word_bitset(self, word: str) -> int:
+        """The tests having a keyword that contains 'word'"""
+        word = word.lower()
+        bits = self._word_bitsets.get(word)
+        if bits is None:
+            bits = self._word_bitsets[word] = self.bitset(
+                chain.from_iterable(
+                    self.postings[keyword]
+                    for keyword in self._keywords_containing(word)
+                )
+            )
+        return bits
+
+    def select(self, text: str) -> int:
+        """The tests matching a keyword expression (all of them if it is empty)"""
+        if not text.strip():
+            return self.everything
+        return self._evaluate(parse_keyword_expression(text))
+
+    def _evaluate(self, node: ast.expr) -> int:
+        if isinstance(node, ast.BoolOp):
+            bits = self._evaluate(node.values[0])
+            for value in node.values[1:]:
+                if isinstance(node.op, ast.And):
+                    bits &= self._evaluate(value)
+                else:
+                    bits |= self._evaluate(value)
+            return bits
+        if isinstance(node, ast.UnaryOp):
+            return self.everything & ~self._evaluate(node.operand)
+        if isinstance(node, ast.Name):
+            return self.word_bitset(node.id[len(IDENT_PREFIX) :])
+        raise ValueError("marker arguments are not supported in keyword filters")
+
+    def titles_of(self, bits: int, limit: int = None) -> list:
+        """Titles of the tests in a bitset, in test order, at most 'limit' of them"""
+        return [self.titles[index] for index in set_bits(bits, limit)]
+
+    def nodeids_of(self, bits: int, limit: int = None) -> list:
+        """Nodeids of the tests in a bitset, in test order, at most 'limit' of them"""
+        return [self.nodeids[index] for index in set_bits(bits, limit)]
+
+    def by_outcome(self, bits: int) -> dict:
+        """{category: the tests of a bitset with that outcome}"""
+        return {category: bits & tests for category, tests in self.outcomes.items()}
+
+
+def count(bits: int) -> int:
+    """Number of tests in a bitset"""
+    return bin(bits).count("1")
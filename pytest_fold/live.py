@@ -0,0 +1,257 @@
+import json
+import os
+import socket
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+
+from _pytest.reports import TestReport
+from pytest_fold.grouping import CATEGORIES
+from pytest_fold.utils import RUNSTOREDIR, report_category
+
+# Socket a run started with --fold-live serves its reports on
+LIVESOCKET = RUNSTOREDIR / "live.sock"
+
+# Seconds between live TUI updates, and tests added to the TUI per update; the
+# rest wait for the next one, so a fast run cannot flood the UI
+LIVE_REFRESH = 0.25
+LIVE_BATCH = 500
+
+# Seconds the end of a rerun waits for the TUI that started it to connect, should
+# its tests finish before the TUI's first attempt
+WAIT_FOR_TUI = 5.0
+
+# Tests listed per outcome in a live TUI; the rest are counted
+LIVE_ROWS_SHOWN = 1000
+
+# Outcome categories in the order a live TUI lists them, with their section titles
+LIVE_SECTIONS = (
+    ("FAILED", "Failures"),
+    ("ERROR", "Errors"),
+    ("PASSED", "Passes"),
+    ("SKIPPED", "Skipped"),
+    ("XFAIL", "Xfails"),
+    ("XPASS", "Xpasses"),
+)
+
+# Attributes not sent with a live report: xdist's WorkerController, and cProfile
+# stats (bytes, written to the run's directory at the end instead)
+_UNSENT = ("node", "pyfold_cprofile")
+
+
+def socket_address(path: Path) -> str:
+    """
+    The path to bind or connect to: relative to the current directory if that is
+    shorter, as Unix socket paths are limited to about 100 characters
+    """
+    path = str(path)
+    try:
+        relative = os.path.relpath(path)
+    except ValueError:
+        return path
+    return relative if len(relative) < len(path) else path
+
+
+class LivePublisher:
+    """
+    Serves a running test session's reports to live TUIs ('tuitxt --live',
+    'tuitk --live') over a Unix socket, as JSON lines.
+
+    Messages are appended to a backlog, and each connected TUI has a thread sending
+    it the backlog from where it left off, so a TUI started mid-run catches up with
+    everything so far, and a slow or stopped TUI never holds up the test run.
+
+    With 'wait_for_tui', as for a rerun started from a TUI (see rerun.py), which is
+    known to be connecting, the end of the run waits for it to have connected.
+    """
+
+    def __init__(self, path: Path = LIVESOCKET, wait_for_tui: bool = False) -> None:
+        self.path = Path(path)
+        self.backlog = []  # encoded messages, in order
+        self.closed = False
+        self.condition = threading.Condition()
+        self.senders = []
+        self.wait_for_tui = wait_for_tui
+        self.connected = threading.Event()
+
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("live results need Unix domain sockets")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        address = socket_address(self.path)
+        if self.path.exists():
+            # Left behind by a session that did not exit cleanly, unless one is
+            # still serving on it
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(address)
+            except OSError:
+                self.path.unlink()
+            else:
+                raise OSError(f"another test run is serving live results on {path}")
+            finally:
+                probe.close()
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(address)
+        self.server.listen()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                connection, _ = self.server.accept()
+            except OSError:
+                return  # closed
+            sender = threading.Thread(
+                target=self._send, args=(connection,), daemon=True
+            )
+            self.senders.append(sender)
+            sender.start()
+            self.connected.set()
+
+    def _send(self, connection: socket.socket) -> None:
+        sent = 0
+        with connection:
+            while True:
+                with self.condition:
+                    while sent == len(self.backlog) and not self.closed:
+                        self.condition.wait()
+                    messages = self.backlog[sent:]
+                    done = self.closed
+                sent += len(messages)
+                try:
+                    connection.sendall(b"".join(messages))
+                except OSError:
+                    return  # the TUI went away
+                if done:
+                    return
+
+    def send(self, message: dict) -> None:
+        line = json.dumps(message, default=repr).encode() + b"\n"
+        with self.condition:
+            self.backlog.append(line)
+            self.condition.notify_all()
+
+    def publish(self, report: TestReport) -> None:
+        data = report._to_json()
+        for name in _UNSENT:
+            data.pop(name, None)
+        self.send({"type": "report", "report": data})
+
+    def close(self, run_id: str = None, timeout: float = 1.0) -> None:
+        """
+        Tell the TUIs the run is over (and its stored run id, if any), and stop
+        serving, giving them up to 'timeout' seconds to receive the rest
+        """
+        self.send({"type": "end", "run": run_id})
+        if self.wait_for_tui:
+            self.connected.wait(WAIT_FOR_TUI)
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.server.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        deadline = time.monotonic() + timeout
+        for sender in self.senders:
+            sender.join(max(0, deadline - time.monotonic()))
+
+
+class LiveFeed:
+    """
+    A live TUI's view of a running session: connects to its socket (waiting for one
+    to start if need be) and reads its reports on a background thread. The TUI calls
+    'take' at its own pace for the tests completed since, and 'summary' for the
+    counts so far.
+    """
+
+    def __init__(self, path: Path = LIVESOCKET) -> None:
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.tests = {}  # {nodeid: {when: report}}
+        self.titles = {}  # {title: nodeid}, for looking up a clicked test
+        self.completed = deque()  # (category, title) not yet taken
+        self.counts = Counter()
+        self.collected = 0
+        self.state = "waiting"  # then "running", "finished" or "disconnected"
+        self.run_id = None
+        self.stopped = False
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop waiting for a session to connect to"""
+        self.stopped = True
+
+    def _read(self) -> None:
+        while not self.stopped:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                connection.connect(socket_address(self.path))
+                break
+            except OSError:
+                connection.close()
+                time.sleep(LIVE_REFRESH)
+        else:
+            return
+        self.state = "running"
+        with connection, connection.makefile("rb") as stream:
+            for line in stream:
+                self._handle(json.loads(line))
+        if self.state != "finished":
+            self.state = "disconnected"
+
+    def _handle(self, message: dict) -> None:
+        if message["type"] == "collected":
+            self.collected = max(self.collected, message["count"])
+        elif message["type"] == "end":
+            self.run_id = message["run"]
+            self.state = "finished"
+        elif message["type"] == "report":
+            report = TestReport._from_json(message["report"])
+            phases = self.tests.setdefault(report.nodeid, {})
+            # Pytest re-reports some phases in its summaries; a test completes once
+            completed = report.when == "teardown" and "teardown" not in phases
+            phases[report.when] = report
+            if completed:
+                category = report_category(phases)
+                with self.lock:
+                    self.titles[report.head_line] = report.nodeid
+                    self.counts[category] += 1
+                    self.completed.append((category, report.head_line))
+
+    def take(self, limit: int = LIVE_BATCH) -> list:
+        """Up to 'limit' (category, title) of tests completed since the last call"""
+        with self.lock:
+            return [
+                self.completed.popleft() for _ in range(min(limit, len(self.completed)))
+            ]
+
+    def summary(self) -> str:
+        """'<count> failed, ... (<done> of <collected> tests) <state>'"""
+        with self.lock:
+            counts = ", ".join(
+                f"{self.counts[category]} {label}"
+                for category, label in CATEGORIES
+                if self.counts[category]
+            )
+            done = sum(self.counts.values())
+        if self.state == "waiting":
+            return f"Waiting for a test run started with --fold-live ({self.path})"
+        progress = (
+            f"{done} of {self.collected} tests" if self.collected else f"{done} tests"
+        )
+        state = self.state
+        if state == "finished" and self.run_id:
+            state += f", open it with --run {self.run_id}"
+        return f"{counts or 'no results yet'}  ({progress}, {state})"
+
+    def test_text(self, title: str) -> str:
+        """A completed test's failure tracebacks and captured output"""
+        phases = self.tests.get(self.titles.get(title), {})
+        if not phases:
+            return ""
+        last = phases.get("teardown") or list(phases.values())[-1]
+        failures = [report.longreprtext for report in phases.values() if report.failed]
+        return "\n".join(failures + [last.caplog, last.capstderr, last.capstdout])
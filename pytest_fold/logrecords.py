@@ -0,0 +1,222 @@
+import logging
+import time
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+
+from pytest_fold.keywords import bitset, count, set_bits
+
+# Log records listed per filter in the TUIs; the rest are counted
+LOG_ROWS_SHOWN = 500
+
+# Prefix of a log filter word restricting it to tests whose nodeid contains the rest
+TEST_PREFIX = "test:"
+
+
+class LogRecorder(logging.Handler):
+    """
+    Root logger handler keeping the level, logger name, time and message of every
+    record logged during a test phase (the records pytest's caplog sees), one list
+    per field, for attaching to the phase's report (see 'take').
+    """
+
+    def __init__(self) -> None:
+        super().__init__(logging.NOTSET)
+        self.times, self.levels, self.loggers, self.messages = [], [], [], []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            message = record.getMessage()
+        except Exception:
+            message = str(record.msg)
+        if record.exc_info:
+            message += "\n" + self.formatException(record.exc_info)
+        self.times.append(record.created)
+        self.levels.append(record.levelno)
+        self.loggers.append(record.name)
+        self.messages.append(message)
+
+    def take(self) -> list:
+        """[times, levels, logger names, messages] recorded since the last call"""
+        columns = [self.times, self.levels, self.loggers, self.messages]
+        self.times, self.levels, self.loggers, self.messages = [], [], [], []
+        return columns
+
+
+def format_record(created: float, level: int, logger: str, message: str) -> str:
+    """A log record as a 'time level logger message' row"""
+    stamp = time.strftime("%H:%M:%S", time.localtime(created))
+    return "%s.%03d %-8s %s  %s" % (
+        stamp,
+        int(created % 1 * 1000),
+        logging.getLevelName(level),
+        logger,
+        message,
+    )
+
+
+def parse_log_filter(text: str) -> tuple:
+    """
+    Parse a log filter into (minimum level, logger names, nodeid substrings). Its
+    words are a level name ('warning': records at WARNING and above), a logger name
+    (its records and its child loggers'), or 'test:' and part of a test's nodeid;
+    loggers and tests are each alternatives, e.g. 'error app.db app.http test:api'
+    """
+    level = 0
+    loggers = []
+    tests = []
+    for word in text.split():
+        if word.lower().startswith(TEST_PREFIX):
+            tests.append(word[len(TEST_PREFIX) :])
+        elif isinstance(logging.getLevelName(word.upper()), int):
+            level = logging.getLevelName(word.upper())
+        else:
+            loggers.append(word)
+    return level, loggers, tests
+
+
+class LogTable:
+    """
+    Every log record of a run in one table, a column per field, with the records of
+    each test in consecutive rows.
+
+    Filters are bitsets over the rows, like keyword selections (see keywords.py):
+    each level and each logger has its rows' bitset, built once, and each test's
+    rows are a range, so narrowing to a level, a set of loggers or a test is a few
+    bitwise operations however many records the run logged. Only the rows shown are
+    then formatted.
+    """
+
+    def __init__(self, reports_by_nodeid: dict) -> None:
+        self.times = array("d")
+        self.levels = array("i")
+        self.logger_ids = array("I")
+        self.messages = []
+        self.loggers = {}  # {logger name: id}
+        self.tests = {}  # {nodeid: (first row, last row + 1)}, in row order
+        for nodeid, phases in reports_by_nodeid.items():
+            start = len(self.messages)
+            for when in ("setup", "call", "teardown"):
+                columns = getattr(phases.get(when), "pyfold_logs", None)
+                if not columns:
+                    continue
+                times, levels, loggers, messages = columns
+                self.times.extend(times)
+                self.levels.extend(levels)
+                self.logger_ids.extend(
+                    self.loggers.setdefault(logger, len(self.loggers))
+                    for logger in loggers
+                )
+                self.messages.extend(messages)
+            if len(self.messages) > start:
+                self.tests[nodeid] = (start, len(self.messages))
+        self.logger_names = list(self.loggers)
+        self.nodeids = list(self.tests)
+        self.test_starts = [start for start, _ in self.tests.values()]
+        self.everything = (1 << len(self.messages)) - 1
+
+        rows_by_level = defaultdict(list)
+        rows_by_logger = defaultdict(list)
+        for row, (level, logger_id) in enumerate(zip(self.levels, self.logger_ids)):
+            rows_by_level[level].append(row)
+            rows_by_logger[logger_id].append(row)
+        size = len(self.messages)
+        self.level_bits = {
+            level: bitset(rows, size) for level, rows in sorted(rows_by_level.items())
+        }
+        self.logger_bits = [
+            bitset(rows_by_logger[logger_id], size)
+            for logger_id in self.loggers.values()
+        ]
+        self._tests_bits = {}
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def at_least(self, level: int) -> int:
+        """The rows at 'level' or above"""
+        bits = 0
+        for row_level, rows in self.level_bits.items():
+            if row_level >= level:
+                bits |= rows
+        return bits
+
+    def from_logger(self, name: str) -> int:
+        """The rows logged by logger 'name' or its children"""
+        bits = 0
+        for logger, logger_id in self.loggers.items():
+            if logger == name or logger.startswith(name + "."):
+                bits |= self.logger_bits[logger_id]
+        return bits
+
+    def from_tests(self, part: str) -> int:
+        """The rows of the tests whose nodeid contains 'part'"""
+        bits = self._tests_bits.get(part)
+        if bits is None:
+            bits = 0
+            for nodeid, (start, end) in self.tests.items():
+                if part in nodeid:
+                    bits |= (1 << end) - (1 << start)
+            self._tests_bits[part] = bits
+        return bits
+
+    def select(self, text: str) -> int:
+        """The rows matching a log filter (see 'parse_log_filter')"""
+        level, loggers, tests = parse_log_filter(text)
+        bits = self.at_least(level) if level else self.everything
+        if loggers:
+            bits &= self._any(self.from_logger, loggers)
+        if tests:
+            bits &= self._any(self.from_tests, tests)
+        return bits
+
+    @staticmethod
+    def _any(rows_of, words: list) -> int:
+        bits = 0
+        for word in words:
+            bits |= rows_of(word)
+        return bits
+
+    def level_counts(self, bits: int) -> list:
+        """(level name, number of rows) per level among the rows of a bitset"""
+        return [
+            (logging.getLevelName(level), count(bits & rows))
+            for level, rows in self.level_bits.items()
+            if bits & rows
+        ]
+
+    def format(self, text: str, limit: int = LOG_ROWS_SHOWN) -> str:
+        """
+        The records matching a log filter, as 'time level logger message' rows under
+        a heading per test, after their counts per level
+        """
+        bits = self.select(text)
+        total = count(bits)
+        counts = ", ".join(
+            f"{number} {name}" for name, number in self.level_counts(bits)
+        )
+        lines = [
+            f"{total} of {len(self)} log records match '{text}'"
+            + (f": {counts}" if counts else "")
+        ]
+        rows = set_bits(bits, limit)
+        nodeid = None
+        for row in rows:
+            if self.nodeid_of(row) != nodeid:
+                nodeid = self.nodeid_of(row)
+                lines.extend(["", f"# {nodeid}"])
+            lines.append(self.format_row(row))
+        if total > len(rows):
+            lines.extend(["", f"... {total - len(rows)} more"])
+        return "\n".join(lines)
+
+    def nodeid_of(self, row: int) -> str:
+        return self.nodeids[bisect_right(self.test_starts, row) - 1]
+
+    def format_row(self, row: int) -> str:
+        return format_record(
+            self.times[row],
+            self.levels[row],
+            self.logger_names[self.logger_ids[row]],
+            self.messages[row],
+        )
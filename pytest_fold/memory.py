@@ -0,0 +1,180 @@
+import os
+import sys
+import tracemalloc
+from collections import defaultdict
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Allocation sites kept per test with --fold-memory-trace
+DEFAULT_TRACE_TOP = 10
+
+_PROC_STATUS = "/proc/self/status"
+_PROC_CLEAR_REFS = "/proc/self/clear_refs"
+
+
+def _status_bytes(field: str) -> int:
+    """Value of a 'kB' field (e.g. VmRSS, VmHWM) of /proc/self/status, in bytes"""
+    with open(_PROC_STATUS) as status:
+        for line in status:
+            if line.startswith(field):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's peak-RSS watermark (Linux >= 4.0); False if unsupported"""
+    try:
+        with open(_PROC_CLEAR_REFS, "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _maxrss_bytes() -> int:
+    """Process peak RSS from getrusage, in bytes (reported in kB on Linux)"""
+    if resource is None:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class MemoryTracker:
+    """
+    Measures the memory a test's call phase uses: the rise of the process's peak RSS
+    over its RSS when the call started and, when 'trace_top' is set, the Python heap
+    peak and the top allocation sites from tracemalloc.
+
+    On Linux the peak-RSS watermark is reset before each call, so every test gets its
+    own peak; elsewhere the lifetime getrusage peak is used, which only shows tests
+    that push the process to a new high.
+    """
+
+    def __init__(self, trace_top: int = 0) -> None:
+        self.trace_top = trace_top
+        self.resettable = os.path.exists(_PROC_CLEAR_REFS) and _reset_peak_rss()
+
+    def start(self):
+        """Take the 'before' measurement; returns the state to pass to 'stop'"""
+        if self.resettable:
+            _reset_peak_rss()
+            rss = _status_bytes("VmRSS")
+        else:
+            rss = _maxrss_bytes()
+        # Tracing only the call keeps snapshots small; if something else (e.g.
+        # 'python -X tracemalloc') is already tracing, diff against a snapshot instead
+        before = None
+        if self.trace_top:
+            if tracemalloc.is_tracing():
+                before = tracemalloc.take_snapshot()
+                if hasattr(tracemalloc, "reset_peak"):  # Python >= 3.9
+                    tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+        return rss, before
+
+    def stop(self, state) -> dict:
+        """
+        Take the 'after' measurement and return it as plain data, for attaching to
+        the call phase's report; allocation sites are those still holding memory
+        when the call returns:
+            {"rss_peak_delta": bytes, "py_peak": bytes or None,
+             "sites": [("filename:lineno", bytes, allocations), ...]}
+        """
+        rss, before = state
+        peak = _status_bytes("VmHWM") if self.resettable else _maxrss_bytes()
+        usage = {"rss_peak_delta": max(0, peak - rss), "py_peak": None, "sites": []}
+        if self.trace_top:
+            usage["py_peak"] = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                (tracemalloc.Filter(False, tracemalloc.__file__),)
+            )
+            if before is None:
+                tracemalloc.stop()
+                stats = [
+                    (stat.traceback[0], stat.size, stat.count)
+                    for stat in snapshot.statistics("lineno")
+                ]
+            else:
+                stats = [
+                    (stat.traceback[0], stat.size_diff, stat.count_diff)
+                    for stat in snapshot.compare_to(before, "lineno")
+                    if stat.size_diff > 0
+                ]
+            usage["sites"] = [
+                (f"{frame.filename}:{frame.lineno}", size, count)
+                for frame, size, count in stats[: self.trace_top]
+            ]
+        return usage
+
+
+def format_bytes(nbytes: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(nbytes) < 1024:
+            return f"{nbytes:.0f}{unit}" if unit == "B" else f"{nbytes:.1f}{unit}"
+        nbytes /= 1024
+    return f"{nbytes:.1f}GiB"
+
+
+class MemoryUsage:
+    """
+    Per-test memory measurements recorded by '--fold-memory' on each call phase's
+    report, with the allocation sites aggregated across the run
+    """
+
+    def __init__(self, reports_by_nodeid: dict) -> None:
+        # {nodeid: {"rss_peak_delta": ..., "py_peak": ..., "sites": [...]}}
+        self.usage = {}
+        for nodeid, phases in reports_by_nodeid.items():
+            usage = getattr(phases.get("call"), "pyfold_memory", None)
+            if usage:
+                self.usage[nodeid] = usage
+
+    def by_peak(self) -> list:
+        """[(nodeid, usage)], largest peak RSS delta first"""
+        return sorted(
+            self.usage.items(),
+            key=lambda item: (item[1]["rss_peak_delta"], item[1]["py_peak"] or 0),
+            reverse=True,
+        )
+
+    def top_sites(self) -> list:
+        """[(site, bytes, allocations, tests)] summed over all tests, largest first"""
+        sites = defaultdict(lambda: [0, 0, 0])
+        for usage in self.usage.values():
+            for site, size, count in usage["sites"]:
+                totals = sites[site]
+                totals[0] += size
+                totals[1] += count
+                totals[2] += 1
+        return sorted(
+            ((site, *totals) for site, totals in sites.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    def views(self, k: int = 50) -> dict:
+        """Text renderings of memory use, for the TUIs; empty if not recorded"""
+        if not self.usage:
+            return {}
+        by_peak = [f"{'peak RSS +':>12}  {'py peak':>12}  test"]
+        for nodeid, usage in self.by_peak()[:k]:
+            py_peak = usage["py_peak"]
+            by_peak.append(
+                f"{format_bytes(usage['rss_peak_delta']):>12}  "
+                f"{format_bytes(py_peak) if py_peak is not None else '-':>12}  {nodeid}"
+            )
+        views = {"By peak memory": "\n".join(by_peak)}
+
+        sites = self.top_sites()
+        if sites:
+            lines = [f"{'size':>12}  {'allocs':>8}  {'tests':>6}  site"]
+            lines += [
+                f"{format_bytes(size):>12}  {count:>8}  {tests:>6}  {site}"
+                for site, size, count, tests in sites[:k]
+            ]
+            views["Top allocation sites"] = "\n".join(lines)
+        return views
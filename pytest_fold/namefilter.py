@@ -0,0 +1,120 @@
+import re
+import time
+
+# Queries starting with this match test names fuzzily (as a subsequence)
+FUZZY_PREFIX = "~"
+
+# Titles per block: the unit of precomputed text and of work between time checks
+BLOCK_SIZE = 2048
+
+# Time spent filtering per keystroke (or per continuation) before yielding to the UI
+FRAME_BUDGET = 0.010
+
+# Matching test names shown in a filtered list or tree
+FILTER_ROWS_SHOWN = 200
+
+
+def name_matcher(query: str):
+    """
+    A function telling whether a lowercased name (or a block of newline-separated
+    names, of which any) matches 'query': a substring, or with FUZZY_PREFIX, a
+    subsequence within one name
+    """
+    if query.startswith(FUZZY_PREFIX):
+        pattern = re.compile("[^\n]*?".join(map(re.escape, query[1:])))
+        return lambda text: pattern.search(text) is not None
+    return lambda text: query in text
+
+
+class NameFilter:
+    """
+    Type-ahead filter over test names.
+
+    Each keystroke narrows the previous query's matches instead of rescanning every
+    name, since anything matching 'abc' also matches 'ab' (as a substring or as a
+    subsequence); completed results are kept for each prefix of the current query,
+    so backspacing is free. Names are precomputed lowercased and joined into blocks,
+    so a scan of all names skips blocks without a match in a single C-level search.
+
+    Work is done in 'advance' calls of bounded duration: the UI shows the matches
+    found so far after each, and continues until 'done'.
+    """
+
+    def __init__(self, titles) -> None:
+        self.titles = list(titles)
+        self.lowered = [title.lower() for title in self.titles]
+        self.blocks = [
+            "\n".join(self.lowered[start : start + BLOCK_SIZE])
+            for start in range(0, len(self.lowered), BLOCK_SIZE)
+        ]
+        self._everything = list(range(len(self.titles)))
+        self._completed = {}
+        self.query = ""
+        self.matches = self._everything
+        self._scan = None
+
+    @property
+    def done(self) -> bool:
+        return self._scan is None
+
+    def set_query(self, query: str) -> None:
+        """Start filtering for 'query'; call 'advance' until 'done'"""
+        query = query.lower()
+        self.query = query
+        # Only results for prefixes of the current query can be narrowed from
+        self._completed = {
+            prefix: matches
+            for prefix, matches in self._completed.items()
+            if query.startswith(prefix)
+        }
+        self._completed[""] = self._completed[FUZZY_PREFIX] = self._everything
+        if query in self._completed:
+            self.matches = self._completed[query]
+            self._scan = None
+            return
+        base_query = query
+        while base_query not in self._completed:
+            base_query = base_query[:-1]
+        self.matches = []
+        self._scan = self._narrow(
+            name_matcher(query),
+            self._completed[base_query],
+            self._completed[base_query] is self._everything,
+        )
+
+    def _narrow(self, matches, base: list, from_all: bool):
+        found = self.matches
+        lowered = self.lowered
+        if from_all:
+            for block_index, block in enumerate(self.blocks):
+                if matches(block):
+                    start = block_index * BLOCK_SIZE
+                    found.extend(
+                        index
+                        for index in range(start, start + BLOCK_SIZE)
+                        if index < len(lowered) and matches(lowered[index])
+                    )
+                yield
+        else:
+            for start in range(0, len(base), BLOCK_SIZE):
+                found.extend(
+                    index
+                    for index in base[start : start + BLOCK_SIZE]
+                    if matches(lowered[index])
+                )
+                yield
+
+    def advance(self, budget: float = FRAME_BUDGET) -> bool:
+        """Filter for up to 'budget' seconds; True once the current query is done"""
+        if self._scan is None:
+            return True
+        deadline = time.perf_counter() + budget
+        for _ in self._scan:
+            if time.perf_counter() >= deadline:
+                return False
+        self._scan = None
+        self._completed[self.query] = self.matches
+        return True
+
+    def matching_titles(self, limit: int = FILTER_ROWS_SHOWN) -> list:
+        return [self.titles[index] for index in self.matches[:limit]]
@@ -1,27 +1,32 @@
-import re
+import logging
 import pickle
-import tempfile
+import time
 import pytest
 
+from pathlib import Path
 from _pytest.config import Config
 from _pytest._io.terminalwriter import TerminalWriter
 from _pytest.reports import TestReport
+from pytest_fold.bundle import write_bundle
+from pytest_fold.capture import (
+    AsyncTerminalCapture,
+    TerminalCapture,
+    DEFAULT_QUEUE_SIZE,
+)
+from pytest_fold.cprofiling import CallProfiler, parse_cprofile_spec, write_profiles
+from pytest_fold.export import export_run
+from pytest_fold.history import RunHistory, HISTORYFILE
+from pytest_fold.live import LivePublisher
+from pytest_fold.logrecords import LogRecorder
+from pytest_fold.memory import MemoryTracker, DEFAULT_TRACE_TOP
+from pytest_fold.profiling import profiler
+from pytest_fold.query import write_index
 from pytest_fold.tui_pytermtk import main as tuitk
 from pytest_fold.tui_textual import main as tuitxt
-from pytest_fold.utils import (
-    test_session_starts_matcher,
-    errors_section_matcher,
-    failures_section_matcher,
-    warnings_summary_matcher,
-    passes_section_matcher,
-    short_test_summary_matcher,
-    lastline_matcher,
-    MARKERS,
-    REPORTFILE,
-    MARKEDTERMINALOUTPUTFILE,
-    UNMARKEDTERMINALOUTPUTFILE,
-)
-
+from pytest_fold.runstore import RunStore, DEFAULT_MAX_RUNS
+from pytest_fold.spill import CaptureSpill, MIN_CAPTURE_BUDGET, SPILLFILE
+from pytest_fold.utils import artifact_paths, merge_reports
+from pytest_fold.warningsummary import WarningCollector
 
 # Don't collect tests from any of these files
 collect_ignore = [
@@ -34,6 +39,10 @@ collect_ignore = [
 # Pytest's three phases: setup | call | teardown
 reports = []
 
+# Warnings recorded by Pytest during the test run, aggregated (see warningsummary.py);
+# set up in pytest_configure when the run is being captured
+warning_collector = None
+
 
 def pytest_addoption(parser):
     """Define the plugin's option flags as presented by Pytest"""
@@ -51,11 +60,249 @@ def pytest_addoption(parser):
         help="specify user interface ('pytermtk' ' k' | 'asciimatics' 'a' | 'textual' 't')",
         choices=["pytermtk", "k", "asciimatics", "a", "textual", "t"],
     )
+    group.addoption(
+        "--fold-max-runs",
+        action="store",
+        type=int,
+        default=DEFAULT_MAX_RUNS,
+        metavar="N",
+        help="number of runs to keep in the run store; least recently used are evicted (0: no limit)",
+    )
+    group.addoption(
+        "--fold-max-bytes",
+        action="store",
+        type=int,
+        default=0,
+        metavar="BYTES",
+        help="total size of runs to keep in the run store (0: no limit)",
+    )
+    group.addoption(
+        "--fold-history",
+        action="store_true",
+        help="record each test's outcome and durations in the run history database",
+    )
+    group.addoption(
+        "--fold-history-db",
+        action="store",
+        default=str(HISTORYFILE),
+        metavar="PATH",
+        help="run history database location (default: .pytest_fold/history.db)",
+    )
+    group.addoption(
+        "--fold-async-capture",
+        action="store_true",
+        help="classify and record terminal output on a background writer thread",
+    )
+    group.addoption(
+        "--fold-queue-size",
+        action="store",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        metavar="N",
+        help="with --fold-async-capture, max pending terminal writes before the test run waits",
+    )
+    group.addoption(
+        "--fold-capture-budget",
+        action="store",
+        type=int,
+        default=0,
+        metavar="CHARS",
+        help="with --fold, keep at most CHARS of each test's captured stdout/stderr/log "
+        "per phase, spilling the middle to the run's spill.bin (0: no limit)",
+    )
+    group.addoption(
+        "--fold-memory",
+        action="store_true",
+        help="with --fold, record each test's peak memory use during its call phase",
+    )
+    group.addoption(
+        "--fold-memory-trace",
+        action="store",
+        type=int,
+        nargs="?",
+        const=DEFAULT_TRACE_TOP,
+        default=0,
+        metavar="N",
+        help=f"with --fold-memory, also record each test's top N allocation sites with tracemalloc (default: {DEFAULT_TRACE_TOP})",
+    )
+    group.addoption(
+        "--fold-cprofile",
+        action="store",
+        type=parse_cprofile_spec,
+        default=None,
+        metavar="SPEC",
+        help="with --fold, profile tests' call phase with cProfile: 'slowest:N' keeps the N slowest, "
+        "'all' keeps every test, anything else is a -k style keyword expression",
+    )
+    group.addoption(
+        "--fold-live",
+        action="store_true",
+        help="serve results as tests complete, for 'tuitxt --live' / 'tuitk --live' started in the same directory",
+    )
+    group.addoption(
+        "--fold-rerun",
+        action="store",
+        default=None,
+        metavar="SOCKET",
+        help="send results to the TUI rerunning these tests, serving them on SOCKET (used by the TUIs' rerun action)",
+    )
+    group.addoption(
+        "--fold-junitxml",
+        action="store",
+        default=None,
+        metavar="PATH",
+        help="with --fold, export the run's results to PATH as JUnit XML at session end",
+    )
+    group.addoption(
+        "--fold-jsonl",
+        action="store",
+        default=None,
+        metavar="PATH",
+        help="with --fold, export the run's results to PATH as JSON lines (one test per line) at session end",
+    )
+    group.addoption(
+        "--fold-bundle",
+        action="store",
+        default=None,
+        metavar="PATH",
+        help="with --fold, also write the run to PATH as one compressed bundle, for 'tuitxt --bundle' / 'tuitk --bundle'",
+    )
+    group.addoption(
+        "--fold-profile",
+        action="store_true",
+        help="measure pytest-fold's own overhead and print a breakdown at session end",
+    )
+    group.addoption(
+        "--fold-profile-file",
+        action="store",
+        default=None,
+        metavar="PATH",
+        help="with --fold-profile, write the overhead breakdown to PATH as JSON instead",
+    )
+
+
+def is_xdist_worker(config: Config) -> bool:
+    """True when running inside a pytest-xdist worker process"""
+    return hasattr(config, "workerinput")
 
 
 def pytest_report_teststatus(report: TestReport, config: Config):
-    """Construct list(s) of individial TestReport instances"""
+    """
+    Construct list(s) of individial TestReport instances; with --fold-live, also
+    send each one to the live TUIs as it arrives
+    """
+    # Under pytest-xdist, the controller receives every worker's reports here; xdist
+    # attaches the (unpicklable) WorkerController as 'node', so keep just its id
+    node = getattr(report, "node", None)
+    if node is not None:
+        report.worker_id = node.workerinput["workerid"]
     reports.append(report)
+    publisher = getattr(config, "_pyfold_live", None)
+    if publisher is not None:
+        with profiler.timer("live: publish"):
+            publisher.publish(report)
+
+
+def pytest_collection_finish(session) -> None:
+    """With --fold-live, tell the live TUIs how many tests there are"""
+    publisher = getattr(session.config, "_pyfold_live", None)
+    if publisher is not None and session.items:
+        publisher.send({"type": "collected", "count": len(session.items)})
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_node_collection_finished(node, ids) -> None:
+    """Under pytest-xdist, the controller learns the number of tests from workers"""
+    publisher = getattr(node.config, "_pyfold_live", None)
+    if publisher is not None:
+        publisher.send({"type": "collected", "count": len(ids)})
+
+
+def pytest_warning_recorded(warning_message, when, nodeid, location):
+    """
+    Aggregate each warning by category, message template and location; under
+    pytest-xdist, the controller receives every worker's warnings here
+    """
+    if warning_collector is not None:
+        with profiler.timer("warning_recorded"):
+            warning_collector.add(warning_message, nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    """Time each fixture instantiation and attribute it to the item being set up"""
+    # Fixture timings are only read from stored runs
+    if not request.config.option.fold:
+        yield
+        return
+    start = time.perf_counter()
+    yield
+    item = request._pyfuncitem
+    if not hasattr(item, "_pyfold_fixtures"):
+        item._pyfold_fixtures = []
+    item._pyfold_fixtures.append(
+        (fixturedef.argname, fixturedef.scope, time.perf_counter() - start)
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """
+    With --fold-memory, measure the memory used by each test's call phase; with
+    --fold-cprofile, run selected tests' call phase under cProfile
+    """
+    tracker = getattr(item.config, "_pyfold_memory", None)
+    cprofiler = getattr(item.config, "_pyfold_cprofiler", None)
+    if cprofiler is not None and not cprofiler.wants(item):
+        cprofiler = None
+
+    if tracker is not None:
+        with profiler.timer("memory: measure"):
+            state = tracker.start()
+    if cprofiler is not None:
+        profile = cprofiler.start()
+        start = time.perf_counter()
+    yield
+    if cprofiler is not None:
+        item._pyfold_cprofile = cprofiler.stop(profile, time.perf_counter() - start)
+    if tracker is not None:
+        with profiler.timer("memory: measure"):
+            item._pyfold_memory = tracker.stop(state)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Attach fixture info to each phase's report: the fixtures instantiated during the
+    phase (name, scope, seconds), and on the setup report, every fixture the item
+    uses (name, scope). With --fold, each report also gets the phase's log records
+    as columns (see LogRecorder); with --fold-memory / --fold-cprofile, the call
+    report also gets the call phase's memory use / profile. Plain attributes
+    survive pytest-xdist's report serialization. Without --fold, nothing is
+    attached.
+    """
+    if not item.config.option.fold:
+        yield
+        return
+    outcome = yield
+    report = outcome.get_result()
+    report.pyfold_fixtures = getattr(item, "_pyfold_fixtures", [])
+    item._pyfold_fixtures = []
+    recorder = getattr(item.config, "_pyfold_logs", None)
+    if recorder is not None and recorder.messages:
+        report.pyfold_logs = recorder.take()
+    if call.when == "call" and hasattr(item, "_pyfold_memory"):
+        report.pyfold_memory = item.__dict__.pop("_pyfold_memory")
+    if call.when == "call" and item.__dict__.get("_pyfold_cprofile") is not None:
+        report.pyfold_cprofile = item.__dict__.pop("_pyfold_cprofile")
+    if call.when == "setup":
+        fixtureinfo = getattr(item, "_fixtureinfo", None)
+        name2fixturedefs = fixtureinfo.name2fixturedefs if fixtureinfo else {}
+        report.pyfold_fixturenames = [
+            (name, name2fixturedefs[name][-1].scope)
+            for name in getattr(item, "fixturenames", ())
+            if name2fixturedefs.get(name)
+        ]
 
 
 @pytest.hookimpl(trylast=True)
@@ -68,6 +315,59 @@ def pytest_configure(config: Config) -> None:
     config.option.verbose = 1  # force verbose mode for easier parsing of final test results
     config.option.reportchars = "A"  # force verbose mode for easier parsing of final test results
 
+    # Measurements are kept with the run, so are only taken with --fold
+    if config.option.fold_memory and not config.option.fold:
+        raise pytest.UsageError("--fold-memory needs --fold")
+    if config.option.fold_cprofile and not config.option.fold:
+        raise pytest.UsageError("--fold-cprofile needs --fold")
+
+    # Tests run in every process, so logs are recorded and memory is measured in
+    # xdist workers too
+    if config.option.fold:
+        config._pyfold_logs = LogRecorder()
+        logging.getLogger().addHandler(config._pyfold_logs)
+    if config.option.fold_memory:
+        config._pyfold_memory = MemoryTracker(config.option.fold_memory_trace)
+    if config.option.fold_cprofile:
+        config._pyfold_cprofiler = CallProfiler(config.option.fold_cprofile)
+
+    # Under pytest-xdist, only the controller captures output and writes artifacts;
+    # workers ship their reports to it as part of normal xdist operation
+    if is_xdist_worker(config):
+        return
+
+    config._pyfold_started = time.time()
+
+    exporting = config.option.fold_junitxml or config.option.fold_jsonl
+    if exporting and not config.option.fold:
+        raise pytest.UsageError("--fold-junitxml and --fold-jsonl need --fold")
+    if config.option.fold_bundle and not config.option.fold:
+        raise pytest.UsageError("--fold-bundle needs --fold")
+    budget = config.option.fold_capture_budget
+    if budget and not config.option.fold:
+        raise pytest.UsageError("--fold-capture-budget needs --fold")
+    if budget and budget < MIN_CAPTURE_BUDGET:
+        raise pytest.UsageError(
+            f"--fold-capture-budget must be at least {MIN_CAPTURE_BUDGET}"
+        )
+
+    if config.option.fold_live:
+        try:
+            config._pyfold_live = LivePublisher()
+        except OSError as error:
+            raise pytest.UsageError(f"--fold-live: {error}")
+    elif config.option.fold_rerun:
+        try:
+            config._pyfold_live = LivePublisher(
+                Path(config.option.fold_rerun), wait_for_tui=True
+            )
+        except OSError as error:
+            raise pytest.UsageError(f"--fold-rerun: {error}")
+
+    if config.option.fold_profile:
+        profiler.reset()
+        profiler.enabled = True
+
     if config.option.fold:
         tr = config.pluginmanager.getplugin("terminalreporter")
         if tr is not None:
@@ -77,77 +377,50 @@ def pytest_configure(config: Config) -> None:
             except AttributeError:
                 config._pyfoldfirsttime = True
 
-            config._pyfold_unmarked_outputfile = tempfile.TemporaryFile("wb+")
-            config._pyfold_marked_outputfile = tempfile.TemporaryFile("wb+")
+            # Each session gets its own directory in the run store
+            config._pyfold_store = RunStore(
+                max_runs=config.option.fold_max_runs,
+                max_bytes=config.option.fold_max_bytes,
+            )
+            config._pyfold_run_dir = config._pyfold_store.create_run()
+
+            global warning_collector
+            warning_collector = WarningCollector(config.rootpath)
+
+            if budget:
+                config._pyfold_spill = CaptureSpill(
+                    config._pyfold_run_dir / SPILLFILE, budget
+                )
+
+            if config.option.fold_async_capture:
+                config._pyfold_capture = AsyncTerminalCapture(
+                    config.option.fold_queue_size
+                )
+            else:
+                config._pyfold_capture = TerminalCapture()
+            capture_write = config._pyfold_capture.write
             oldwrite = tr._tw.write
 
-            # identify and mark each results section
+            # Write each line's text along with its markup info to console, then hand
+            # it to the capture, which identifies and marks each results section
+            def _tee_write(s, **kwargs):
+                with profiler.timer("tee_write: terminal"):
+                    oldwrite(s, **kwargs)
+                capture_write(s, **kwargs)
+
+            # With --fold-profile, each write's total time and character count is
+            # recorded; the terminal's share is timed separately in _tee_write, so
+            # the capture's share is the difference
             def tee_write(s, **kwargs):
-                if re.search(test_session_starts_matcher, s):
-                    config._pyfold_marked_outputfile.write(
-                        (MARKERS["pytest_fold_test_session_starts"] + "\n").encode(
-                            "utf-8"
-                        )
-                    )
-
-                if re.search(errors_section_matcher, s):
-                    config._pyfold_marked_outputfile.write(
-                        (MARKERS["pytest_fold_errors_section"] + "\n").encode("utf-8")
-                    )
-
-                if re.search(failures_section_matcher, s):
-                    config._pyfold_marked_outputfile.write(
-                        (MARKERS["pytest_fold_failures_section"] + "\n").encode("utf-8")
-                    )
-
-                if re.search(warnings_summary_matcher, s):
-                    config._pyfold_marked_outputfile.write(
-                        (MARKERS["pytest_fold_warnings_summary"] + "\n").encode("utf-8")
-                    )
-
-                if re.search(passes_section_matcher, s):
-                    config._pyfold_marked_outputfile.write(
-                        (MARKERS["pytest_fold_passes_section"] + "\n").encode("utf-8")
-                    )
-
-                if re.search(short_test_summary_matcher, s):
-                    config._pyfold_marked_outputfile.write(
-                        (MARKERS["pytest_fold_short_test_summary"] + "\n").encode(
-                            "utf-8"
-                        )
-                    )
-
-                if re.search(lastline_matcher, s):
-                    config._pyfold_marked_outputfile.write(
-                        (MARKERS["pytest_fold_last_line"] + "\n").encode("utf-8")
-                    )
-
-                # Write this line's text along with its markup info to console
-                oldwrite(s, **kwargs)
-
-                # Mark up this line's text by passing it to an instance of TerminalWriter's
-                # 'markup' method. Do not pass "flush" to the method or it will throw an error.
-                s1 = s
-                kwargs.pop("flush") if "flush" in kwargs.keys() else None
-                s1 = TerminalWriter().markup(s, **kwargs)
-
-                # Encode the marked up line so it can be written to the config object.
-                # The Pytest config object can be used by plugins for conveying staeful
-                # info across an entire test run session.
-                if isinstance(s1, str):
-                    marked_up = s1.encode("utf-8")
-                config._pyfold_marked_outputfile.write(marked_up)
-
-                # Write this line's original (unmarked) text to unmarked file
-                s_orig = s
-                kwargs.pop("flush") if "flush" in kwargs.keys() else None
-                s_orig = TerminalWriter().markup(s, **kwargs)
-                if isinstance(s_orig, str):
-                    unmarked_up = s_orig.encode("utf-8")
-                config._pyfold_unmarked_outputfile.write(unmarked_up)
-
-            # Write to both terminal/console and tempfiles:
-            # _pyfold_marked_outputfile, _pyfold_unmarked_outputfile
+                if not profiler.enabled:
+                    return _tee_write(s, **kwargs)
+                start = time.perf_counter()
+                try:
+                    _tee_write(s, **kwargs)
+                finally:
+                    profiler.add("tee_write", time.perf_counter() - start, len(s))
+
+            # Write to both terminal/console and the capture's tempfiles
             tr._tw.write = tee_write
 
 
@@ -155,37 +428,122 @@ def pytest_unconfigure(config: Config):
     """
     Write terminal and test results info to files for use by TUI
     """
-    # Write terminal output to file
-    if hasattr(config, "_pyfold_marked_outputfile"):
-        # get terminal contents, then write file
-        config._pyfold_marked_outputfile.seek(0)
-        markedsessionlog = config._pyfold_marked_outputfile.read()
-        config._pyfold_marked_outputfile.close()
+    if hasattr(config, "_pyfold_logs"):
+        logging.getLogger().removeHandler(config._pyfold_logs)
 
-    if hasattr(config, "_pyfold_unmarked_outputfile"):
-        # get terminal contents, then write file
-        config._pyfold_unmarked_outputfile.seek(0)
-        unmarkedsessionlog = config._pyfold_unmarked_outputfile.read()
-        config._pyfold_unmarked_outputfile.close()
+    if is_xdist_worker(config):
+        return
 
-        # Undo our patching in the terminal reporter
-        config.pluginmanager.getplugin("terminalreporter")
+    # Write terminal output to file
+    if hasattr(config, "_pyfold_capture"):
+        # get terminal contents (draining any pending writes), then write files
+        markedsessionlog, unmarkedsessionlog = config._pyfold_capture.close()
+        reportfile, markedfile, unmarkedfile = artifact_paths(config._pyfold_run_dir)
 
         # Write marked-up results to file
-        with open(MARKEDTERMINALOUTPUTFILE, "wb") as marked_file:
-            marked_file.write(markedsessionlog)
+        with profiler.timer("unconfigure: write marked output", len(markedsessionlog)):
+            with open(markedfile, "wb") as marked_file:
+                marked_file.write(markedsessionlog)
 
         # Write un-marked-up results to file
-        with open(UNMARKEDTERMINALOUTPUTFILE, "wb") as unmarked_file:
-            unmarked_file.write(unmarkedsessionlog)
+        with profiler.timer(
+            "unconfigure: write unmarked output", len(unmarkedsessionlog)
+        ):
+            with open(unmarkedfile, "wb") as unmarked_file:
+                unmarked_file.write(unmarkedsessionlog)
+
+        # Write the aggregated warnings
+        if warning_collector is not None:
+            with profiler.timer("unconfigure: write warnings"):
+                warning_collector.write(config._pyfold_run_dir)
+
+        # Write kept cProfile stats next to the other artifacts
+        if config.option.fold_cprofile:
+            with profiler.timer("unconfigure: write cprofile stats"):
+                write_profiles(
+                    reports, config._pyfold_run_dir, config.option.fold_cprofile
+                )
+
+        for report in reports:
+            report.__dict__.pop("node", None)
+
+        # The reports as stored: with --fold-capture-budget, copies of those with
+        # captured output over the budget, the middle of which goes to the spill file
+        stored_reports = reports
+        if hasattr(config, "_pyfold_spill"):
+            with profiler.timer("unconfigure: spill captured output"):
+                stored_reports = [
+                    report
+                    for phases in merge_reports(reports).values()
+                    for report in config._pyfold_spill.trim_test(phases)
+                ]
+            config._pyfold_spill.close()
 
         # Write the reports list to file
-        with open(REPORTFILE, "wb") as report_file:
-            pickle.dump(reports, report_file)
-
-    # Launch the TUI
-    if config.getoption("--fold") == True:
-        pyfold_tui(config)
+        with profiler.timer("unconfigure: write reports"):
+            with open(reportfile, "wb") as report_file:
+                pickle.dump(stored_reports, report_file)
+
+        # Write the index of tests queried by 'foldquery'
+        with profiler.timer("unconfigure: write index"):
+            write_index(stored_reports, config._pyfold_run_dir)
+
+        # Export the results from the index, if asked to
+        if config.option.fold_junitxml or config.option.fold_jsonl:
+            with profiler.timer("unconfigure: export"):
+                export_run(
+                    config._pyfold_run_dir,
+                    config.option.fold_junitxml,
+                    config.option.fold_jsonl,
+                )
+
+        # Write the run's bundle, if asked to
+        if config.option.fold_bundle:
+            with profiler.timer("unconfigure: write bundle"):
+                write_bundle(
+                    Path(config.option.fold_bundle),
+                    config._pyfold_run_dir,
+                    stored_reports,
+                )
+
+        # Make this run the latest one, and evict old runs
+        config._pyfold_store.publish(config._pyfold_run_dir)
+
+    # Tell the live TUIs the run is over, and which stored run holds its results
+    if hasattr(config, "_pyfold_live"):
+        run_dir = getattr(config, "_pyfold_run_dir", None)
+        config._pyfold_live.close(run_dir.name if run_dir else None)
+
+    # Add this run to the history database
+    if config.option.fold_history:
+        with profiler.timer("unconfigure: record history"):
+            run_dir = getattr(config, "_pyfold_run_dir", None)
+            history = RunHistory(config.option.fold_history_db)
+            history.record_run(
+                reports,
+                run_id=run_dir.name if run_dir else None,
+                started=config._pyfold_started,
+            )
+            history.close()
+
+    # Launch the TUI, unless this run's results go to the TUI that started it
+    if config.getoption("--fold") == True and not config.option.fold_rerun:
+        with profiler.timer("tui: total"):
+            pyfold_tui(config)
+
+    if profiler.enabled:
+        write_profile(config)
+
+
+def write_profile(config: Config) -> None:
+    """Print the --fold-profile breakdown, or write it as JSON if a file was given"""
+    if config.option.fold_profile_file:
+        profiler.write_json(Path(config.option.fold_profile_file))
+        return
+    tw = TerminalWriter()
+    tw.sep("=", "pytest-fold profile", bold=True)
+    for line in profiler.report_lines():
+        tw.line(line)
 
 
 def pyfold_tui(config: Config) -> None:
@@ -196,14 +554,19 @@ def pyfold_tui(config: Config) -> None:
     # disable capturing while TUI runs to avoid error `redirected stdin is pseudofile, has
     # no fileno()`; adapted from https://githubmemory.com/repo/jsbueno/terminedia/issues/25
     if config.getoption("--fold"):
+        # open this session's run, not whichever run is latest by the time the TUI starts
+        if hasattr(config, "_pyfold_run_dir"):
+            tui_args = ["--run", config._pyfold_run_dir.name]
+        else:
+            tui_args = []
         capmanager = config.pluginmanager.getplugin("capturemanager")
         try:
             capmanager.suspend_global_capture(in_=True)
         finally:
             if config.getoption("--ft") in ["k", "pytermtk"]:
-                tuitk()
+                tuitk(tui_args)
             elif config.getoption("--ft") in ["t", "textual"]:
-                tuitxt()
+                tuitxt(tui_args)
             else:
                 print(f"Incorrect choice for fold-tui: {config.getoption('--ft')}")
             capmanager.resume_global_capture()
@@ -0,0 +1,106 @@
+import inspect
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+
+class FoldProfiler:
+    """
+    Accumulates timings, call counts and byte counts for pytest-fold's own code paths
+    (terminal capture, artifact writes, Results processing and TUI construction).
+
+    Disabled by default; enabled by the '--fold-profile' option. When disabled, the
+    timer and decorator below cost a single attribute lookup per call.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.reset()
+
+    def reset(self) -> None:
+        self.times = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.nbytes = defaultdict(int)
+
+    def add(self, name: str, elapsed: float, nbytes: int = 0) -> None:
+        """Record one timed call of 'name'"""
+        self.times[name] += elapsed
+        self.calls[name] += 1
+        self.nbytes[name] += nbytes
+
+    @contextmanager
+    def timer(self, name: str, nbytes: int = 0):
+        """Time the enclosed block under 'name'"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, nbytes)
+
+    def profiled(self, name: str):
+        """Decorator that times every call of a function or coroutine under 'name'"""
+
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    start = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        self.add(name, time.perf_counter() - start)
+
+                return async_wrapper
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add(name, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def as_dict(self) -> dict:
+        """Return the collected data in a JSON-serializable form"""
+        return {
+            name: {
+                "calls": self.calls[name],
+                "seconds": self.times[name],
+                "bytes": self.nbytes[name],
+            }
+            for name in sorted(self.times)
+        }
+
+    def report_lines(self) -> list:
+        """Return a human-readable breakdown, slowest entries first"""
+        width = max((len(name) for name in self.times), default=10)
+        lines = [f"{'section':<{width}}  {'calls':>9}  {'seconds':>10}  {'bytes':>12}"]
+        for name in sorted(self.times, key=self.times.get, reverse=True):
+            lines.append(
+                f"{name:<{width}}  {self.calls[name]:>9}  {self.times[name]:>10.4f}  {self.nbytes[name]:>12}"
+            )
+        return lines
+
+    def write_json(self, path: Path) -> None:
+        """Write collected data to 'path' as JSON"""
+        with open(path, "w") as pfile:
+            json.dump(self.as_dict(), pfile, indent=2)
+
+
+# Single, process-wide profiler shared by the plugin, Results and the TUIs
+profiler = FoldProfiler()
@@ -0,0 +1,325 @@
+import argparse
+import json
+import os
+import pickle
+import re
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+from pytest_fold.keywords import KeywordIndex, set_bits
+from pytest_fold.runstore import RunStore
+from pytest_fold.utils import (
+    MARKERS,
+    REPORTFILE,
+    artifact_paths,
+    merge_reports,
+    report_category,
+)
+
+# Files in a run's directory: every test's nodeid, outcome, title and keywords, as
+# columns, and each test's failure text and captured output, at the offsets the
+# index gives, so that queries read neither the pickled reports nor the console
+INDEXFILE = "index.json"
+DETAILSFILE = "details.bin"
+
+# Outcome names on the command line, as in pytest's summary, and their categories
+OUTCOMES = {
+    "failed": "FAILED",
+    "error": "ERROR",
+    "passed": "PASSED",
+    "skipped": "SKIPPED",
+    "xfailed": "XFAIL",
+    "xpassed": "XPASS",
+}
+
+# Sections of the console output, by their names on the command line
+SECTIONS = {
+    "session": "pytest_fold_test_session_starts",
+    "errors": "pytest_fold_errors_section",
+    "failures": "pytest_fold_failures_section",
+    "warnings": "pytest_fold_warnings_summary",
+    "passes": "pytest_fold_passes_section",
+    "summary": "pytest_fold_short_test_summary",
+}
+
+# A test as listed in the index: its duration is that of all its phases, in seconds
+IndexedTest = namedtuple("IndexedTest", "nodeid category title keywords duration")
+
+
+def outcome_message(phases: dict) -> str:
+    """
+    One line on why a test did not pass: its first failure's error, or its skip or
+    xfail reason ('' for passed tests)
+    """
+    for report in phases.values():
+        if report.failed:
+            crash = getattr(report.longrepr, "reprcrash", None)
+            if crash is not None:
+                return crash.message.split("\n", 1)[0]
+            # e.g. a missing fixture
+            error = getattr(report.longrepr, "errorstring", None)
+            if error:
+                return error.strip().split("\n", 1)[0]
+            return report.longreprtext.strip().split("\n")[-1]
+        if hasattr(report, "wasxfail"):
+            return report.wasxfail
+        if report.skipped and isinstance(report.longrepr, tuple):
+            return report.longrepr[2]
+    return ""
+
+
+def details_of(phases: dict) -> dict:
+    """
+    A test's failure tracebacks, outcome message and, from its last phase, its
+    captured output
+    """
+    last = phases.get("teardown") or list(phases.values())[-1]
+    return {
+        "traceback": "\n".join(
+            report.longreprtext for report in phases.values() if report.failed
+        ),
+        "message": outcome_message(phases),
+        "caplog": last.caplog,
+        "capstderr": last.capstderr,
+        "capstdout": last.capstdout,
+    }
+
+
+def total_duration(phases: dict) -> float:
+    return sum(report.duration for report in phases.values())
+
+
+def write_index(reports: list, run_dir: Path) -> None:
+    """Write a run's index and details files (see INDEXFILE) from its reports"""
+    columns = {
+        name: [] for name in ("nodeid", "category", "title", "keywords", "duration")
+    }
+    columns["details"] = []  # [offset, length] in DETAILSFILE, or None
+    with open(run_dir / DETAILSFILE, "wb") as details_file:
+        for nodeid, phases in merge_reports(reports).items():
+            columns["nodeid"].append(nodeid)
+            columns["category"].append(report_category(phases))
+            report = next(iter(phases.values()))
+            columns["title"].append(report.head_line)
+            columns["keywords"].append(list(report.keywords))
+            columns["duration"].append(total_duration(phases))
+            details = details_of(phases)
+            if any(details.values()):
+                data = json.dumps(details).encode()
+                columns["details"].append([details_file.tell(), len(data)])
+                details_file.write(data)
+            else:
+                columns["details"].append(None)
+    with open(run_dir / INDEXFILE, "w") as index_file:
+        json.dump(columns, index_file)
+
+
+class RunIndex:
+    """
+    The tests of a stored run, for querying without the TUIs: read from the run's
+    index, or for runs stored without one, from its pickled reports (slower)
+    """
+
+    def __init__(self, run_dir: Path) -> None:
+        self.run_dir = run_dir
+        self._details_file = None
+        if (run_dir / INDEXFILE).exists():
+            with open(run_dir / INDEXFILE) as index_file:
+                columns = json.load(index_file)
+            self._details = None
+        else:
+            with open(run_dir / REPORTFILE.name, "rb") as report_file:
+                reports_by_nodeid = merge_reports(pickle.load(report_file))
+            columns = {
+                "nodeid": list(reports_by_nodeid),
+                "category": [
+                    report_category(phases) for phases in reports_by_nodeid.values()
+                ],
+                "title": [
+                    next(iter(phases.values())).head_line
+                    for phases in reports_by_nodeid.values()
+                ],
+                "keywords": [
+                    list(next(iter(phases.values())).keywords)
+                    for phases in reports_by_nodeid.values()
+                ],
+                "duration": [
+                    total_duration(phases) for phases in reports_by_nodeid.values()
+                ],
+            }
+            self._details = [
+                details_of(phases) for phases in reports_by_nodeid.values()
+            ]
+        self.columns = columns
+        self.tests = [
+            IndexedTest(*fields)
+            for fields in zip(
+                columns["nodeid"],
+                columns["category"],
+                columns["title"],
+                columns["keywords"],
+                # Indexes written before durations were added have none
+                columns.get("duration") or [0.0] * len(columns["nodeid"]),
+            )
+        ]
+
+    def select(self, outcomes=(), match: str = None, keywords: str = None) -> list:
+        """
+        Indexes of the tests with one of 'outcomes' (categories; any if empty),
+        whose nodeid matches the regular expression 'match', and which match the
+        -k-style expression 'keywords'; raises ValueError if either is invalid
+        """
+        if keywords:
+            selected = set_bits(KeywordIndex(self.tests).select(keywords))
+        else:
+            selected = range(len(self.tests))
+        if match:
+            try:
+                pattern = re.compile(match)
+            except re.error as error:
+                raise ValueError(f"invalid pattern '{match}': {error}") from error
+        return [
+            index
+            for index in selected
+            if (not outcomes or self.tests[index].category in outcomes)
+            and (not match or pattern.search(self.tests[index].nodeid))
+        ]
+
+    def details(self, index: int) -> dict:
+        """A test's traceback and captured output (see 'details_of')"""
+        if self._details is not None:
+            return self._details[index]
+        location = self.columns["details"][index]
+        if location is None:
+            return {}
+        offset, length = location
+        if self._details_file is None:
+            self._details_file = open(self.run_dir / DETAILSFILE, "rb")
+        self._details_file.seek(offset)
+        return json.loads(self._details_file.read(length))
+
+    def close(self) -> None:
+        """Close the run's details file, if a test's details were read from it"""
+        if self._details_file is not None:
+            self._details_file.close()
+            self._details_file = None
+
+    def __enter__(self) -> "RunIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def section_lines(run_dir: Path, name: str):
+    """The lines of one section of a run's console output, read up to its end"""
+    marker = MARKERS[SECTIONS[name]]
+    markers = set(MARKERS.values())
+    _, marked_file, _ = artifact_paths(run_dir)
+    with open(marked_file, encoding="utf-8", errors="replace") as marked:
+        for line in marked:
+            if line.strip() == marker:
+                break
+        else:
+            return
+        for line in marked:
+            if line.strip() in markers:
+                return
+            yield line
+
+
+def result_lines(index: RunIndex, selected: list, args: argparse.Namespace):
+    """The output lines of the 'tests', 'traceback' or 'output' command"""
+    for position in selected:
+        test = index.tests[position]
+        if args.command == "tests":
+            yield (
+                f"{test.category}\t{test.nodeid}\n" if args.long else test.nodeid + "\n"
+            )
+            continue
+        details = index.details(position)
+        if args.command == "traceback":
+            text = details.get("traceback", "")
+        else:
+            text = "".join(
+                details.get(field, "") for field in ("caplog", "capstderr", "capstdout")
+            )
+        if text:
+            yield f"# {test.nodeid}\n{text}\n"
+
+
+def write_lines(lines) -> None:
+    try:
+        sys.stdout.writelines(lines)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The output's reader (e.g. 'head') stopped reading; exit quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        prog="foldquery",
+        description="Query a stored pytest-fold run without starting a TUI",
+    )
+    parser.add_argument(
+        "--run",
+        metavar="RUN_ID",
+        default=None,
+        help="query a stored run instead of the latest one",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    tests = commands.add_parser("tests", help="list the selected tests' nodeids")
+    tests.add_argument(
+        "-l", "--long", action="store_true", help="also show each test's outcome"
+    )
+    traceback = commands.add_parser(
+        "traceback", help="print the selected tests' failure tracebacks"
+    )
+    output = commands.add_parser(
+        "output", help="print the selected tests' captured log, stderr and stdout"
+    )
+    for command in (tests, traceback, output):
+        command.add_argument(
+            "-o",
+            "--outcome",
+            action="append",
+            choices=list(OUTCOMES),
+            help="only tests with this outcome (repeatable)",
+        )
+        command.add_argument(
+            "-m", "--match", metavar="REGEX", help="only tests whose nodeid matches"
+        )
+        command.add_argument(
+            "-k", metavar="EXPRESSION", help="only tests matching a -k-style expression"
+        )
+    section = commands.add_parser(
+        "section", help="print a section of the console output"
+    )
+    section.add_argument("name", choices=list(SECTIONS))
+    args = parser.parse_args(argv)
+
+    run_dir = RunStore().open_run(args.run)
+    if run_dir is None:
+        parser.error(
+            f"no stored run with id '{args.run}'" if args.run else "no stored runs"
+        )
+
+    if args.command == "section":
+        write_lines(section_lines(run_dir, args.name))
+        return
+    with RunIndex(run_dir) as index:
+        outcomes = {OUTCOMES[outcome] for outcome in args.outcome or ()}
+        if args.command == "traceback" and not outcomes:
+            outcomes = {"FAILED", "ERROR"}
+        try:
+            selected = index.select(outcomes, args.match, args.k)
+        except ValueError as error:
+            parser.error(str(error))
+        # Lines are generated as written, reading tests' details from the index
+        write_lines(result_lines(index, selected, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from pytest_fold.grouping import CATEGORIES
+from pytest_fold.live import LiveFeed
+from pytest_fold.utils import RUNSTOREDIR
+
+
+def rerun_command(args: list, socket_path: Path) -> list:
+    """
+    The pytest command rerunning 'args' (nodeids, or nodeid prefixes such as a
+    module's path) and sending their reports to 'socket_path'. The plugin is loaded
+    by module name, with its entry point blocked, so that it is loaded once whether
+    or not pytest-fold is installed.
+    """
+    return [
+        sys.executable,
+        "-m",
+        "pytest",
+        "-p",
+        "no:pytest_fold",
+        "-p",
+        "pytest_fold.plugin",
+        "--fold-rerun",
+        str(socket_path),
+        *args,
+    ]
+
+
+class Rerun:
+    """
+    Tests rerun from a TUI. Pytest runs them in a background process, started in
+    the current directory with --fold-rerun, which serves their reports as they
+    complete just as --fold-live does (see live.py); 'take' hands the TUI those
+    completed since its last call, to merge into its results (see
+    Results.merge_tests).
+    """
+
+    def __init__(self, args: list, socket_path: Path = None) -> None:
+        self.args = list(args)
+        self.path = Path(socket_path or RUNSTOREDIR / f"rerun-{os.getpid()}.sock")
+        self.feed = LiveFeed(self.path)
+        # Pytest's console output, for telling why a rerun reported no tests
+        self.output = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            rerun_command(self.args, self.path),
+            stdin=subprocess.DEVNULL,
+            stdout=self.output,
+            stderr=subprocess.STDOUT,
+        )
+
+    def take(self) -> dict:
+        """{nodeid: {when: report}} of the tests completed since the last call"""
+        tests = {}
+        for _, title in self.feed.take():
+            nodeid = self.feed.titles[title]
+            tests[nodeid] = self.feed.tests[nodeid]
+        return tests
+
+    @property
+    def done(self) -> bool:
+        """True once pytest has exited and every completed test has been taken"""
+        if self.process.poll() is None:
+            return False
+        if self.feed.state == "waiting":
+            # Pytest exited without serving results, e.g. on a usage error
+            return True
+        if self.feed.state == "running":
+            return False
+        with self.feed.lock:
+            return not self.feed.completed
+
+    def error_line(self) -> str:
+        """The last line of pytest's output telling of an error, or its last line"""
+        self.output.seek(0)
+        lines = self.output.read().decode("utf-8", errors="replace").splitlines()
+        lines = [line.strip() for line in lines if line.strip()]
+        errors = [line for line in lines if "error" in line.lower()]
+        return (errors or lines or [""])[-1]
+
+    def summary(self) -> str:
+        """'Rerun: <count> failed, ... (<done> of <collected> tests, <state>)'"""
+        status = self.process.poll()
+        # Exit statuses other than 'all passed' and 'some failed'
+        if status not in (None, 0, 1):
+            return f"Rerun: pytest exit status {status}: {self.error_line()}"
+        if self.feed.state == "waiting":
+            return f"Rerun: starting pytest for {len(self.args)} tests"
+        with self.feed.lock:
+            counts = ", ".join(
+                f"{self.feed.counts[category]} {label}"
+                for category, label in CATEGORIES
+                if self.feed.counts[category]
+            )
+            done = sum(self.feed.counts.values())
+        collected = self.feed.collected
+        progress = f"{done} of {collected} tests" if collected else f"{done} tests"
+        return f"Rerun: {counts or 'no results yet'}  ({progress}, {self.feed.state})"
+
+    def close(self) -> None:
+        self.feed.stop()
+        self.process.wait()
+        self.output.close()
@@ -0,0 +1,206 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from pytest_fold.utils import REPORTFILE, RUNSTOREDIR
+
+DEFAULT_MAX_RUNS = 10
+LATEST = "LATEST"
+
+
+class RunStore:
+    """
+    Keeps each test session's artifacts in its own run-id directory under 'root':
+
+        <root>/runs/<run_id>/report_objects.bin
+        <root>/runs/<run_id>/marked_output.bin
+        <root>/runs/<run_id>/unmarked_output.bin
+        <root>/LATEST           (id of the most recently completed run)
+
+    so concurrent sessions in the same checkout do not clobber each other. Completed
+    runs beyond 'max_runs' or 'max_bytes' are evicted least-recently-used first, and
+    runs left without a report file by sessions that crashed or were killed are
+    evicted once a later run completes.
+    """
+
+    def __init__(
+        self,
+        root: Path = RUNSTOREDIR,
+        max_runs: int = DEFAULT_MAX_RUNS,
+        max_bytes: int = 0,
+    ) -> None:
+        self.root = Path(root)
+        self.runs_dir = self.root / "runs"
+        self.max_runs = max_runs
+        self.max_bytes = max_bytes
+
+    def create_run(self) -> Path:
+        """Create and return a new, uniquely named run directory"""
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        run_dir = self.runs_dir / run_id
+        suffix = 0
+        while True:
+            try:
+                run_dir.mkdir()
+                return run_dir
+            except FileExistsError:
+                suffix += 1
+                run_dir = self.runs_dir / f"{run_id}-{suffix}"
+
+    def publish(self, run_dir: Path) -> None:
+        """Atomically point LATEST at a completed run, then evict old runs"""
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.root, prefix=".latest-", delete=False
+        ) as tmp:
+            tmp.write(run_dir.name)
+        os.replace(tmp.name, self.root / LATEST)
+        self.evict()
+
+    def latest(self) -> str:
+        """Return the id of the most recently completed run, or None"""
+        try:
+            return (self.root / LATEST).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def open_run(self, run_id: str = None) -> Path:
+        """
+        Return the directory of run 'run_id' (default: latest), marking it as
+        recently used; None if there is no such run
+        """
+        run_id = run_id or self.latest()
+        if not run_id:
+            return None
+        run_dir = self.runs_dir / run_id
+        if not (run_dir / REPORTFILE.name).exists():
+            return None
+        os.utime(run_dir)
+        return run_dir
+
+    def runs(self) -> list:
+        """Return (run_id, last_used, size_in_bytes) for every completed run, oldest first"""
+        runs = []
+        if not self.runs_dir.is_dir():
+            return runs
+        for run_dir in self.runs_dir.iterdir():
+            if not (run_dir / REPORTFILE.name).exists():
+                continue  # still being written by a running session
+            size = sum(f.stat().st_size for f in run_dir.iterdir() if f.is_file())
+            runs.append((run_dir.name, run_dir.stat().st_mtime, size))
+        return sorted(runs, key=lambda run: run[1])
+
+    def abandoned_runs(self, before: str) -> list:
+        """
+        Return the ids of the runs started before run 'before' that have no report
+        file and whose session is no longer running
+        """
+        if not self.runs_dir.is_dir():
+            return []
+        return [
+            run_dir.name
+            for run_dir in self.runs_dir.iterdir()
+            if not (run_dir / REPORTFILE.name).exists()
+            and run_started(run_dir.name) < run_started(before)
+            and not session_running(run_dir.name)
+        ]
+
+    def evict(self) -> None:
+        """
+        Remove abandoned runs older than the latest run, then least-recently-used
+        runs until within max_runs / max_bytes
+        """
+        latest = self.latest()
+        if latest:
+            for run_id in self.abandoned_runs(latest):
+                shutil.rmtree(self.runs_dir / run_id, ignore_errors=True)
+        runs = self.runs()
+        count = len(runs)
+        total = sum(run[2] for run in runs)
+        for run_id, _, size in runs:
+            if run_id == latest:
+                continue
+            over_runs = self.max_runs and count > self.max_runs
+            over_bytes = self.max_bytes and total > self.max_bytes
+            if not (over_runs or over_bytes):
+                break
+            shutil.rmtree(self.runs_dir / run_id, ignore_errors=True)
+            count -= 1
+            total -= size
+
+
+def run_started(run_id: str) -> float:
+    """The time a run was created, from its id ('<YYYYmmdd-HHMMSS>-<pid>[-<n>]')"""
+    try:
+        return time.mktime(time.strptime(run_id[:15], "%Y%m%d-%H%M%S"))
+    except ValueError:
+        return float("inf")
+
+
+def session_running(run_id: str) -> bool:
+    """
+    Whether the process that created run 'run_id' is still running. Only known on
+    POSIX systems; elsewhere it is assumed to have exited.
+    """
+    try:
+        pid = int(run_id.split("-")[2])
+    except (IndexError, ValueError):
+        return False
+    if os.name != "posix":
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # running as another user
+    return True
+
+
+def add_run_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the run-selection options shared by the 'tuitxt' and 'tuitk' scripts"""
+    parser.add_argument(
+        "--run",
+        metavar="RUN_ID",
+        default=None,
+        help="open a stored run instead of the latest one",
+    )
+    parser.add_argument(
+        "--list-runs",
+        action="store_true",
+        help="list stored runs and exit",
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="show the results of a run started with --fold-live as its tests complete",
+    )
+    parser.add_argument(
+        "--bundle",
+        metavar="FILE",
+        default=None,
+        help="open a run bundle written with --fold-bundle (e.g. copied from CI)",
+    )
+
+
+def run_dir_from_args(parser: argparse.ArgumentParser, args) -> Path:
+    """
+    Resolve the run directory selected on the command line. Returns None when no run
+    store exists, in which case the legacy files in the current directory are used.
+    """
+    store = RunStore()
+    if args.list_runs:
+        latest = store.latest()
+        for run_id, last_used, size in reversed(store.runs()):
+            used = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(last_used))
+            marker = "  (latest)" if run_id == latest else ""
+            print(f"{run_id}  {used}  {size:>12}{marker}")
+        parser.exit()
+
+    run_dir = store.open_run(args.run)
+    if run_dir is None and args.run:
+        parser.error(f"no stored run with id '{args.run}' (see --list-runs)")
+    return run_dir
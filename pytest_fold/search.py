@@ -0,0 +1,129 @@
+import re
+from bisect import bisect_right
+from collections import defaultdict
+
+from strip_ansi import strip_ansi
+
+# Words of a query, looked up in the index
+word_matcher = re.compile(r"\w+")
+
+# Matching tests returned by a search in the TUIs
+SEARCH_LIMIT = 200
+
+# Matches listed per test, and the longest line excerpt shown for each
+MAX_LINE_MATCHES = 5
+MAX_LINE_LENGTH = 200
+
+
+class SearchIndex:
+    """
+    Full-text index over each test's output (traceback, caplog, stderr, stdout).
+
+    An inverted index maps each distinct whitespace-separated token to the tests
+    containing it. A query's words are resolved to tokens by one regex scan over the
+    vocabulary (far smaller than the output), and to candidate tests by intersecting
+    their postings; only the candidates are then searched for the exact,
+    case-insensitive query, to get match positions.
+    """
+
+    def __init__(self, bodies: dict) -> None:
+        # bodies: {test title: output text, possibly ANSI-coded}
+        self.titles = list(bodies)
+        self.positions = {title: index for index, title in enumerate(self.titles)}
+        self.texts = [
+            strip_ansi(text) if "\x1b" in text else text for text in bodies.values()
+        ]
+        self._line_starts = {}
+
+        self.postings = defaultdict(list)  # {token: [test index, ...]}
+        for index, text in enumerate(self.texts):
+            for token in set(text.lower().split()):
+                self.postings[token].append(index)
+        # All tokens, one per line, for finding the tokens containing a word
+        self.vocabulary = "\n".join(self.postings)
+
+    def _tokens_containing(self, word: str) -> set:
+        vocabulary = self.vocabulary
+        tokens = set()
+        position = vocabulary.find(word)
+        while position >= 0:
+            start = vocabulary.rfind("\n", 0, position) + 1
+            end = vocabulary.find("\n", position)
+            if end < 0:
+                end = len(vocabulary)
+            tokens.add(vocabulary[start:end])
+            position = vocabulary.find(word, end)
+        return tokens
+
+    def candidates(self, query: str) -> list:
+        """Indexes of the tests that contain every word of 'query'"""
+        words = word_matcher.findall(query.lower())
+        if not words:
+            return list(range(len(self.texts)))
+        # Words under 3 characters match too many tokens to narrow anything down; if
+        # there are longer ones, leave the short ones to the exact search
+        if any(len(word) >= 3 for word in words):
+            words = [word for word in words if len(word) >= 3]
+        docs = None
+        for word in sorted(words, key=len, reverse=True):
+            matching = set()
+            for token in self._tokens_containing(word):
+                matching.update(self.postings[token])
+            docs = matching if docs is None else docs & matching
+            if not docs:
+                return []
+        return sorted(docs)
+
+    def search(self, query: str, limit: int = None) -> dict:
+        """
+        {test title: [offset of each match in its (ANSI-stripped) text]}, for at most
+        'limit' tests
+        """
+        if not query:
+            return {}
+        matcher = re.compile(re.escape(query), re.IGNORECASE)
+        results = {}
+        for index in self.candidates(query):
+            offsets = [match.start() for match in matcher.finditer(self.texts[index])]
+            if offsets:
+                results[self.titles[index]] = offsets
+                if len(results) == limit:
+                    break
+        return results
+
+    def line_of(self, title: str, offset: int) -> tuple:
+        """(line number, column), both 1-based, of an offset into a test's text"""
+        starts = self._line_starts.get(title)
+        if starts is None:
+            text = self.texts[self.positions[title]]
+            starts = [0] + [match.end() for match in re.finditer("\n", text)]
+            self._line_starts[title] = starts
+        line = bisect_right(starts, offset)
+        return line, offset - starts[line - 1] + 1
+
+    def format_matches(self, title: str, offsets: list) -> list:
+        """'line:column  text' of a test's first matches"""
+        text = self.texts[self.positions[title]]
+        lines = []
+        for offset in offsets[:MAX_LINE_MATCHES]:
+            line, column = self.line_of(title, offset)
+            start = offset - column + 1
+            end = text.find("\n", offset)
+            content = text[start : end if end >= 0 else len(text)]
+            lines.append(f"  {line:>6}:{column:<4} {content[:MAX_LINE_LENGTH]}")
+        if len(offsets) > MAX_LINE_MATCHES:
+            lines.append(f"  ... {len(offsets) - MAX_LINE_MATCHES} more")
+        return lines
+
+    def format_results(self, query: str, results: dict, limit: int = None) -> str:
+        """
+        A text listing of search results, with the line of each match; 'limit' is
+        the one the results were searched with
+        """
+        more = "+" if limit and len(results) >= limit else ""
+        lines = [f"{len(results)}{more} tests match '{query}'"]
+        for title, offsets in results.items():
+            lines.append("")
+            lines.append(f"{title}  ({len(offsets)} matches)")
+            lines += self.format_matches(title, offsets)
+        return "\n".join(lines)
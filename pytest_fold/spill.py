@@ -0,0 +1,212 @@
+import copy
+import re
+from pathlib import Path
+
+from pytest_fold.logrecords import format_record
+
+# File in a run's directory holding the captured output left out of its reports
+SPILLFILE = "spill.bin"
+
+# Smallest --fold-capture-budget: a trimmed section's head, tail and marker line
+# must fit in the budget, so that trimming it again changes nothing
+MIN_CAPTURE_BUDGET = 1000
+_MARKER_ROOM = 200
+
+# Bytes of spilled output a TUI reads in each time its marker is scrolled into view
+SPILL_CHUNK = 128 * 1024
+
+# Logger of the record standing in for a phase's spilled log records
+SPILL_LOGGER = "pytest_fold.spill"
+
+# Line standing in for a captured section's spilled middle
+SPILL_MARKER = (
+    "[pytest-fold: {size} more bytes of {title} spilled to {file} at {offset}]"
+)
+spill_marker_matcher = re.compile(
+    r"\[pytest-fold: (\d+) more bytes of (.*?) spilled to "
+    + re.escape(SPILLFILE)
+    + r" at (\d+)\]"
+)
+
+
+def spill_marker(size: int, title: str, offset: int) -> str:
+    return SPILL_MARKER.format(size=size, title=title, file=SPILLFILE, offset=offset)
+
+
+class CaptureSpill:
+    """
+    Keeps each captured output section of a stored report (stdout, stderr, log; per
+    phase) within 'budget' characters: a longer section keeps its first and last
+    lines up to the budget, and its middle is appended to the run's spill file and
+    replaced by a marker line giving its size and offset there (see 'spill_marker').
+    A phase's structured log records (see LogRecorder) are kept within the budget
+    alike: the first and last records whose messages fit are kept, and the rest are
+    spilled as formatted rows, in their place a record whose message is the marker.
+
+    Reports are trimmed as the run's artifacts are written, as copies: the reports
+    pytest and other plugins see (its summaries, --junitxml, ...) are left whole.
+    """
+
+    def __init__(self, path: Path, budget: int) -> None:
+        self.path = Path(path)
+        self.budget = budget
+        self.file = open(self.path, "wb")
+
+    def trim_test(self, phases: dict) -> list:
+        """
+        A test's {when: report} phase reports as stored: the reports themselves, or
+        trimmed copies of those with captured sections over the budget
+        """
+        # Later phase reports repeat the sections of earlier phases, which are
+        # spilled once: {title: (length, trimmed content)}
+        spilled = {}
+        stored = []
+        for report in phases.values():
+            logs = getattr(report, "pyfold_logs", None)
+            logs_over = bool(logs) and sum(map(len, logs[3])) > self.budget
+            if not logs_over and all(
+                len(content) <= self.budget for _, content in report.sections
+            ):
+                stored.append(report)
+                continue
+            sections = []
+            for title, content in report.sections:
+                if len(content) > self.budget:
+                    length, trimmed = spilled.get(title, (None, None))
+                    if length != len(content):
+                        trimmed = self._trim(title, content)
+                        spilled[title] = (len(content), trimmed)
+                    content = trimmed
+                sections.append((title, content))
+            report = copy.copy(report)
+            report.sections = sections
+            if logs_over:
+                report.pyfold_logs = self._trim_logs(logs)
+            stored.append(report)
+        return stored
+
+    def _trim_logs(self, logs: list) -> list:
+        times, levels, loggers, messages = logs
+        keep = (self.budget - _MARKER_ROOM) // 2
+        head = 0
+        length = 0
+        while length + len(messages[head]) <= keep:
+            length += len(messages[head])
+            head += 1
+        tail = len(messages)
+        length = 0
+        while tail > head and length + len(messages[tail - 1]) <= keep:
+            length += len(messages[tail - 1])
+            tail -= 1
+        middle = "".join(
+            format_record(*record) + "\n"
+            for record in zip(
+                times[head:tail],
+                levels[head:tail],
+                loggers[head:tail],
+                messages[head:tail],
+            )
+        ).encode("utf-8", errors="replace")
+        offset = self.file.tell()
+        self.file.write(middle)
+        # At the highest level spilled, so that level filters still show where
+        # records of that level are
+        marker = (
+            times[head],
+            max(levels[head:tail]),
+            SPILL_LOGGER,
+            spill_marker(len(middle), f"{tail - head} log records", offset),
+        )
+        return [
+            [*column[:head], value, *column[tail:]]
+            for column, value in zip(logs, marker)
+        ]
+
+    def _trim(self, title: str, content: str) -> str:
+        keep = (self.budget - _MARKER_ROOM) // 2
+        # Cut at line ends, unless a line is longer than the part kept (the marker
+        # is then on the line of the text around it)
+        head_end = content.rfind("\n", 0, keep) + 1 or keep
+        tail_start = content.find("\n", len(content) - keep) + 1 or len(content) - keep
+        middle = content[head_end:tail_start].encode("utf-8", errors="replace")
+        offset = self.file.tell()
+        self.file.write(middle)
+        marker = spill_marker(len(middle), title.lower(), offset)
+        return f"{content[:head_end]}{marker}\n{content[tail_start:]}"
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class SpillReader:
+    """
+    Reads spilled output from a run's spill file, given a function opening it (the
+    file in the run's directory, or its copy in a run bundle); the file is opened
+    on first use and kept open, so reading on from the last read is cheap
+    """
+
+    def __init__(self, opener) -> None:
+        self.opener = opener
+        self.file = None
+
+    def read(self, offset: int, size: int) -> bytes:
+        if self.file is None:
+            self.file = self.opener()
+        self.file.seek(offset)
+        return self.file.read(size)
+
+
+def _whole_lines(data: bytes) -> bytes:
+    """'data' up to its last line end, or if it has none, its last whole character"""
+    if b"\n" in data:
+        return data[: data.rindex(b"\n") + 1]
+    try:
+        data.decode("utf-8")
+    except UnicodeDecodeError as error:
+        if error.start > len(data) - 4:
+            return data[: error.start]
+    return data
+
+
+class SpilledText:
+    """
+    A test's text as shown in a TUI, whose spill markers are replaced by the spilled
+    output a chunk at a time ('load'), as the TUI scrolls them into view
+    """
+
+    def __init__(self, text: str, reader: SpillReader) -> None:
+        self.text = text
+        self.reader = reader
+        self._find_gap()
+
+    def _find_gap(self) -> None:
+        self.gap = spill_marker_matcher.search(self.text)
+        # The line the first marker left is on, or None if all are loaded
+        self.gap_line = self.text.count("\n", 0, self.gap.start()) if self.gap else None
+
+    def load(self, size: int = SPILL_CHUNK) -> None:
+        """
+        Replace the first marker with the next 'size' bytes it stands for (up to a
+        line end), followed by a marker for the rest, if any
+        """
+        if self.gap is None:
+            return
+        remaining, title, offset = self.gap.groups()
+        remaining, offset = int(remaining), int(offset)
+        data = self.reader.read(offset, min(size, remaining))
+        if not data:
+            loaded = (
+                f"[pytest-fold: {remaining} bytes of {title} missing from {SPILLFILE}]"
+            )
+        elif len(data) < remaining:
+            data = _whole_lines(data)
+            loaded = data.decode("utf-8", errors="replace")
+            loaded += spill_marker(remaining - len(data), title, offset + len(data))
+        else:
+            loaded = data.decode("utf-8", errors="replace")
+            # The marker's own line end follows
+            if loaded.endswith("\n"):
+                loaded = loaded[:-1]
+        start, end = self.gap.span()
+        self.text = self.text[:start] + loaded + self.text[end:]
+        self._find_gap()
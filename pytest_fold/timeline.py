@@ -0,0 +1,175 @@
+import heapq
+from collections import defaultdict
+
+# Worker name used for tests run without pytest-xdist
+MAIN_WORKER = "main"
+
+# Gaps between consecutive tests on a worker shorter than this are not reported
+MIN_GAP_SECONDS = 0.5
+
+# Width, in characters, of the lane bars
+LANE_WIDTH = 100
+
+
+class Timeline:
+    """
+    Lays out each test as a (start, stop) bar on its worker's lane, from the
+    start/stop timestamps of its TestReports and the worker id recorded by the plugin,
+    and computes scheduling statistics: per-worker utilization, idle gaps, the
+    long tail of tests still running after other workers ran out of work, and the
+    critical path (the last worker to finish).
+    """
+
+    def __init__(self, reports_by_nodeid: dict) -> None:
+        # {worker: [(start, stop, nodeid), ...]} sorted by start
+        self.lanes = defaultdict(list)
+        for nodeid, phases in reports_by_nodeid.items():
+            starts = [getattr(report, "start", 0) for report in phases.values()]
+            stops = [getattr(report, "stop", 0) for report in phases.values()]
+            if not all(starts):
+                continue  # Pytest versions without report timestamps
+            worker = next(
+                (
+                    report.worker_id
+                    for report in phases.values()
+                    if getattr(report, "worker_id", "")
+                ),
+                MAIN_WORKER,
+            )
+            self.lanes[worker].append((min(starts), max(stops), nodeid))
+        for lane in self.lanes.values():
+            lane.sort()
+
+        self.start = min((lane[0][0] for lane in self.lanes.values()), default=0)
+        self.stop = max(
+            (max(stop for _, stop, _ in lane) for lane in self.lanes.values()),
+            default=0,
+        )
+        self.span = self.stop - self.start
+
+    def worker_stats(self) -> list:
+        """[(worker, tests, busy seconds, utilization, finished at)], by worker name"""
+        stats = []
+        for worker in sorted(self.lanes, key=_worker_order):
+            lane = self.lanes[worker]
+            busy = sum(stop - start for start, stop, _ in lane)
+            finished = max(stop for _, stop, _ in lane) - self.start
+            utilization = busy / self.span if self.span else 0.0
+            stats.append((worker, len(lane), busy, utilization, finished))
+        return stats
+
+    def idle_gaps(self, k: int = 50, min_gap: float = MIN_GAP_SECONDS) -> list:
+        """Longest k (seconds, worker, after nodeid, before nodeid) idle gaps"""
+
+        def gaps():
+            for worker, lane in self.lanes.items():
+                for (_, stop, before), (start, _, after) in zip(lane, lane[1:]):
+                    if start - stop >= min_gap:
+                        yield start - stop, worker, before, after
+
+        return heapq.nlargest(k, gaps())
+
+    def stragglers(self) -> list:
+        """
+        Tests still running after the first worker ran out of work, latest-finishing
+        first: [(seconds past that point, worker, nodeid)]
+        """
+        if len(self.lanes) < 2:
+            return []
+        first_idle = min(
+            max(stop for _, stop, _ in lane) for lane in self.lanes.values()
+        )
+        tail = [
+            (stop - first_idle, worker, nodeid)
+            for worker, lane in self.lanes.items()
+            for _, stop, nodeid in lane
+            if stop > first_idle
+        ]
+        return sorted(tail, reverse=True)
+
+    def critical_path(self) -> tuple:
+        """(worker, [(seconds, nodeid), ...] longest first) of the last worker to finish"""
+        if not self.lanes:
+            return None, []
+        worker = max(
+            self.lanes, key=lambda w: max(stop for _, stop, _ in self.lanes[w])
+        )
+        tests = sorted(
+            ((stop - start, nodeid) for start, stop, nodeid in self.lanes[worker]),
+            reverse=True,
+        )
+        return worker, tests
+
+    def lane_bars(self, width: int = LANE_WIDTH) -> list:
+        """
+        One text bar per worker: '█' where the worker was running tests, '·' where
+        idle. Each test adds +1/-1 at its first/last column of a difference array, so
+        a lane costs O(tests + width) to draw.
+        """
+        if not self.span:
+            return []
+        scale = (width - 1) / self.span
+        name_width = max(len(worker) for worker in self.lanes)
+        bars = []
+        for worker in sorted(self.lanes, key=_worker_order):
+            diff = [0] * (width + 1)
+            for start, stop, _ in self.lanes[worker]:
+                diff[int((start - self.start) * scale)] += 1
+                diff[int((stop - self.start) * scale) + 1] -= 1
+            running = 0
+            cells = []
+            for column in range(width):
+                running += diff[column]
+                cells.append("█" if running > 0 else "·")
+            bars.append(f"{worker:>{name_width}} |{''.join(cells)}|")
+        return bars
+
+    def views(self, k: int = 50) -> dict:
+        """Text renderings of the timeline and its statistics, for the TUIs"""
+        if not self.lanes:
+            return {"Timeline": "No test timestamps recorded (requires Pytest >= 7)"}
+
+        lanes = [f"{len(self.lanes)} workers, {self.span:.3f}s wall time"]
+        lanes += self.lane_bars()
+
+        stats = self.worker_stats()
+        busy = [item[2] for item in stats]
+        mean_busy = sum(busy) / len(busy)
+        workers = [
+            f"{'worker':>8}  {'tests':>7}  {'busy':>10}  {'util':>6}  {'finished':>10}"
+        ]
+        workers += [
+            f"{worker:>8}  {tests:>7}  {seconds:>9.3f}s  {util:>6.1%}  {finished:>9.3f}s"
+            for worker, tests, seconds, util, finished in stats
+        ]
+        workers.append(
+            f"load imbalance: busiest worker {max(busy) / mean_busy if mean_busy else 1:.2f}x "
+            f"the mean; finish times spread over "
+            f"{max(s[4] for s in stats) - min(s[4] for s in stats):.3f}s"
+        )
+
+        gaps = [
+            f"{seconds:>9.3f}s  {worker:>8}  after {before}  before {after}"
+            for seconds, worker, before, after in self.idle_gaps(k)
+        ]
+        stragglers = [
+            f"{seconds:>9.3f}s  {worker:>8}  {nodeid}"
+            for seconds, worker, nodeid in self.stragglers()[:k]
+        ]
+        worker, tests = self.critical_path()
+        critical = [f"last worker to finish: {worker}"]
+        critical += [f"{seconds:>9.3f}s  {nodeid}" for seconds, nodeid in tests[:k]]
+
+        return {
+            "Lanes": "\n".join(lanes),
+            "Workers": "\n".join(workers),
+            "Idle gaps": "\n".join(gaps) or "No idle gaps",
+            "Stragglers": "\n".join(stragglers) or "No long tail",
+            "Critical path": "\n".join(critical),
+        }
+
+
+def _worker_order(worker: str) -> tuple:
+    """Sort 'gw2' before 'gw10'"""
+    digits = worker.lstrip("gw")
+    return (0, int(digits), worker) if digits.isdigit() else (1, 0, worker)
@@ -1,16 +1,35 @@
-from pytest_fold.utils import OUTCOMES, Results
+from pytest_fold.bundle import RunBundle, bundle_from_args
+from pytest_fold.history import history_for_run, slower_for_run
+from pytest_fold.keywords import count
+from pytest_fold.live import LIVE_REFRESH, LIVE_ROWS_SHOWN, LIVE_SECTIONS, LiveFeed
+from pytest_fold.namefilter import FILTER_ROWS_SHOWN, NameFilter
+from pytest_fold.profiling import profiler
+from pytest_fold.rerun import Rerun
+from pytest_fold.runstore import add_run_arguments, run_dir_from_args
+from pytest_fold.search import SEARCH_LIMIT
+from pytest_fold.spill import SpillReader, SpilledText, spill_marker_matcher
+from pytest_fold.utils import (
+    OUTCOME_CATEGORIES,
+    OUTCOMES,
+    SLOWER_THAN_USUAL,
+    Results,
+)
 
+import argparse
 import platform
+import queue
 import subprocess
 import sys
 import TermTk as ttk
 
+from pathlib import Path
 from time import sleep
 
 
 class TkTui:
-    def __init__(self) -> None:
-        self.test_results = Results()
+    @profiler.profiled("TkTui.__init__")
+    def __init__(self, run_dir: Path = None, bundle: RunBundle = None) -> None:
+        self.test_results = Results(run_dir, bundle)
         self.summary_results = (
             self.test_results.Sections["LAST_LINE"]
             .content.replace("=", "")
@@ -20,6 +39,14 @@ class TkTui:
         # Create root TTk object
         self.root = ttk.TTk(layout=ttk.TTkGridLayout())
 
+        self.main_loop = MainLoop()
+
+        # Each outcome tab's list, and a function setting the titles it lists
+        self.result_lists = {}
+        self.list_setters = {}
+        self.rerun = None
+
+    @profiler.profiled("TkTui.create_top_frame")
     def create_top_frame(self) -> None:
         self.top_frame = ttk.TTkFrame(
             border=True,
@@ -30,17 +57,73 @@ class TkTui:
         )
         self.root.layout().addWidget(self.top_frame, 0, 0)
 
+    @profiler.profiled("TkTui.create_quit_button")
     def create_quit_button(self) -> None:
         self.quit_button = ttk.TTkButton(text="Quit", border=True, maxSize=(6, 3))
         self.quit_button.clicked.connect(self.root.quit)
-        self.root.layout().addWidget(self.quit_button, 0, 1)
+        self.root.layout().addWidget(self.quit_button, 0, 2)
+
+    @profiler.profiled("TkTui.create_rerun_button")
+    def create_rerun_button(self) -> None:
+        self.rerun_button = ttk.TTkButton(
+            text="Rerun selected", border=True, maxSize=(18, 3)
+        )
+        self.rerun_button.clicked.connect(self.start_rerun)
+        self.root.layout().addWidget(self.rerun_button, 0, 1)
+
+    @ttk.pyTTkSlot()
+    def start_rerun(self) -> None:
+        """
+        Rerun the tests selected in the outcome tabs in a background pytest process,
+        merging each test's new results in as it completes
+        """
+        if self.rerun is not None:
+            return
+        nodeids = [
+            item.data
+            for results_list in self.result_lists.values()
+            for item in results_list.selectedItems()
+            if item.data
+        ]
+        if not nodeids:
+            self.top_label.setText(f"{self.summary_results}  Select tests to rerun")
+            return
+        try:
+            self.rerun = Rerun(nodeids)
+        except OSError as error:
+            self.top_label.setText(f"{self.summary_results}  Cannot rerun: {error}")
+            return
+        self.merge_rerun()
+        self.main_loop.repeat(LIVE_REFRESH, self.merge_rerun)
 
+    def merge_rerun(self) -> bool:
+        """
+        Merge the tests rerun since the last call into the outcome tabs; False once
+        the rerun is done. Runs on the main loop, as the results and the lists are
+        also used by its callbacks.
+        """
+        rerun = self.rerun
+        changed = self.test_results.merge_tests(rerun.take())
+        for outcome, category in OUTCOME_CATEGORIES.items():
+            if category in changed:
+                self.list_setters[outcome](
+                    list(self.test_results.tests_by_category[category])
+                )
+        self.top_label.setText(f"{self.summary_results}  {rerun.summary()}")
+        if rerun.done:
+            rerun.close()
+            self.rerun = None
+            return False
+        return True
+
+    @profiler.profiled("TkTui.create_tab_widget")
     def create_tab_widget(self) -> None:
         # Create tabs with results from individual sections
         self.tab_widget = ttk.TTkTabWidget(border=False)
         # self.tab_widget.setPadding(3, 0, 0, 0)
-        self.root.layout().addWidget(self.tab_widget, 1, 0, 1, 2)
+        self.root.layout().addWidget(self.tab_widget, 1, 0, 1, 3)
 
+    @profiler.profiled("TkTui.create_section_tabs")
     def create_section_tabs(self) -> None:
         text = (
             self.test_results.Sections["TEST_SESSION_STARTS"].content
@@ -53,12 +136,22 @@ class TkTui:
         text_areas = {tab_label: text_area}
         self.tab_widget.addTab(text_area, f"  {tab_label}  ")
 
-        text = self.test_results.unmarked_output
+        # The full output is only read (from a bundle, decompressed) and laid out
+        # when its tab is first shown
         tab_label = "Full Output"
         text_area = ttk.TTkTextEdit(parent=self.tab_widget)
         text_areas[tab_label] = text_area
-        text_area.setText(text)
         self.tab_widget.addTab(text_area, f"  {tab_label}  ")
+        shown = False
+
+        @ttk.pyTTkSlot(int)
+        def show_full_output(index: int, text_area=text_area) -> None:
+            nonlocal shown
+            if not shown and text_area.isVisible():
+                shown = True
+                text_area.setText(self.test_results.unmarked_output)
+
+        self.tab_widget.currentChanged.connect(show_full_output)
 
         # text = self.test_results.Sections["PASSES_SECTION"].content
         # tab_label = "Passes Section"
@@ -81,53 +174,594 @@ class TkTui:
         text_areas[tab_label] = text_area
         self.tab_widget.addTab(text_area, f"  {tab_label}  ")
 
-        text = self.test_results.Sections["WARNINGS_SUMMARY"].content
-        tab_label = "Warnings"
-        text_area = ttk.TTkTextEdit(parent=self.tab_widget)
-        text_area.setText(text)
-        text_areas[tab_label] = text_area
-        self.tab_widget.addTab(text_area, f"  {tab_label}  ")
+        # Warnings aggregated by category, message and location if the run recorded
+        # them, else pytest's own warnings summary
+        if self.test_results.warning_summary:
+            self.add_list_tab("Warnings", self.test_results.warning_summary.views())
+        else:
+            text = self.test_results.Sections["WARNINGS_SUMMARY"].content
+            tab_label = "Warnings"
+            text_area = ttk.TTkTextEdit(parent=self.tab_widget)
+            text_area.setText(text)
+            text_areas[tab_label] = text_area
+            self.tab_widget.addTab(text_area, f"  {tab_label}  ")
 
+    @profiler.profiled("TkTui.create_test_result_tabs")
     def create_test_result_tabs(self) -> None:
         # Create tabs with results from individual sections
 
         for outcome in OUTCOMES:
             tab_label = outcome
+            titles = eval(f"self.test_results.tests_{outcome.lower()}")
 
+            results_frame = ttk.TTkFrame(border=False, layout=ttk.TTkVBoxLayout())
             results_list = ttk.TTkList(selectionMode=ttk.TTkK.MultiSelection)
             results_view = ttk.TTkTextEdit()
             results_view.setLineWrapMode(ttk.TTkK.WidgetWidth)
             results_view.setWordWrapMode(ttk.TTkK.WrapAnywhere)
+            stream = SpillStream(results_view, self.test_results.spill)
 
             @ttk.pyTTkSlot(str)
-            def callback(test_name: str, rlist=results_list, rview=results_view) -> None:
+            def callback(test_name: str, rlist=results_list, stream=stream) -> None:
                 ttk.TTkLog.info(f"Clicked test: {test_name}")
-                rview.clear()
+                parts = []
                 for label in rlist.selectedLabels():
-                    rview.append(ttk.TTkString(f"  # {label}", ttk.TTkColor.fg("#00FFFF")))
-                    rview.append(self.test_results.tests_all[label])
+                    parts.append(
+                        ttk.TTkString(f"  # {label}", ttk.TTkColor.fg("#00FFFF"))
+                    )
+                    parts.append(self.test_results.tests_all[label.rstrip()])
+                stream.show(*parts)
+
+            results_list.textClicked.connect(callback)
+            self.result_lists[outcome] = results_list
+            self.list_setters[outcome] = self.add_name_filter(
+                results_frame, results_list, titles, self.test_results.nodeids_by_title
+            )
+
+            results_splitter = ttk.TTkSplitter(parent=results_frame)
+            results_splitter.addWidget(
+                results_list, max([10] + [len(title) for title in titles])
+            )
+            results_splitter.addWidget(results_view)
+
+            self.tab_widget.addTab(results_frame, f"  {tab_label}  ")
+
+    def add_name_filter(self, parent, results_list, titles, nodeids: dict = None):
+        """
+        Add a type-ahead filter box over a list of test names (a substring, or a
+        fuzzy match after '~'), listing the first FILTER_ROWS_SHOWN matches, each
+        item's data being its test's nodeid from 'nodeids' ({title: nodeid}). Each
+        keystroke filters for one frame's budget, continuing on the main loop's
+        following frames until done.
+        Returns a function replacing the names, keeping the filter typed.
+        """
+        filter_row = ttk.TTkFrame(
+            parent=parent, border=False, layout=ttk.TTkHBoxLayout(), maxHeight=1
+        )
+        ttk.TTkLabel(parent=filter_row, text="Filter: ", maxWidth=8)
+        filter_box = ttk.TTkLineEdit(parent=filter_row)
+        count_label = ttk.TTkLabel(parent=filter_row, maxWidth=28)
+        name_filter = NameFilter(titles)
+        # Whether a continuation is queued on the main loop, so that keystrokes
+        # typed while filtering don't queue more
+        continuing = False
+
+        # Padding names to one width spares TTk relaying out the whole list whenever
+        # a relabelled item's width changes
+        width = max([0] + [len(title) for title in titles])
+
+        def show() -> None:
+            shown = name_filter.matching_titles()
+            set_list_items(
+                results_list,
+                [title.ljust(width) for title in shown],
+                [nodeids.get(title, "") for title in shown] if nodeids else (),
+            )
+            more = "" if name_filter.done else "+"
+            count_label.setText(
+                f" {len(name_filter.matches)}{more} of {len(titles)} tests"
+            )
+
+        def advance() -> None:
+            nonlocal continuing
+            if not name_filter.advance() and not continuing:
+                continuing = True
+                self.main_loop.call(proceed)
+            show()
+
+        def proceed() -> None:
+            nonlocal continuing
+            continuing = False
+            advance()
+
+        @ttk.pyTTkSlot(str)
+        def filter_names(text) -> None:
+            name_filter.set_query(str(text))
+            advance()
+
+        def set_titles(new_titles: list) -> None:
+            nonlocal name_filter, titles, width
+            titles = new_titles
+            width = max([width] + [len(title) for title in titles])
+            query = name_filter.query
+            name_filter = NameFilter(titles)
+            name_filter.set_query(query)
+            advance()
+
+        filter_box.textEdited.connect(filter_names)
+        show()
+        return set_titles
+
+    def add_list_tab(self, tab_label: str, entries: dict) -> None:
+        """Add a tab listing the entries' names, showing an entry's text when clicked"""
+        results_list = ttk.TTkList()
+        results_view = ttk.TTkTextEdit()
+        for name in entries:
+            results_list.addItem(name)
+
+        @ttk.pyTTkSlot(str)
+        def callback(name: str) -> None:
+            results_view.clear()
+            results_view.append(
+                ttk.TTkString(f"  # {name}", ttk.TTkColor.fg("#00FFFF"))
+            )
+            results_view.append(entries[name])
+
+        results_list.textClicked.connect(callback)
+
+        results_splitter = ttk.TTkSplitter()
+        results_splitter.addWidget(
+            results_list, max([10] + [len(name) for name in entries])
+        )
+        results_splitter.addWidget(results_view)
+        self.tab_widget.addTab(results_splitter, f"  {tab_label}  ")
+
+    @profiler.profiled("TkTui.create_groups_tab")
+    def create_groups_tab(self) -> None:
+        # Tests by directory, module, class and function, with outcome counts and
+        # durations per group; a group's children are only looked up when expanded
+        groups_tree = ttk.TTkTree()
+        groups_tree.setHeaderLabels(["Groups"])
+        results_view = ttk.TTkTextEdit()
+        stream = SpillStream(results_view, self.test_results.spill)
+        groups = {}  # {tree item: its Group}
+
+        def child_items(group) -> list:
+            children, more = group.shown_children()
+            items = []
+            for child in children:
+                item = ttk.TTkTreeWidgetItem(
+                    [child.label()],
+                    childIndicatorPolicy=(
+                        ttk.TTkK.DontShowIndicator
+                        if child.title
+                        else ttk.TTkK.ShowIndicator
+                    ),
+                )
+                groups[item] = child
+                items.append(item)
+            if more:
+                items.append(
+                    ttk.TTkTreeWidgetItem(
+                        [more], childIndicatorPolicy=ttk.TTkK.DontShowIndicator
+                    )
+                )
+            return items
+
+        @ttk.pyTTkSlot(ttk.TTkTreeWidgetItem)
+        def expand(item) -> None:
+            group = groups.get(item)
+            if group is not None and not item.children():
+                item.addChildren(child_items(group))
+
+        @ttk.pyTTkSlot(ttk.TTkTreeWidgetItem, int)
+        def callback(item, column: int) -> None:
+            group = groups.get(item)
+            if group is None:
+                return
+            header = ttk.TTkString(f"  # {group.key}", ttk.TTkColor.fg("#00FFFF"))
+            if group.title:
+                stream.show(header, self.test_results.tests_all.get(group.title, ""))
+            else:
+                stream.show(header, group.summary())
+
+        for item in child_items(self.test_results.test_tree.root):
+            groups_tree.addTopLevelItem(item)
+        groups_tree.itemExpanded.connect(expand)
+        groups_tree.itemClicked.connect(callback)
+
+        results_splitter = ttk.TTkSplitter()
+        results_splitter.addWidget(groups_tree, 60)
+        results_splitter.addWidget(results_view)
+        self.tab_widget.addTab(results_splitter, "  Groups  ")
+
+    @profiler.profiled("TkTui.create_clusters_tab")
+    def create_clusters_tab(self) -> None:
+        # Failed and errored tests grouped by root cause
+        clusters = self.test_results.failure_clusters.views()
+        if clusters:
+            self.add_list_tab("Failure clusters", clusters)
+
+    @profiler.profiled("TkTui.create_search_tab")
+    def create_search_tab(self) -> None:
+        # Search box over every test's output; lists the matching tests, and shows
+        # a test's matching lines (line:column) above its output when clicked
+        search_frame = ttk.TTkFrame(border=False, layout=ttk.TTkVBoxLayout())
+        search_box = ttk.TTkLineEdit(parent=search_frame, maxHeight=1)
+        results_list = ttk.TTkList()
+        results_view = ttk.TTkTextEdit()
+        results_view.setLineWrapMode(ttk.TTkK.WidgetWidth)
+        results_view.setWordWrapMode(ttk.TTkK.WrapAnywhere)
+        stream = SpillStream(results_view, self.test_results.spill)
+        matches = {}
+
+        @ttk.pyTTkSlot()
+        def search() -> None:
+            query = str(search_box.text())
+            index = self.test_results.search_index
+            matches.clear()
+            matches.update(index.search(query, SEARCH_LIMIT))
+            for item in list(results_list.items()):
+                results_list.removeItem(item)
+            for title in matches:
+                results_list.addItem(title)
+            stream.show(index.format_results(query, matches, SEARCH_LIMIT))
+
+        @ttk.pyTTkSlot(str)
+        def callback(title: str) -> None:
+            stream.show(
+                ttk.TTkString(f"  # {title}", ttk.TTkColor.fg("#00FFFF")),
+                *self.test_results.search_index.format_matches(
+                    title, matches.get(title, [])
+                ),
+                self.test_results.tests_all[title],
+            )
+
+        search_box.returnPressed.connect(search)
+        results_list.textClicked.connect(callback)
+
+        results_splitter = ttk.TTkSplitter(parent=search_frame)
+        results_splitter.addWidget(results_list, 40)
+        results_splitter.addWidget(results_view)
+        self.tab_widget.addTab(search_frame, "  Search  ")
 
-            width = 10
-            for result in eval(f"self.test_results.tests_{outcome.lower()}"):
-                results_list.addItem(result)
-                results_list.textClicked.connect(callback)
-                width = max(width, len(result))
+    @profiler.profiled("TkTui.create_keywords_tab")
+    def create_keywords_tab(self) -> None:
+        # Keyword expression box ('slow and not network', a module path...); lists
+        # the matching tests across all outcomes, with the count for each outcome
+        keywords_frame = ttk.TTkFrame(border=False, layout=ttk.TTkVBoxLayout())
+        keywords_box = ttk.TTkLineEdit(parent=keywords_frame, maxHeight=1)
+        results_list = ttk.TTkList()
+        results_view = ttk.TTkTextEdit()
+        results_view.setLineWrapMode(ttk.TTkK.WidgetWidth)
+        results_view.setWordWrapMode(ttk.TTkK.WrapAnywhere)
+        stream = SpillStream(results_view, self.test_results.spill)
 
+        @ttk.pyTTkSlot()
+        def select() -> None:
+            text = str(keywords_box.text())
+            index = self.test_results.keyword_index
+            try:
+                selected = index.select(text)
+            except ValueError as error:
+                set_list_items(results_list, [])
+                stream.show(str(error))
+                return
+            set_list_items(results_list, index.titles_of(selected, FILTER_ROWS_SHOWN))
+            stream.show(
+                f"{count(selected)} tests match '{text}'",
+                *(
+                    f"  {category}: {count(tests)}"
+                    for category, tests in index.by_outcome(selected).items()
+                ),
+            )
+
+        @ttk.pyTTkSlot(str)
+        def callback(title: str) -> None:
+            stream.show(
+                ttk.TTkString(f"  # {title}", ttk.TTkColor.fg("#00FFFF")),
+                self.test_results.tests_all[title],
+            )
+
+        keywords_box.returnPressed.connect(select)
+        results_list.textClicked.connect(callback)
+
+        results_splitter = ttk.TTkSplitter(parent=keywords_frame)
+        results_splitter.addWidget(results_list, 40)
+        results_splitter.addWidget(results_view)
+        self.tab_widget.addTab(keywords_frame, "  Keywords  ")
+
+    @profiler.profiled("TkTui.create_logs_tab")
+    def create_logs_tab(self) -> None:
+        # Log filter box: a level name, logger names and 'test:' nodeid parts (e.g.
+        # 'warning app.db test:test_api'); shows the matching records of every test
+        logs_frame = ttk.TTkFrame(border=False, layout=ttk.TTkVBoxLayout())
+        logs_box = ttk.TTkLineEdit(parent=logs_frame, maxHeight=1)
+        results_view = ttk.TTkTextEdit(parent=logs_frame)
+        results_view.setText(
+            "Filter log records by level, logger and test, e.g. "
+            "'warning app.db test:test_api', and press Enter"
+        )
+
+        @ttk.pyTTkSlot()
+        def select() -> None:
+            text = str(logs_box.text())
+            results_view.setText(self.test_results.log_table.format(text))
+
+        logs_box.returnPressed.connect(select)
+        self.tab_widget.addTab(logs_frame, "  Logs  ")
+
+    @profiler.profiled("TkTui.create_durations_tab")
+    def create_durations_tab(self) -> None:
+        # Slowest tests, per-module/per-class totals, a histogram of durations
+        # and setup cost per fixture
+        views = self.test_results.durations.views()
+        views.update(self.test_results.fixture_costs.views())
+        self.add_list_tab("Durations", views)
+
+    @profiler.profiled("TkTui.create_timeline_tab")
+    def create_timeline_tab(self) -> None:
+        # Per-worker lanes, utilization, idle gaps, stragglers and critical path
+        self.add_list_tab("Timeline", self.test_results.timeline.views())
+
+    @profiler.profiled("TkTui.create_memory_tab")
+    def create_memory_tab(self) -> None:
+        # Tests by peak memory and top allocation sites, if recorded with --fold-memory
+        views = self.test_results.memory.views()
+        if views:
+            self.add_list_tab("Memory", views)
+
+    @profiler.profiled("TkTui.create_cprofile_tab")
+    def create_cprofile_tab(self) -> None:
+        # Cumulative/tottime breakdowns of the tests profiled with --fold-cprofile
+        if self.test_results.call_profiles:
+            self.add_list_tab("Profiles", self.test_results.call_profiles)
+
+    @profiler.profiled("TkTui.create_history_tabs")
+    def create_history_tabs(self) -> None:
+        # Tests whose outcome changed since the previous run, and tests slower than
+        # usual compared with recent runs, if history is recorded; history is of
+        # this checkout's runs, so there is none for a bundled run
+        if self.test_results.bundle is not None:
+            return
+        histories = {
+            f"{label}: {nodeid}": text
+            for label, tests in history_for_run(self.test_results.run_dir).items()
+            for nodeid, text in tests.items()
+        }
+        if histories:
+            self.add_list_tab("History", histories)
+
+        slower = slower_for_run(self.test_results.run_dir)
+        if slower:
+            self.add_list_tab(SLOWER_THAN_USUAL, slower)
+
+
+class LiveTkTui:
+    """
+    Shows a running session's results (see LiveFeed) as tests complete: a tab per
+    outcome, and the counts so far in the top frame, updated every LIVE_REFRESH
+    seconds from a timer thread
+    """
+
+    def __init__(self, feed: LiveFeed) -> None:
+        self.feed = feed
+        self.root = ttk.TTk(layout=ttk.TTkGridLayout())
+        self.main_loop = MainLoop()
+        self.lists = {}  # {category: its tab's list}
+
+        top_frame = ttk.TTkFrame(border=True, layout=ttk.TTkHBoxLayout())
+        self.top_label = ttk.TTkLabel(parent=top_frame, text=self.feed.summary())
+        self.root.layout().addWidget(top_frame, 0, 0)
+        quit_button = ttk.TTkButton(text="Quit", border=True, maxSize=(6, 3))
+        quit_button.clicked.connect(self.root.quit)
+        self.root.layout().addWidget(quit_button, 0, 1)
+        tab_widget = ttk.TTkTabWidget(border=False)
+        self.root.layout().addWidget(tab_widget, 1, 0, 1, 2)
+
+        for category, title in LIVE_SECTIONS:
+            results_list = ttk.TTkList()
+            results_view = ttk.TTkTextEdit()
+
+            @ttk.pyTTkSlot(str)
+            def callback(test_title: str, rview=results_view) -> None:
+                rview.clear()
+                rview.append(
+                    ttk.TTkString(f"  # {test_title}", ttk.TTkColor.fg("#00FFFF"))
+                )
+                rview.append(self.feed.test_text(test_title))
+
+            results_list.textClicked.connect(callback)
             results_splitter = ttk.TTkSplitter()
-            results_splitter.addWidget(results_list, width)
+            results_splitter.addWidget(results_list, 60)
             results_splitter.addWidget(results_view)
+            tab_widget.addTab(results_splitter, f"  {title}  ")
+            self.lists[category] = results_list
+
+    def show_completed(self) -> None:
+        """Add the tests completed since the last update, and update the counts"""
+        for category, title in self.feed.take():
+            if len(self.lists[category].items()) < LIVE_ROWS_SHOWN:
+                self.lists[category].addItem(title)
+        self.top_label.setText(self.feed.summary())
+
+    def mainloop(self) -> None:
+        self.show_completed()
+        self.main_loop.repeat(LIVE_REFRESH, self.show_completed)
+        self.root.mainloop()
+
+
+def set_list_items(results_list, titles: list, nodeids: list = ()) -> None:
+    """
+    Make a list show 'titles', each item's data being the nodeid of its test if
+    'nodeids' are given: its items are relabelled in place, and only the
+    difference in length is added or removed, since each TTkList insert or removal
+    relays out the whole list
+    """
+    items = results_list.items()
+    for item in results_list.selectedItems():
+        item.selected = False
+        item.highlighted = False
+    results_list.selectedItems().clear()
+    for item in items[len(titles) :][::-1]:
+        results_list.removeItem(item)
+    nodeids = list(nodeids) or [""] * len(titles)
+    for item, title, nodeid in zip(items, titles, nodeids):
+        if item.text != title:
+            item.setText(title)
+        item.data = nodeid
+    for title, nodeid in zip(titles[len(items) :], nodeids[len(items) :]):
+        results_list.addItem(title, nodeid)
+
+
+class MainLoop(ttk.TTkWidget):
+    """
+    Runs functions on the TTk main loop, where TTk handles input and paints. Its
+    timers (TTkTimer) call their slots on their own threads, so a function to run
+    from one is queued here instead, and runs when this (never shown) widget is
+    next painted.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = queue.SimpleQueue()
+
+    def call(self, function, *args) -> None:
+        """Run 'function' on the main loop's next frame"""
+        self.calls.put((function, args))
+        self.update()
+
+    def repeat(self, interval: float, function) -> None:
+        """
+        Run 'function' on the main loop every 'interval' seconds, until it returns
+        False
+        """
+        timer = ttk.TTkTimer()
+        stopped = False
+
+        def run() -> None:
+            nonlocal stopped
+            if stopped:
+                return
+            if function() is False:
+                stopped = True
+                timer.quit()
+
+        # The timer restarts itself, so a tick is never lost waiting for a frame
+        @ttk.pyTTkSlot()
+        def tick() -> None:
+            if not stopped:
+                self.call(run)
+                timer.start(interval)
+
+        timer.timeout.connect(tick)
+        timer.start(interval)
+
+    def paintEvent(self) -> None:
+        # Only the calls queued so far: those they queue run on the next frame
+        for _ in range(self.calls.qsize()):
+            function, args = self.calls.get()
+            function(*args)
+
+
+class SpillStream:
+    """
+    Shows text in a TTkTextEdit, a part (line or block) at a time; when a spill
+    marker (see spill.py) in a part is scrolled into view, the next chunk of the
+    captured output it stands for is read in in its place
+    """
+
+    def __init__(self, view: ttk.TTkTextEdit, reader: SpillReader = None) -> None:
+        self.view = view
+        self.reader = reader
+        self.parts = []
+        self.rendering = False
+        if reader is not None:
+            view.viewport().viewMovedTo.connect(self.scrolled)
+
+    def show(self, *parts) -> None:
+        self.parts = [
+            (
+                SpilledText(part, self.reader)
+                if self.reader is not None
+                and isinstance(part, str)
+                and spill_marker_matcher.search(part)
+                else part
+            )
+            for part in parts
+        ]
+        self.render()
+        self.scrolled(0, 0)
+
+    def render(self) -> None:
+        self.rendering = True
+        try:
+            self.view.clear()
+            for part in self.parts:
+                self.view.append(part.text if isinstance(part, SpilledText) else part)
+        finally:
+            self.rendering = False
+
+    @ttk.pyTTkSlot(int, int)
+    def scrolled(self, x: int, y: int) -> None:
+        if self.rendering:
+            return
+        # Rows wrap, so a part's lines are at least as far down as its line count
+        bottom = y + self.view.viewport().height()
+        line = 0
+        loaded = False
+        for part in self.parts:
+            if isinstance(part, SpilledText):
+                while part.gap_line is not None and line + part.gap_line <= bottom:
+                    part.load()
+                    loaded = True
+                if part.gap_line is not None:
+                    break
+                text = part.text
+            else:
+                text = str(part)
+            line += text.count("\n") + 1
+        if loaded:
+            self.render()
+            self.rendering = True
+            try:
+                self.view.viewport().viewMoveTo(x, y)
+            finally:
+                self.rendering = False
 
-            self.tab_widget.addTab(results_splitter, f"  {tab_label}  ")
 
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        prog="tuitk", description="Browse pytest-fold results with the PyTermTk TUI"
+    )
+    add_run_arguments(parser)
+    args = parser.parse_args(argv)
 
-def main():
-    tui = TkTui()
+    if args.live:
+        LiveTkTui(LiveFeed()).mainloop()
+        return
+    bundle = bundle_from_args(parser, args)
+    if bundle is not None:
+        tui = TkTui(bundle=bundle)
+    else:
+        tui = TkTui(run_dir_from_args(parser, args))
 
     tui.create_top_frame()
     tui.create_quit_button()
+    tui.create_rerun_button()
     tui.create_tab_widget()
     tui.create_section_tabs()
     tui.create_test_result_tabs()
+    tui.create_groups_tab()
+    tui.create_clusters_tab()
+    tui.create_search_tab()
+    tui.create_keywords_tab()
+    tui.create_logs_tab()
+    tui.create_durations_tab()
+    tui.create_timeline_tab()
+    tui.create_memory_tab()
+    tui.create_cprofile_tab()
+    tui.create_history_tabs()
 
     tui.root.mainloop()
 
@@ -1,3 +1,6 @@
+import argparse
+
+from pathlib import Path
 from rich.console import RenderableType
 from rich.text import Text
 from rich.padding import Padding
@@ -7,7 +10,32 @@ from textual.app import App
 from textual import messages
 from textual.views import DockView, GridView
 from textual.widgets import Header, Footer, TreeControl, ScrollView, TreeClick
-from pytest_fold.utils import Results
+from pytest_fold.bundle import RunBundle, bundle_from_args
+from pytest_fold.grouping import Group
+from pytest_fold.history import history_for_run, slower_for_run
+from pytest_fold.keywords import count
+from pytest_fold.live import LIVE_REFRESH, LIVE_ROWS_SHOWN, LIVE_SECTIONS, LiveFeed
+from pytest_fold.namefilter import FILTER_ROWS_SHOWN, FRAME_BUDGET, NameFilter
+from pytest_fold.profiling import profiler
+from pytest_fold.rerun import Rerun
+from pytest_fold.runstore import add_run_arguments, run_dir_from_args
+from pytest_fold.search import SEARCH_LIMIT
+from pytest_fold.spill import SpilledText, spill_marker_matcher
+from pytest_fold.utils import Results, SLOWER_THAN_USUAL
+
+# Additional view trees, docked below the outcome trees:
+# (tree name, toggle key, header label, header style, toggle description)
+VIEW_TREES = (
+    ("clusters_tree", "g", "Failure clusters:", "bold red underline", "Clusters"),
+    ("groups_tree", "o", "Groups:", "bold cyan underline", "Groups"),
+    ("warnings_tree", "v", "Warnings:", "bold yellow underline", "Warnings"),
+    ("history_tree", "h", "History:", "bold yellow underline", "History"),
+    ("durations_tree", "d", "Durations:", "bold cyan underline", "Durations"),
+    ("timeline_tree", "t", "Timeline:", "bold cyan underline", "Timeline"),
+    ("memory_tree", "m", "Memory:", "bold cyan underline", "Memory"),
+    ("cprofile_tree", "c", "Profiles:", "bold cyan underline", "Profiles"),
+    ("slower_tree", "w", f"{SLOWER_THAN_USUAL}:", "bold yellow underline", "Slower"),
+)
 
 
 class FoldFooter(Footer):
@@ -37,12 +65,66 @@ class FoldFooter(Footer):
         return text
 
 
+class BodyView(ScrollView):
+    """
+    The view of the selected test's text: when a spill marker (see spill.py) in it
+    is scrolled into view, the next chunk of the captured output it stands for is
+    read in in its place
+    """
+
+    spilled = None
+
+    async def update(
+        self, renderable: RenderableType, home: bool = True, spilled: SpilledText = None
+    ) -> None:
+        self.spilled = spilled
+        await super().update(renderable, home)
+        await self.load_spilled(self.y)
+
+    async def watch_y(self, new_value: float) -> None:
+        await super().watch_y(new_value)
+        await self.load_spilled(new_value)
+
+    async def load_spilled(self, y: float) -> None:
+        spilled = self.spilled
+        if spilled is None:
+            return
+        # Rows wrap, so the marker is at least as far down as its line
+        bottom = y + self.size.height
+        loaded = False
+        while spilled.gap_line is not None and spilled.gap_line <= bottom:
+            spilled.load()
+            loaded = True
+        if loaded:
+            await self.window.update(Text.from_ansi(spilled.text))
+
+
 class FoldApp(App):
     """
     Textual class inherited from App
     Provides docking and data population for test session headers and results
     """
 
+    def __init__(
+        self, *args, run_dir: Path = None, bundle: RunBundle = None, **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.run_dir = run_dir
+        self.bundle = bundle
+        # Query being typed after '/' (search), 'k' (keyword filter) or 'l' (log
+        # filter), and the
+        # coroutine running it on Enter; None when no query is being typed
+        self.query_text = None
+        self.query_prompt = None
+        # Name filter being typed after 'n', or None when not typing one
+        self.name_query = None
+        self.name_filter_text = ""
+        self.name_filter_pending = False
+        # What 'r' reruns (the nodeids, or nodeid prefix, of the last clicked test
+        # or group), and the rerun in progress, if any
+        self.rerun_args = []
+        self.rerun = None
+
     async def action_toggle_tree(self, names: list) -> None:
         # self.trees = {child.name: child for child in self.children}
         if type(names) == str:
@@ -54,6 +136,205 @@ class FoldApp(App):
             widget.visible = not widget.visible  # <= 'visible' is attr on Widget class
             await self.post_message(messages.Layout(self))
 
+    async def start_query(self, prompt: str, run) -> None:
+        """Start typing a query; Enter passes it to 'run', Escape cancels"""
+        self.query_text = ""
+        self.query_prompt = (prompt, run)
+        await self.body.update(Text(f"{prompt}: ▏", style="bold"))
+
+    async def action_start_search(self) -> None:
+        """Start typing a search over every test's output"""
+        await self.start_query("Search", self.run_search)
+
+    async def run_search(self, query: str) -> None:
+        index = self.test_results.search_index
+        results = index.search(query, SEARCH_LIMIT)
+        await self.body.update(Text(index.format_results(query, results, SEARCH_LIMIT)))
+
+    async def action_start_keyword_filter(self) -> None:
+        """
+        Start typing a -k-style keyword expression (e.g. 'slow and not network', or
+        a module path) to filter the outcome trees by; an empty one clears the filter
+        """
+        await self.start_query("Keywords", self.filter_keywords)
+
+    async def filter_keywords(self, text: str) -> None:
+        index = self.test_results.keyword_index
+        try:
+            selected = index.select(text)
+        except ValueError as error:
+            await self.body.update(Text(str(error), style="bold red"))
+            return
+        counts = []
+        for tree, (category, results) in self.outcome_trees.items():
+            if not text.strip():
+                await set_tree_entries(
+                    tree, list(results), results, self.test_results.nodeids_by_title
+                )
+                continue
+            tests = selected & index.outcomes.get(category, 0)
+            await set_tree_entries(
+                tree,
+                index.titles_of(tests, FILTER_ROWS_SHOWN),
+                results,
+                self.test_results.nodeids_by_title,
+            )
+            counts.append(f"{tree.root.label.plain.rstrip(':')} {count(tests)}")
+        if counts:
+            await self.body.update(
+                Text(f"{count(selected)} tests match '{text}': " + ", ".join(counts))
+            )
+        else:
+            await self.body.update(Text(""))
+
+    async def action_start_log_filter(self) -> None:
+        """
+        Start typing a log filter: a level name, logger names and 'test:' nodeid
+        parts, e.g. 'warning app.db test:test_api'; an empty one shows every record
+        """
+        await self.start_query("Logs", self.filter_logs)
+
+    async def filter_logs(self, text: str) -> None:
+        await self.body.update(Text(self.test_results.log_table.format(text)))
+
+    async def action_start_name_filter(self) -> None:
+        """
+        Start typing a filter over the outcome trees' test names (a substring, or a
+        fuzzy match after '~'); Enter keeps it, Escape clears it
+        """
+        self.name_query = self.name_filter_text
+        await self.filter_names()
+
+    async def filter_names(self) -> None:
+        for name_filter in self.name_filters.values():
+            if name_filter.query != self.name_filter_text.lower():
+                name_filter.set_query(self.name_filter_text)
+        await self.advance_name_filters()
+
+    async def advance_name_filters(self) -> None:
+        """
+        Narrow each outcome tree's matches for a share of one frame's budget and show
+        them, continuing on a timer until every tree is done
+        """
+        self.name_filter_pending = False
+        done = True
+        matches = 0
+        for tree, name_filter in self.name_filters.items():
+            _, results = self.outcome_trees[tree]
+            done = name_filter.advance(FRAME_BUDGET / len(self.name_filters)) and done
+            matches += len(name_filter.matches)
+            await set_tree_entries(
+                tree,
+                name_filter.matching_titles(),
+                results,
+                self.test_results.nodeids_by_title,
+            )
+        if not done and not self.name_filter_pending:
+            self.name_filter_pending = True
+            self.set_timer(FRAME_BUDGET, self.advance_name_filters)
+        if self.name_query is not None:
+            more = "" if done else "+"
+            await self.body.update(
+                Text(
+                    f"Filter: {self.name_query}▏  {matches}{more} tests match",
+                    style="bold",
+                )
+            )
+
+    async def action_rerun(self) -> None:
+        """
+        Rerun the last clicked test or group in a background pytest process, merging
+        each test's new results in as it completes
+        """
+        if self.rerun is not None:
+            await self.body.update(Text("A rerun is already running", style="bold"))
+            return
+        if not self.rerun_args:
+            await self.body.update(
+                Text("Click a test or group to rerun first", style="bold")
+            )
+            return
+        try:
+            self.rerun = Rerun(self.rerun_args)
+        except OSError as error:
+            await self.body.update(Text(f"Cannot rerun: {error}", style="bold red"))
+            return
+        self.title = f"{self.summary_results.strip()}  {self.rerun.summary()}"
+        self.set_timer(LIVE_REFRESH, self.merge_rerun)
+
+    async def merge_rerun(self) -> None:
+        """Merge the tests rerun since the last call into the outcome trees"""
+        rerun = self.rerun
+        changed = self.test_results.merge_tests(rerun.take())
+        for tree, (category, results) in self.outcome_trees.items():
+            if category not in changed:
+                continue
+            self.name_filters[tree] = NameFilter(results)
+            if self.name_filter_text:
+                self.name_filters[tree].set_query(self.name_filter_text)
+            else:
+                await set_tree_entries(
+                    tree, list(results), results, self.test_results.nodeids_by_title
+                )
+        if changed and self.name_filter_text:
+            await self.advance_name_filters()
+        self.title = f"{self.summary_results.strip()}  {rerun.summary()}"
+        if rerun.done:
+            rerun.close()
+            self.rerun = None
+        else:
+            self.set_timer(LIVE_REFRESH, self.merge_rerun)
+
+    async def on_key(self, event: events.Key) -> None:
+        # While a query or name filter is being typed, keys go to it instead of the
+        # bindings; otherwise App.on_key, run after this one, presses the binding
+        if self.name_query is None and self.query_text is None:
+            return
+        event.prevent_default()
+        if self.name_query is not None:
+            await self.name_filter_key(event.key)
+            return
+        prompt, run = self.query_prompt
+        if event.key == "escape":
+            self.query_text = None
+            await self.body.update(Text(""))
+            return
+        if event.key == "enter":
+            query, self.query_text = self.query_text, None
+            await run(query)
+            return
+        if event.key in ("ctrl+h", "backspace"):
+            self.query_text = self.query_text[:-1]
+        elif len(event.key) == 1:
+            self.query_text += event.key
+        await self.body.update(Text(f"{prompt}: {self.query_text}▏", style="bold"))
+
+    async def name_filter_key(self, key: str) -> None:
+        if key == "escape":
+            self.name_query = None
+            self.name_filter_text = ""
+            for tree, name_filter in self.name_filters.items():
+                _, results = self.outcome_trees[tree]
+                name_filter.set_query("")
+                await set_tree_entries(
+                    tree, list(results), results, self.test_results.nodeids_by_title
+                )
+            await self.body.update(Text(""))
+            return
+        if key == "enter":
+            self.name_query = None
+            await self.body.update(Text(""))
+            return
+        if key in ("ctrl+h", "backspace"):
+            self.name_query = self.name_query[:-1]
+        elif len(key) == 1:
+            self.name_query += key
+        else:
+            return
+        self.name_filter_text = self.name_query
+        await self.filter_names()
+
+    @profiler.profiled("FoldApp.on_load")
     async def on_load(self, event: events.Load) -> None:
         # Populate footer with quit and toggle info
         await self.bind("u", "toggle_tree('unmarked')", "Toggle Unmarked  ⁞")
@@ -64,22 +345,62 @@ class FoldApp(App):
         await self.bind("s", "toggle_tree('skip_tree')", "Toggle Skipped  ⁞")
         await self.bind("y", "toggle_tree('xpass_tree')", "Toggle Xpass  ⁞")
         await self.bind("z", "toggle_tree('xfail_tree')", "Toggle Xfail  ⁞")
+        for name, key, _, _, description in VIEW_TREES:
+            await self.bind(key, f"toggle_tree('{name}')", f"Toggle {description}  ⁞")
+        view_tree_names = [name for name, *_ in VIEW_TREES]
         await self.bind(
             "a",
-            "toggle_tree(['unmarked', 'summary', 'error_tree', 'pass_tree', 'fail_tree', 'skip_tree', 'xpass_tree', 'xfail_tree'])",
+            f"toggle_tree({['unmarked', 'summary', 'error_tree', 'pass_tree', 'fail_tree', 'skip_tree', 'xpass_tree', 'xfail_tree'] + view_tree_names})",
             "Toggle All  ⁞",
         )
+        await self.bind("/", "start_search", "Search  ⁞")
+        await self.bind("n", "start_name_filter", "Filter  ⁞")
+        await self.bind("k", "start_keyword_filter", "Keywords  ⁞")
+        await self.bind("l", "start_log_filter", "Logs  ⁞")
+        await self.bind("r", "rerun", "Rerun  ⁞")
         await self.bind("q", "quit", "Quit")
 
         # Get test result sections
-        self.test_results = Results()
+        self.test_results = Results(self.run_dir, self.bundle)
         self.summary_results = self.test_results.Sections["LAST_LINE"].content.replace(
             "=", ""
         )
-        self.unmarked_output = self.test_results.unmarked_output
         self.marked_output = self.test_results.marked_output
+
+        # History is of this checkout's runs, so there is none for a bundled run
+        if self.bundle is None:
+            histories = history_for_run(self.run_dir)
+            slower = slower_for_run(self.run_dir)
+        else:
+            histories, slower = {}, {}
+
+        # Entries of the additional view trees (see VIEW_TREES), keyed by tree name
+        duration_views = self.test_results.durations.views()
+        duration_views.update(self.test_results.fixture_costs.views())
+        self.view_entries = {
+            # Failed and errored tests grouped by root cause
+            "clusters_tree": self.test_results.failure_clusters.views(),
+            # Tests by directory/module/class/function, expanded when clicked
+            "groups_tree": self.test_results.test_tree.root,
+            # Warnings aggregated by category, message template and location
+            "warnings_tree": self.test_results.warning_summary.views(),
+            # Tests whose outcome changed since the previous run, if history is recorded
+            "history_tree": {
+                f"{label}: {nodeid}": text
+                for label, tests in histories.items()
+                for nodeid, text in tests.items()
+            },
+            "durations_tree": duration_views,
+            "timeline_tree": self.test_results.timeline.views(),
+            # Per-test peak memory and allocation sites, if recorded with --fold-memory
+            "memory_tree": self.test_results.memory.views(),
+            # cProfile breakdowns of the tests profiled with --fold-cprofile
+            "cprofile_tree": self.test_results.call_profiles,
+            "slower_tree": slower,
+        }
         print("")
 
+    @profiler.profiled("FoldApp.on_mount")
     async def on_mount(self) -> None:
         # Create and dock header and footer widgets
         self.title = self.summary_results
@@ -89,11 +410,11 @@ class FoldApp(App):
         footer = FoldFooter()
         await self.view.dock(footer, edge="bottom")
 
-        # Stylize the results-tree section headers
+        # Stylize the results-tree section headers; clicks on a node are told apart
+        # by its data: {'full_output': True}, {'text': text}, an outcome or view
+        # tree entry's {'results': {label: text}} or a Group's {'group': group}
         self.fail_tree = TreeControl(
-            Text("Failures:", style="bold red underline"),
-            {"results": self.test_results.Sections["FAILURES_SECTION"].content},
-            name="fail_tree",
+            Text("Failures:", style="bold red underline"), {}, name="fail_tree"
         )
         self.pass_tree = TreeControl(
             Text("Passes:", style="bold green underline"), {}, name="pass_tree"
@@ -112,12 +433,13 @@ class FoldApp(App):
         )
         self.unmarked = TreeControl(
             Text("Full Output", style="dark_slate_gray2 underline"),
-            {"results": self.test_results.unmarked_output},
+            # Read when shown: from a bundle, it is decompressed
+            {"full_output": True},
             name="unmarked",
         )
         self.summary = TreeControl(
             Text("Summary", style="bold white underline"),
-            {"results": self.test_results.Sections["TEST_SESSION_STARTS"].content},
+            {"text": self.test_results.Sections["TEST_SESSION_STARTS"].content},
             name="summary",
         )
 
@@ -125,39 +447,72 @@ class FoldApp(App):
             await self.fail_tree.add(
                 self.fail_tree.root.id,
                 Text(failed),
-                {"results": self.test_results.tests_failures},
+                {
+                    "results": self.test_results.tests_failures,
+                    "nodeid": self.test_results.nodeids_by_title[failed],
+                },
             )
         for passed in self.test_results.tests_passes:
             await self.pass_tree.add(
                 self.pass_tree.root.id,
                 Text(passed),
-                {"results": self.test_results.tests_passes},
+                {
+                    "results": self.test_results.tests_passes,
+                    "nodeid": self.test_results.nodeids_by_title[passed],
+                },
             )
         for errored in self.test_results.tests_errors:
             await self.error_tree.add(
                 self.error_tree.root.id,
                 Text(errored),
-                {"results": self.test_results.tests_errors},
+                {
+                    "results": self.test_results.tests_errors,
+                    "nodeid": self.test_results.nodeids_by_title[errored],
+                },
             )
         for skipped in self.test_results.tests_skipped:
             await self.skip_tree.add(
                 self.skip_tree.root.id,
                 Text(skipped),
-                {"results": self.test_results.tests_skipped},
+                {
+                    "results": self.test_results.tests_skipped,
+                    "nodeid": self.test_results.nodeids_by_title[skipped],
+                },
             )
         for xpassed in self.test_results.tests_xpasses:
             await self.xpass_tree.add(
                 self.xpass_tree.root.id,
                 Text(xpassed),
-                {"results": self.test_results.tests_xpasses},
+                {
+                    "results": self.test_results.tests_xpasses,
+                    "nodeid": self.test_results.nodeids_by_title[xpassed],
+                },
             )
         for xfailed in self.test_results.tests_xfails:
             await self.xfail_tree.add(
                 self.xfail_tree.root.id,
                 Text(xfailed),
-                {"results": self.test_results.tests_xfails},
+                {
+                    "results": self.test_results.tests_xfails,
+                    "nodeid": self.test_results.nodeids_by_title[xfailed],
+                },
             )
 
+        # The outcome trees, with the category and results of their tests, and
+        # type-ahead filters over their test names
+        self.outcome_trees = {
+            self.fail_tree: ("FAILED", self.test_results.tests_failures),
+            self.pass_tree: ("PASSED", self.test_results.tests_passes),
+            self.error_tree: ("ERROR", self.test_results.tests_errors),
+            self.skip_tree: ("SKIPPED", self.test_results.tests_skipped),
+            self.xpass_tree: ("XPASS", self.test_results.tests_xpasses),
+            self.xfail_tree: ("XFAIL", self.test_results.tests_xfails),
+        }
+        self.name_filters = {
+            tree: NameFilter(results)
+            for tree, (_, results) in self.outcome_trees.items()
+        }
+
         await self.fail_tree.root.expand()
         await self.pass_tree.root.expand()
         await self.error_tree.root.expand()
@@ -210,6 +565,8 @@ class FoldApp(App):
             size=len(self.xpass_tree.nodes) + 2,
             name="xpass_tree",
         )
+        for name, _, label, style, _ in VIEW_TREES:
+            await self.add_view_tree(name, label, style, self.view_entries[name])
         await self.view.dock(
             ScrollView(self.unmarked),
             edge="top",
@@ -222,41 +579,177 @@ class FoldApp(App):
         await self.view.dock(self.dockview)
 
         # Create and dock the test result ('body') view
-        self.body = ScrollView()
+        self.body = BodyView()
         self.body.border = 1
         self.body.border_style = "green"
         await self.dockview.dock(self.body, edge="right")
 
+    async def add_view_tree(
+        self, name: str, label: str, style: str, entries: dict
+    ) -> None:
+        """
+        Create and dock a tree with one node per entry, showing its text when clicked,
+        or with one node per child of a Group, expanded when clicked
+        """
+        tree = TreeControl(Text(label, style=style), {}, name=name)
+        if isinstance(entries, Group):
+            await self.add_group_nodes(tree, tree.root, entries)
+        else:
+            for entry in entries:
+                await tree.add(tree.root.id, Text(entry), {"results": entries})
+        await tree.root.expand()
+        await self.view.dock(
+            ScrollView(tree), edge="top", size=len(tree.nodes) + 2, name=name
+        )
+
+    async def add_group_nodes(self, tree: TreeControl, node, group: Group) -> None:
+        """Add a node for each of a group's (first CHILDREN_SHOWN) children"""
+        children, more = group.shown_children()
+        for child in children:
+            await tree.add(node.id, Text(child.label()), {"group": child})
+        if more:
+            await tree.add(node.id, Text(more), {})
+        node.loaded = True
+
     async def handle_tree_click(self, message: TreeClick[dict]) -> None:
         label = message.node.label.plain
 
-        # Click the category headers to toggle on/off (future;
-        # right now, just ignore those clicks)
-        if label in (
-            "Failures:",
-            "Passes:",
-            "Errors:",
-            "Skipped:",
-            "Xpasses:",
-            "Xfails:",
-        ):
+        # Groups expand or collapse, showing their counts; tests show their output
+        group = message.node.data.get("group")
+        if group is not None:
+            self.rerun_args = [group.nodeid or group.key]
+            if group.title:
+                await self.show_test_text(
+                    self.test_results.tests_all.get(group.title, "")
+                )
+                return
+            else:
+                if not message.node.loaded:
+                    await self.add_group_nodes(
+                        message.node.control, message.node, group
+                    )
+                await message.node.toggle()
+                text = f"{group.key}\n{group.summary()}"
+            await self.body.update(Text.from_ansi(text))
             return
 
-        # Display results when test name is clicked
-        if "Full Output" in label or "Summary" in label:
-            self.text = message.node.data.get("results")
-        else:
-            self.text = message.node.data.get("results")[label]
+        # Display results when test name is clicked; the category headers, with no
+        # data, ignore clicks (toggling them on/off is for the future)
+        data = message.node.data
+        if data.get("full_output"):
+            self.text = self.test_results.unmarked_output
+        elif "text" in data:
+            self.text = data["text"]
+        elif "results" in data:
+            self.text = data["results"][label]
+            nodeid = data.get("nodeid")
+            self.rerun_args = [nodeid] if nodeid else []
             print("")
+        else:
+            return
+
+        await self.show_test_text(self.text)
+
+    async def show_test_text(self, text: str) -> None:
+        """Show a test's text, reading in any spilled output as it is scrolled to"""
+        spilled = None
+        if self.test_results.spill is not None and spill_marker_matcher.search(text):
+            spilled = SpilledText(text, self.test_results.spill)
+        await self.body.update(Text.from_ansi(text), spilled=spilled)
+
+
+async def set_tree_entries(
+    tree: TreeControl, entries: list, results: dict, nodeids: dict
+) -> None:
+    """
+    Replace the nodes under a tree's root with one per entry (a test title, whose
+    nodeid, from 'nodeids', is rerun when it is clicked), unless unchanged
+    """
+    if [child.label.plain for child in tree.root.children] == entries:
+        return
+    tree.root.children.clear()
+    tree.root._tree.children.clear()
+    tree.nodes = {tree.root.id: tree.root}
+    tree.cursor = tree.root.id
+    tree.cursor_line = 0
+    for entry in entries:
+        await tree.add(
+            tree.root.id, Text(entry), {"results": results, "nodeid": nodeids[entry]}
+        )
+    tree.refresh(layout=True)
+
+
+class LiveApp(App):
+    """
+    Shows a running session's results (see LiveFeed) as tests complete: a tree with
+    a branch per outcome, and the counts so far in the header, updated every
+    LIVE_REFRESH seconds
+    """
+
+    def __init__(self, *args, feed: LiveFeed = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.feed = feed
+        self.sections = {}  # {category: [its tree node, section title, test count]}
+
+    async def on_load(self, event: events.Load) -> None:
+        await self.bind("q", "quit", "Quit")
+
+    async def on_mount(self) -> None:
+        self.title = self.feed.summary()
+        await self.view.dock(Header(style="bold white on black"), edge="top", size=1)
+        await self.view.dock(FoldFooter(), edge="bottom")
+
+        self.tree = TreeControl(
+            Text("Live results:", style="bold cyan underline"), {}, name="live_tree"
+        )
+        for category, title in LIVE_SECTIONS:
+            await self.tree.add(self.tree.root.id, Text(title), {})
+            self.sections[category] = [self.tree.nodes[self.tree.id], title, 0]
+        await self.tree.root.expand()
+        for category in ("FAILED", "ERROR"):
+            await self.sections[category][0].expand()
+        await self.view.dock(ScrollView(self.tree), edge="left", size=60)
+
+        self.body = ScrollView()
+        self.body.border = 1
+        self.body.border_style = "green"
+        await self.view.dock(self.body, edge="right")
+        self.set_interval(LIVE_REFRESH, self.show_completed)
+
+    async def show_completed(self) -> None:
+        """Add the tests completed since the last update, and update the counts"""
+        for category, title in self.feed.take():
+            section = self.sections[category]
+            section[2] += 1
+            if section[2] <= LIVE_ROWS_SHOWN:
+                await self.tree.add(section[0].id, Text(title), {"title": title})
+            section[0].label = Text(f"{section[1]} ({section[2]})")
+        self.tree.refresh(layout=True)
+        self.title = self.feed.summary()
+
+    async def handle_tree_click(self, message: TreeClick[dict]) -> None:
+        title = message.node.data.get("title")
+        if title is None:
+            await message.node.toggle()
+            return
+        await self.body.update(Text.from_ansi(self.feed.test_text(title)))
 
-        text: RenderableType
-        text = Text.from_ansi(self.text)
-        await self.body.update(text)
 
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        prog="tuitxt", description="Browse pytest-fold results with the Textual TUI"
+    )
+    add_run_arguments(parser)
+    args = parser.parse_args(argv)
 
-def main():
-    app = FoldApp()
-    app.run()
+    if args.live:
+        LiveApp.run(feed=LiveFeed())
+        return
+    bundle = bundle_from_args(parser, args)
+    if bundle is not None:
+        FoldApp.run(bundle=bundle)
+        return
+    FoldApp.run(run_dir=run_dir_from_args(parser, args))
 
 
 if __name__ == "__main__":
@@ -1,7 +1,22 @@
 import re
 import pickle
+from collections import Counter
+from collections.abc import MutableMapping
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
+from pytest_fold.clustering import FailureClusters
+from pytest_fold.cprofiling import CallProfiles
+from pytest_fold.durations import Durations, FixtureCosts
+from pytest_fold.grouping import TestTree
+from pytest_fold.keywords import KeywordIndex
+from pytest_fold.logrecords import LogTable
+from pytest_fold.memory import MemoryUsage
+from pytest_fold.profiling import profiler
+from pytest_fold.search import SearchIndex
+from pytest_fold.spill import SPILLFILE, SpillReader
+from pytest_fold.timeline import Timeline
+from pytest_fold.warningsummary import WarningSummary
 from strip_ansi import strip_ansi
 from typing import Match, Pattern
 
@@ -10,6 +25,9 @@ REPORTFILE = Path.cwd() / "report_objects.bin"
 MARKEDTERMINALOUTPUTFILE = Path.cwd() / "marked_output.bin"
 UNMARKEDTERMINALOUTPUTFILE = Path.cwd() / "unmarked_output.bin"
 
+# Per-run artifact directories (see runstore.py)
+RUNSTOREDIR = Path.cwd() / ".pytest_fold"
+
 # regex matching patterns for Pytest sections
 test_session_starts_matcher = re.compile(r"^==.*\stest session starts\s==+")
 errors_section_matcher = re.compile(r"^==.*\sERRORS\s==+")
@@ -49,6 +67,14 @@ OUTCOMES = (
     "Xpasses",
 )
 
+# Category (see 'report_category') of each of the OUTCOMES
+OUTCOME_CATEGORIES = dict(
+    zip(OUTCOMES, ("FAILED", "PASSED", "ERROR", "SKIPPED", "XFAIL", "XPASS"))
+)
+
+# Bucket for tests whose duration regressed against recent runs (see history.py)
+SLOWER_THAN_USUAL = "Slower than usual"
+
 
 @dataclass
 class SectionInfo:
@@ -66,30 +92,168 @@ class TestInfo:
     """Info relevant for a single test"""
 
     title: str = ""
+    nodeid: str = ""
+    worker: str = ""
     category: str = ""
     outcome: str = ""
-    caplog: str = ""
-    capstderr: str = ""
-    capstdout: str = ""
     text: str = ""
     keywords: set = ()
+    # The test's last phase report, whose captured output is the test's; read from
+    # it when used, as for a bundled run that decompresses it (see bundle.py)
+    report: object = None
+
+    @property
+    def caplog(self) -> str:
+        return self.report.caplog if self.report is not None else ""
+
+    @property
+    def capstderr(self) -> str:
+        return self.report.capstderr if self.report is not None else ""
+
+    @property
+    def capstdout(self) -> str:
+        return self.report.capstdout if self.report is not None else ""
+
+
+class TestTexts(MutableMapping):
+    """
+    {title: text} of tests, whose texts are made when first read: a test's
+    captured output is only read in from a bundled run when shown (see bundle.py)
+    """
+
+    def __init__(self) -> None:
+        self._texts = {}  # {title: text, or a function returning it}
+
+    def defer(self, title: str, make_text) -> None:
+        self._texts[title] = make_text
+
+    def update_deferred(self, other: "TestTexts") -> None:
+        """Add the other's tests, without making their texts"""
+        self._texts.update(other._texts)
+
+    def __getitem__(self, title: str) -> str:
+        text = self._texts[title]
+        if not isinstance(text, str):
+            text = self._texts[title] = text()
+        return text
+
+    def __setitem__(self, title: str, text: str) -> None:
+        self._texts[title] = text
+
+    def __delitem__(self, title: str) -> None:
+        del self._texts[title]
+
+    def __iter__(self):
+        return iter(self._texts)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def pop(self, title: str, *default):
+        return self._texts.pop(title, *default)
+
+
+def artifact_paths(run_dir: Path = None) -> tuple:
+    """
+    Return the (report, marked, unmarked) artifact file paths for a stored run's
+    directory, or the legacy files in the current directory if no run is given
+    """
+    if run_dir is None:
+        return REPORTFILE, MARKEDTERMINALOUTPUTFILE, UNMARKEDTERMINALOUTPUTFILE
+    return (
+        run_dir / REPORTFILE.name,
+        run_dir / MARKEDTERMINALOUTPUTFILE.name,
+        run_dir / UNMARKEDTERMINALOUTPUTFILE.name,
+    )
+
+
+def merge_reports(reports: list) -> dict:
+    """
+    Merge TestReport instances - from a single process, or from any number of
+    pytest-xdist workers arriving in arbitrary order - into one index of the form
+    {nodeid: {when: report}}. Tests keep the order in which they were first reported;
+    repeated reports of the same phase (Pytest re-reports some in its summaries)
+    collapse to one.
+    """
+    merged = {}
+    for report in reports:
+        merged.setdefault(report.nodeid, {})[report.when] = report
+    return merged
+
+
+def report_category(phases: dict) -> str:
+    """
+    Derive a test's final category (as shown on the console) from its
+    {when: report} phases; see 'observations' for the rules
+    """
+    for when in ("setup", "call", "teardown"):
+        report = phases.get(when)
+        if report is None:
+            continue
+        if hasattr(report, "wasxfail"):
+            if report.skipped:
+                return "XFAIL"
+            if report.passed and when == "call":
+                return "XPASS"
+        if report.failed:
+            return "FAILED" if when == "call" else "ERROR"
+        if report.skipped:
+            return "SKIPPED"
+    return "PASSED"
 
 
 class Results:
     """
     This class holds all pertinent information for a given Pytest test run.
+    Artifacts are read from the given stored run's directory (see runstore.py),
+    from a run bundle (see bundle.py), or from the legacy files in the current
+    directory if neither is given.
     """
 
-    def __init__(self):
+    def __init__(self, run_dir: Path = None, bundle=None):
         self.reports = []
+        self.run_dir = run_dir
+        self.bundle = bundle
+        (
+            self.report_file,
+            self.marked_file,
+            self.unmarked_file,
+        ) = artifact_paths(run_dir)
 
         self.Sections = self._init_sections()
-        self.unmarked_output = self._get_unmarked_output()
-        self.marked_output = MarkedSections(self.Sections)
+        # The full console output, read when first used
+        self._unmarked_output = None
+        if bundle is not None:
+            self.marked_output = MarkedSections(self.Sections, bundle=bundle)
+        else:
+            self.marked_output = MarkedSections(self.Sections, self.marked_file)
         self.test_results = self._get_test_results()
+        # {nodeid: position in test_results} and {title: nodeid}, built on first use
+        self._positions = None
+        self._nodeids_by_title = None
+        self.durations = Durations(self.reports_by_nodeid)
+        self.fixture_costs = FixtureCosts(self.reports_by_nodeid)
+        self.timeline = Timeline(self.reports_by_nodeid)
+        self.memory = MemoryUsage(self.reports_by_nodeid)
+        self.call_profiles = CallProfiles(self.reports_by_nodeid, run_dir)
+        self.failure_clusters = FailureClusters(self.reports_by_nodeid)
+        # Captured output left out of the reports by --fold-capture-budget, read
+        # when a TUI scrolls to where it was
+        if bundle is not None:
+            self.spill = bundle.spill_reader()
+        elif run_dir is not None and (run_dir / SPILLFILE).exists():
+            self.spill = SpillReader(lambda: open(run_dir / SPILLFILE, "rb"))
+        else:
+            self.spill = None
+        self.warning_summary = WarningSummary(
+            run_dir, bundle.warnings() if bundle is not None else None
+        )
 
-        # This code presents categorized test results
+        # This code presents categorized test results; tests whose outcome cannot be
+        # read from the console (e.g. pytest-xdist's '[gw0] PASSED ...' lines) are
+        # categorized from their reports instead
         self._categorize_tests()
+        self._categorize_from_reports()
         self._update_testinfo_category()
 
         self.tests_errors = self._get_result_by_outcome("ERROR")
@@ -99,17 +263,165 @@ class Results:
         self.tests_xfails = self._get_result_by_outcome("XFAIL")
         self.tests_xpasses = self._get_result_by_outcome("XPASS")
 
-        self.tests_all = {}
-        self.tests_all.update(self.tests_errors)
-        self.tests_all.update(self.tests_passes)
-        self.tests_all.update(self.tests_failures)
-        self.tests_all.update(self.tests_skipped)
-        self.tests_all.update(self.tests_xfails)
-        self.tests_all.update(self.tests_xpasses)
+        self.tests_all = TestTexts()
+        self.tests_all.update_deferred(self.tests_errors)
+        self.tests_all.update_deferred(self.tests_passes)
+        self.tests_all.update_deferred(self.tests_failures)
+        self.tests_all.update_deferred(self.tests_skipped)
+        self.tests_all.update_deferred(self.tests_xfails)
+        self.tests_all.update_deferred(self.tests_xpasses)
 
         # Dict holding failed testnames and thei ANSI-encoded traceback info
         self.failed_tracebacks = {}
 
+        # Full-text index over each test's output, built on first search
+        self._search_index = None
+        # Keyword/marker index over the tests, built on first keyword filter
+        self._keyword_index = None
+        # Every test's log records, with per-level and per-logger filters, built on
+        # first use
+        self._log_table = None
+        # Tests grouped by nodeid (directory, module, class, function), built on
+        # first use
+        self._test_tree = None
+
+    @property
+    def unmarked_output(self) -> str:
+        if self._unmarked_output is None:
+            if self.bundle is not None:
+                self._unmarked_output = self.bundle.unmarked_output()
+            else:
+                self._unmarked_output = self._get_unmarked_output(self.unmarked_file)
+        return self._unmarked_output
+
+    @property
+    def search_index(self) -> SearchIndex:
+        if self._search_index is None:
+            with profiler.timer("Results.search_index"):
+                self._search_index = SearchIndex(
+                    {
+                        test_result.title: self._traceback_text(test_result)
+                        + test_result.caplog
+                        + test_result.capstderr
+                        + test_result.capstdout
+                        for test_result in self.test_results
+                    }
+                )
+        return self._search_index
+
+    @property
+    def keyword_index(self) -> KeywordIndex:
+        if self._keyword_index is None:
+            with profiler.timer("Results.keyword_index"):
+                self._keyword_index = KeywordIndex(self.test_results)
+        return self._keyword_index
+
+    @property
+    def log_table(self) -> LogTable:
+        if self._log_table is None:
+            with profiler.timer("Results.log_table"):
+                self._log_table = LogTable(self.reports_by_nodeid)
+        return self._log_table
+
+    @property
+    def test_tree(self) -> TestTree:
+        if self._test_tree is None:
+            with profiler.timer("Results.test_tree"):
+                self._test_tree = TestTree(self.test_results, self.durations.totals)
+        return self._test_tree
+
+    @property
+    def tests_by_category(self) -> dict:
+        """Each category's {title: text} of tests (see '_get_result_by_outcome')"""
+        return {
+            "FAILED": self.tests_failures,
+            "PASSED": self.tests_passes,
+            "ERROR": self.tests_errors,
+            "SKIPPED": self.tests_skipped,
+            "XFAIL": self.tests_xfails,
+            "XPASS": self.tests_xpasses,
+        }
+
+    @property
+    def positions(self) -> dict:
+        if self._positions is None:
+            self._positions = {
+                test_result.nodeid: position
+                for position, test_result in enumerate(self.test_results)
+            }
+        return self._positions
+
+    @property
+    def nodeids_by_title(self) -> dict:
+        """{title: nodeid} of the tests, for the TUIs' lists, which show titles"""
+        if self._nodeids_by_title is None:
+            self._nodeids_by_title = {
+                test_result.title: test_result.nodeid
+                for test_result in self.test_results
+            }
+        return self._nodeids_by_title
+
+    @profiler.profiled("Results.merge_tests")
+    def merge_tests(self, tests: dict) -> set:
+        """
+        Merge the reports of tests rerun from a TUI ({nodeid: {when: report}}, see
+        rerun.py) into the results: each test's TestInfo is replaced and its text
+        moved to its new category, and the indexes built on first use are dropped,
+        to be built again when next used. Only the given tests are read, not the
+        rest of the run. Returns the categories whose tests changed.
+        """
+        changed = set()
+        by_category = self.tests_by_category
+        for nodeid, phases in tests.items():
+            self.reports_by_nodeid[nodeid] = phases
+            # Captured output is that of the last phase, as for the run's tests
+            test_info = self._test_info_from_report(list(phases.values())[-1])
+            test_info.category = report_category(phases)
+            # Plain tracebacks: the rerun's console output is not kept
+            test_info.text = "\n".join(
+                report.longreprtext for report in phases.values() if report.failed
+            )
+            position = self.positions.get(nodeid)
+            if position is None:
+                # A new test whose title another test has is titled by its nodeid
+                if test_info.title in self.nodeids_by_title:
+                    test_info.title = nodeid
+                self.positions[nodeid] = len(self.test_results)
+                self.nodeids_by_title[test_info.title] = nodeid
+                self.test_results.append(test_info)
+            else:
+                previous = self.test_results[position]
+                by_category[previous.category].pop(previous.title, None)
+                changed.add(previous.category)
+                test_info.title = previous.title
+                self.test_results[position] = test_info
+            text = (
+                test_info.text
+                + test_info.caplog
+                + test_info.capstderr
+                + test_info.capstdout
+            )
+            by_category[test_info.category][test_info.title] = text
+            self.tests_all[test_info.title] = text
+            changed.add(test_info.category)
+        if tests:
+            self._search_index = None
+            self._keyword_index = None
+            self._log_table = None
+            self._test_tree = None
+        return changed
+
+    def _traceback_text(self, test_result: TestInfo) -> str:
+        # ANSI-coded traceback from the console if found there (it is not when the
+        # console had no color), else the plain traceback of each failed phase
+        if test_result.text:
+            return test_result.text
+        return "\n".join(
+            report.longreprtext
+            for report in self.reports_by_nodeid[test_result.nodeid].values()
+            if report.failed
+        )
+
     def _init_sections(self):
         """
         Initialize SectionInfo dataclass instances"""
@@ -157,7 +469,7 @@ class Results:
 
     def _get_test_results(self):
         """
-        Process TestReport objects from Pytest output; remove duplicates;
+        Process TestReport objects from Pytest output, one TestInfo per test;
         extract ANSI-encoded traceback info for failures.
         """
         self.failed_tracebacks = self._get_tracebacks(
@@ -166,9 +478,17 @@ class Results:
         self.passed_tracebacks = self._get_tracebacks(
             "PASSES_SECTION", ansi_passed_test_name_matcher
         )
-        processed_reports = self._process_reports()
-        return list({item.title: item for item in processed_reports}.values())
+        test_infos = self._process_reports()
+        # Tests of the same title (e.g. 'test_init' in several modules) are titled
+        # by their nodeids, so every test is listed, and their outcomes and
+        # tracebacks are read from their reports rather than the console's titles
+        titles = Counter(test_info.title for test_info in test_infos)
+        for test_info in test_infos:
+            if titles[test_info.title] > 1:
+                test_info.title = test_info.nodeid
+        return test_infos
 
+    @profiler.profiled("Results._get_tracebacks")
     def _get_tracebacks(self, section_name: str, regex: Pattern) -> dict:
         # get ANSI-coded traceback text for each test in failures section, in the
         # form of a dictionary: {'test_title': 'ansi-encoded traceback text'}
@@ -194,41 +514,60 @@ class Results:
         """Extract individual test results from full list of Pytest's TestReport instances"""
 
         test_infos = []
-        for report in self._unpickle():
-            test_info = TestInfo()
-            self.reports.append(report)
-
-            # populate the TestInfo instance with pertinent data from report
-            test_info.outcome = report.outcome
-            test_info.caplog = report.caplog
-            test_info.capstderr = report.capstderr
-            test_info.capstdout = report.capstdout
-            test_info.title = report.head_line
-            test_info.keywords = set(report.keywords)
-
-            test_infos.append(test_info)
+        if self.bundle is not None:
+            with profiler.timer("Results.bundle_reports"):
+                reports = list(self.bundle.reports())
+        else:
+            reports = self._unpickle()
+        self.reports_by_nodeid = merge_reports(reports)
+        for phases in self.reports_by_nodeid.values():
+            self.reports.extend(phases.values())
+            # Captured output is that of the test's last phase
+            test_infos.append(self._test_info_from_report(list(phases.values())[-1]))
         return test_infos
 
+    def _test_info_from_report(self, report) -> TestInfo:
+        test_info = TestInfo()
+
+        # populate the TestInfo instance with pertinent data from report
+        test_info.nodeid = report.nodeid
+        test_info.worker = getattr(report, "worker_id", "")
+        test_info.outcome = report.outcome
+        test_info.report = report
+        test_info.title = report.head_line
+        test_info.keywords = set(report.keywords)
+        return test_info
+
+    @profiler.profiled("Results._update_testinfo_category")
     def _update_testinfo_category(self):
-        for report in self.reports:
-            for test_info in self.test_results:
-
-                # for failed test cases, we want the ANSI coded output, not longreprtext,
-                # since the latter has no ANSI codes and all text will be rendered w/o markup
-                if (
-                    test_info.category == "FAILED"
-                    and report.when == "call"
-                    and test_info.title in self.failed_tracebacks
-                ):
-                    test_info.text = self.failed_tracebacks[test_info.title]
-                # if test_info.category == "PASSED" and report.when == "call" and test_info.title in self.passed_tracebacks:
-                #     test_info.text = self.passed_tracebacks[test_info.title]
+        for test_info in self.test_results:
+
+            # for failed test cases, we want the ANSI coded output, not longreprtext,
+            # since the latter has no ANSI codes and all text will be rendered w/o markup
+            if (
+                test_info.category == "FAILED"
+                and "call" in self.reports_by_nodeid[test_info.nodeid]
+                and test_info.title in self.failed_tracebacks
+            ):
+                test_info.text = self.failed_tracebacks[test_info.title]
+            # if test_info.category == "PASSED" and report.when == "call" and test_info.title in self.passed_tracebacks:
+            #     test_info.text = self.passed_tracebacks[test_info.title]
 
     def _update_test_result_by_testname(self, title: str, result: str) -> None:
-        for test_result in self.test_results:
-            if title == test_result.title:
-                test_result.category = result
-
+        nodeid = self.nodeids_by_title.get(title)
+        if nodeid is not None:
+            self.test_results[self.positions[nodeid]].category = result
+
+    @profiler.profiled("Results._categorize_from_reports")
+    def _categorize_from_reports(self) -> None:
+        """Categorize any test the console parse missed, from its phase reports"""
+        for test_info in self.test_results:
+            if not test_info.category:
+                test_info.category = report_category(
+                    self.reports_by_nodeid[test_info.nodeid]
+                )
+
+    @profiler.profiled("Results._categorize_tests")
     def _categorize_tests(self) -> None:
         """
         Extract test title and outcome from each line.
@@ -271,27 +610,32 @@ class Results:
                 self._update_test_result_by_testname(title, outcome)
                 title = outcome = None
 
-    def _get_result_by_outcome(self, outcome: str) -> None:
-        # dict of {testname: log+stderr+stdout) for each test, per-outcome
-        if outcome == "FAILED":
-            return {
-                test_result.title: test_result.text
-                for test_result in self.test_results
-                if test_result.category == outcome
-            }
-        else:
-            return {
-                test_result.title: test_result.text
-                + test_result.caplog
-                + test_result.capstderr
-                + test_result.capstdout
-                for test_result in self.test_results
-                if test_result.category == outcome
-            }
+    @profiler.profiled("Results._get_result_by_outcome")
+    def _get_result_by_outcome(self, outcome: str) -> TestTexts:
+        # TestTexts of {testname: log+stderr+stdout) for each test, per-outcome
+        texts = TestTexts()
+        for test_result in self.test_results:
+            if test_result.category == outcome:
+                texts.defer(test_result.title, partial(self._result_text, test_result))
+        return texts
+
+    def _result_text(self, test_result: TestInfo) -> str:
+        # A test profiled with --fold-cprofile shows its profile after its output
+        profile = self.call_profiles.test_text(test_result.nodeid)
+        if test_result.category == "FAILED":
+            return self._traceback_text(test_result) + profile
+        return (
+            test_result.text
+            + test_result.caplog
+            + test_result.capstderr
+            + test_result.capstdout
+            + profile
+        )
 
+    @profiler.profiled("Results._unpickle")
     def _unpickle(self):
         """Unpack pickled Pytest TestReport objects from file"""
-        with open(REPORTFILE, "rb") as rfile:
+        with open(self.report_file, "rb") as rfile:
             return pickle.load(rfile)
 
 
@@ -312,9 +656,18 @@ class MarkedSections:
     """
 
     def __init__(
-        self, Sections: dict, marked_file_path: Path = MARKEDTERMINALOUTPUTFILE
+        self,
+        Sections: dict,
+        marked_file_path: Path = MARKEDTERMINALOUTPUTFILE,
+        bundle=None,
     ) -> None:
         self.Sections = Sections
+        if bundle is not None:
+            # A bundle stores each section apart, read when first used
+            self.Sections.update(bundle.sections(self.Sections))
+            self._marked_lines = None
+            self._sections = self.Sections
+            return
         self._marked_lines = self._get_marked_lines(marked_file_path)
         self._sections = self._sectionize(self._marked_lines)
         print("")
@@ -334,7 +687,7 @@ class MarkedSections:
         self, marked_file_path: Path = MARKEDTERMINALOUTPUTFILE
     ) -> list:
         """Return a list of all lines from the marked output file"""
-        with open(MARKEDTERMINALOUTPUTFILE, "r") as mfile:
+        with open(marked_file_path, "r") as mfile:
             return mfile.readlines()
 
     def _line_is_a_marker(self, line: str) -> bool:
@@ -353,18 +706,24 @@ class MarkedSections:
             else False
         )
 
+    @profiler.profiled("MarkedSections._sectionize")
     def _sectionize(self, lines: list) -> dict:
         """
         Parse marked lines from test run console output;
         build dictionary of SectionInfo objects
         """
         section_name = ""
+        # Each section's lines, joined once at the end: appending to a section's
+        # content line by line copies it over and over
+        section_lines = {}
 
         for line in lines:
             if self._line_is_a_marker(line):
                 section_name = re.search(section_name_matcher, line).groups()[0]
-                self.Sections[section_name].content = r""
+                section_lines[section_name] = []
             elif section_name:
-                self.Sections[section_name].content += line
+                section_lines[section_name].append(line)
+        for section_name, content_lines in section_lines.items():
+            self.Sections[section_name].content = "".join(content_lines)
         self.Sections["LAST_LINE"].content = lines[-1]
         return self.Sections
@@ -0,0 +1,115 @@
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+
+from pytest_fold.clustering import TEMP_PATH_PATTERNS, normalize
+
+# File in a run's directory holding the run's aggregated warnings
+WARNINGSFILE = "warnings.json"
+
+# Affected tests listed per warning in the TUIs; the rest are counted
+TESTS_SHOWN = 50
+
+# A distinct warning: its category, message template (numbers, quoted strings and
+# addresses replaced by placeholders), location, one message as issued, the number
+# of times it was issued, and the ids of the tests issuing it ('' outside tests)
+WarningGroup = namedtuple(
+    "WarningGroup", "category template location example count tests"
+)
+
+
+class WarningCollector:
+    """
+    Aggregates the warnings pytest records (see the 'pytest_warning_recorded' hook)
+    as they are issued: a warning issued any number of times costs one entry plus
+    one per distinct test issuing it, however long pytest's own summary gets.
+    """
+
+    def __init__(self, rootdir: Path = None) -> None:
+        # Locations are shown relative to the rootdir, if under it
+        self.rootdir = str(rootdir) + os.sep if rootdir is not None else None
+        # {(category, template, location): [example, count, {nodeid: None}]}
+        self.groups = {}
+
+    def add(self, warning_message, nodeid: str = "") -> None:
+        category = getattr(
+            warning_message.category, "__name__", str(warning_message.category)
+        )
+        message = str(warning_message.message)
+        filename = str(warning_message.filename)
+        if self.rootdir and filename.startswith(self.rootdir):
+            filename = filename[len(self.rootdir) :]
+        else:
+            filename = normalize(filename, TEMP_PATH_PATTERNS)
+        location = f"{filename}:{warning_message.lineno}"
+        key = (category, normalize(message), location)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = [message, 0, {}]
+        group[1] += 1
+        group[2][nodeid] = None
+
+    def write(self, run_dir: Path) -> None:
+        """
+        Write the aggregated warnings to '<run_dir>/warnings.json'; test ids are
+        stored once, in a table, and referred to by index
+        """
+        nodeids = {}
+        warnings = []
+        for key, (example, count, tests) in self.groups.items():
+            indexes = [nodeids.setdefault(nodeid, len(nodeids)) for nodeid in tests]
+            warnings.append([*key, example, count, indexes])
+        with open(run_dir / WARNINGSFILE, "w") as warnings_file:
+            json.dump({"tests": list(nodeids), "warnings": warnings}, warnings_file)
+
+
+class WarningSummary:
+    """
+    A run's warnings aggregated by category, message template and location, most
+    frequent first. Empty for runs recorded without them (e.g. older runs), in which
+    case the TUIs fall back to pytest's warnings summary text.
+    """
+
+    def __init__(self, run_dir: Path = None, data: dict = None) -> None:
+        # 'data': the contents of a warnings file read elsewhere (e.g. a run bundle)
+        self.groups = []
+        if data is None:
+            path = run_dir / WARNINGSFILE if run_dir is not None else None
+            if path is None or not path.exists():
+                return
+            with open(path) as warnings_file:
+                data = json.load(warnings_file)
+        nodeids = data["tests"]
+        for *fields, tests in data["warnings"]:
+            self.groups.append(
+                WarningGroup(*fields, [nodeids[index] for index in tests])
+            )
+        self.groups.sort(key=lambda group: group.count, reverse=True)
+
+    def __bool__(self) -> bool:
+        return bool(self.groups)
+
+    def views(self, tests_shown: int = TESTS_SHOWN) -> dict:
+        """{warning label: its message, location and affected tests}"""
+        views = {}
+        for group in self.groups:
+            template = group.template.strip().split("\n", 1)[0]
+            label = f"{group.count} x {group.category}: {template}"
+            label = f"{label[:100]}  ({group.location})"
+            tests = [nodeid for nodeid in group.tests if nodeid]
+            lines = [
+                f"{group.category} issued {group.count} times at {group.location}:",
+                f"  {group.example}",
+                "",
+                (
+                    f"{len(tests)} tests affected:"
+                    if tests
+                    else "Issued outside tests (during configuration or collection)"
+                ),
+                *(f"  {nodeid}" for nodeid in tests[:tests_shown]),
+            ]
+            if len(tests) > tests_shown:
+                lines.append(f"  ... {len(tests) - tests_shown} more")
+            views[label] = "\n".join(lines)
+        return views
@@ -47,6 +47,12 @@ setup(
     keywords="pytest testing fold output logs fail pytermtk asciimatics textual single-source",
     entry_points={
         "pytest11": ["pytest_fold = pytest_fold.plugin"],
-        "console_scripts": ["tuitxt = pytest_fold.tui_textual:main", "tuitk = pytest_fold.tui_pytermtk:main"],
+        "console_scripts": [
+            "tuitxt = pytest_fold.tui_textual:main",
+            "tuitk = pytest_fold.tui_pytermtk:main",
+            "foldhistory = pytest_fold.history:main",
+            "foldquery = pytest_fold.query:main",
+            "foldexport = pytest_fold.export:main",
+        ],
     },
 )
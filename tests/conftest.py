@@ -0,0 +1,99 @@
+from functools import partial
+
+import pytest
+
+pytest_plugins = ["pytester"]
+
+# A suite with a test of every outcome, run with --fold to make a stored run
+SUITE = """
+import logging
+import warnings
+
+import pytest
+
+
+@pytest.fixture
+def broken():
+    raise RuntimeError("no database")
+
+
+def test_pass():
+    print("hello from test_pass")
+
+
+def test_fail():
+    logging.getLogger().warning("about to fail")
+    assert 1 == 2
+
+
+def test_error(broken):
+    pass
+
+
+@pytest.mark.slow
+def test_skip():
+    pytest.skip("not today")
+
+
+@pytest.mark.xfail(reason="known bug")
+def test_xfail():
+    assert 0
+
+
+@pytest.mark.slow
+def test_long_output():
+    for line in range(500):
+        print(f"line {line}")
+    warnings.warn("old api", DeprecationWarning)
+"""
+
+
+@pytest.fixture
+def fold_run(pytester, monkeypatch, tmp_path):
+    """
+    A function running pytest with --fold (and any other 'args') over the test
+    modules given as {name: source}, returning the run store holding the run and
+    pytest's result
+    """
+    # Imported here, so that runs of the example tests load the plugin first
+    import pytest_fold.plugin as plugin
+    from pytest_fold import query
+    from pytest_fold.runstore import RunStore
+
+    store = RunStore(tmp_path / "store")
+    monkeypatch.setattr(plugin, "RunStore", partial(RunStore, store.root))
+    monkeypatch.setattr(query, "RunStore", partial(RunStore, store.root))
+    monkeypatch.setattr(plugin, "pyfold_tui", lambda config: None)
+
+    def run(modules: dict, *args):
+        pytester.makepyfile(**modules)
+        result = pytester.runpytest_inprocess(
+            "-p", "pytest_fold.plugin", "--fold", *args
+        )
+        return store, result
+
+    return run
+
+
+@pytest.fixture
+def store(fold_run, tmp_path):
+    """A run store holding a --fold run of SUITE, also written as a bundle"""
+    store, result = fold_run(
+        {"test_suite": SUITE},
+        "--fold-capture-budget=1000",
+        f"--fold-bundle={tmp_path / 'run.zip'}",
+    )
+    result.assert_outcomes(passed=2, failed=1, errors=1, skipped=1, xfailed=1)
+    return store
+
+
+@pytest.fixture
+def run_dir(store):
+    return store.open_run()
+
+
+@pytest.fixture
+def bundle(store, tmp_path):
+    from pytest_fold.bundle import RunBundle
+
+    return RunBundle(tmp_path / "run.zip")
@@ -0,0 +1,53 @@
+import json
+import zipfile
+
+import pytest
+
+from pytest_fold.bundle import MANIFEST, RunBundle
+from pytest_fold.utils import Results
+
+
+def test_bundle_round_trip(run_dir, bundle):
+    from_run, from_bundle = Results(run_dir), Results(bundle=bundle)
+
+    assert len(bundle) == 6
+    assert from_bundle.unmarked_output == from_run.unmarked_output
+    assert {
+        name: section.content for name, section in from_bundle.Sections.items()
+    } == {name: section.content for name, section in from_run.Sections.items()}
+    assert [
+        (test.title, test.nodeid, test.category, test.keywords)
+        for test in from_bundle.test_results
+    ] == [
+        (test.title, test.nodeid, test.category, test.keywords)
+        for test in from_run.test_results
+    ]
+    assert dict(from_bundle.tests_all) == dict(from_run.tests_all)
+    assert from_bundle.warning_summary.groups == from_run.warning_summary.groups
+    assert from_bundle.spill is not None
+
+
+def test_bundled_output_is_read_when_first_used(bundle):
+    reports = list(bundle.reports())
+    assert [report.outcome for report in reports[:3]] == ["passed"] * 3
+    assert not any("longrepr" in report.__dict__ for report in reports)
+
+    fail_call = reports[4]
+    assert fail_call.longreprtext.endswith("AssertionError")
+    assert "about to fail" in fail_call.caplog
+    assert "sections" in fail_call.__dict__
+    # Other tests' output is left unread
+    assert not any("longrepr" in report.__dict__ for report in reports[6:])
+
+
+def test_bundle_format_is_checked(bundle, tmp_path):
+    manifest = json.loads(bundle.zip.read(MANIFEST))
+    manifest["format"] = 1
+    with zipfile.ZipFile(tmp_path / "old.zip", "w") as old:
+        old.writestr(MANIFEST, json.dumps(manifest))
+    with pytest.raises(ValueError, match="bundle format 1"):
+        RunBundle(tmp_path / "old.zip")
+    with zipfile.ZipFile(tmp_path / "other.zip", "w") as other:
+        other.writestr("x", "")
+    with pytest.raises(ValueError, match="not a pytest-fold bundle"):
+        RunBundle(tmp_path / "other.zip")
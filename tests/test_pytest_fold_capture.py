@@ -0,0 +1,92 @@
+import pytest
+
+from pytest_fold.capture import AsyncTerminalCapture, TerminalCapture
+from pytest_fold.utils import MARKERS
+
+# Terminal writes as pytest makes them: lines in fragments, some with markup
+WRITES = [
+    ("=" * 20 + " test session starts " + "=" * 20 + "\n", {"bold": True}),
+    ("test_x.py::test_a ", {}),
+    ("PASSED", {"green": True}),
+    ("\n", {"flush": True}),
+    ("test_x.py::test_b ", {}),
+    ("FAILED", {"red": True}),
+    ("\n", {}),
+    ("\n" + "=" * 20 + " FAILURES " + "=" * 20 + "\n", {"red": True}),
+    ("def test_b():\n>       assert 0\n", {}),
+    ("=" * 20 + " short test summary info " + "=" * 20, {}),
+    ("\nFAILED test_x.py::test_b\n", {}),
+    ("=" * 20 + " 1 failed, 1 passed in 0.12s " + "=" * 20, {}),
+]
+
+
+MARKED_SECTIONS = [
+    MARKERS["pytest_fold_test_session_starts"],
+    MARKERS["pytest_fold_failures_section"],
+    MARKERS["pytest_fold_short_test_summary"],
+    MARKERS["pytest_fold_last_line"],
+]
+
+
+def captured(capture) -> tuple:
+    for s, kwargs in WRITES:
+        capture.write(s, **dict(kwargs))
+    marked, unmarked = capture.close()
+    return marked.decode(), unmarked.decode()
+
+
+def test_async_capture_matches_capture():
+    assert captured(AsyncTerminalCapture(maxsize=2)) == captured(TerminalCapture())
+
+
+def test_async_capture_raises_writer_failure_on_close(monkeypatch):
+    capture = AsyncTerminalCapture(maxsize=2)
+    recorded = []
+
+    def record(s, kwargs):
+        if s == "second\n":
+            raise RuntimeError("disk full")
+        recorded.append(s)
+
+    monkeypatch.setattr(capture, "record", record)
+    capture.write("first\n")
+    capture.write("second\n")
+    # Writes after the failure are consumed, so the test loop never blocks on the
+    # full queue
+    for _ in range(100):
+        capture.write("more\n")
+    with pytest.raises(RuntimeError, match="disk full"):
+        capture.close()
+    assert not capture.thread.is_alive()
+    assert recorded == ["first\n"]
+
+
+def test_capture_assembles_lines_and_marks_sections():
+    marked, unmarked = captured(TerminalCapture())
+
+    markers = set(MARKERS.values())
+    assert [line for line in marked.splitlines() if line in markers] == MARKED_SECTIONS
+    # Each marker precedes the line opening its section
+    lines = marked.splitlines()
+    for marker in MARKED_SECTIONS:
+        assert lines[lines.index(marker) + 1].startswith("==")
+    # Fragments are joined into whole lines; the unmarked file has no markers
+    assert [line for line in lines if line not in markers] == unmarked.splitlines()
+    assert "test_x.py::test_a PASSED" in unmarked.splitlines()
+    # A last line left unfinished is kept, as written
+    assert unmarked.endswith("in 0.12s " + "=" * 20)
+
+
+def test_capture_writes_in_batches():
+    capture = TerminalCapture()
+    capture.chunk_size = 50
+    for s, kwargs in WRITES[:4]:
+        capture.write(s, **dict(kwargs))
+    # The session line filled a batch; the test line is still pending
+    capture.marked_file.seek(0)
+    assert capture.marked_file.read().decode().splitlines() == [
+        MARKERS["pytest_fold_test_session_starts"],
+        "=" * 20 + " test session starts " + "=" * 20,
+    ]
+    marked, _ = capture.close()
+    assert marked.decode().endswith("test_x.py::test_a PASSED\n")
@@ -0,0 +1,35 @@
+import json
+from xml.etree import ElementTree
+
+from pytest_fold import export
+
+
+def test_export_round_trip(run_dir, tmp_path):
+    junitxml, jsonl = tmp_path / "out" / "junit.xml", tmp_path / "out" / "run.jsonl"
+    export.export_run(run_dir, str(junitxml), str(jsonl))
+
+    suite = ElementTree.parse(junitxml).getroot().find("testsuite")
+    assert {name: suite.get(name) for name in ("tests", "failures", "errors")} == {
+        "tests": "6",
+        "failures": "1",
+        "errors": "1",
+    }
+    assert suite.get("skipped") == "2"
+    cases = {case.get("name"): case for case in suite.findall("testcase")}
+    assert cases["test_fail"].get("classname") == "test_suite"
+    assert cases["test_fail"].find("failure").get("message") == "assert 1 == 2"
+    assert "no database" in cases["test_error"].find("error").text
+    assert cases["test_xfail"].find("skipped").get("type") == "pytest.xfail"
+    assert cases["test_pass"].find("system-out").text == "hello from test_pass\n"
+
+    records = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    assert [(record["nodeid"], record["outcome"]) for record in records] == [
+        ("test_suite.py::test_pass", "passed"),
+        ("test_suite.py::test_fail", "failed"),
+        ("test_suite.py::test_error", "error"),
+        ("test_suite.py::test_skip", "skipped"),
+        ("test_suite.py::test_xfail", "xfailed"),
+        ("test_suite.py::test_long_output", "passed"),
+    ]
+    assert records[3]["message"] == "Skipped: not today"
+    assert "about to fail" in records[1]["log"]
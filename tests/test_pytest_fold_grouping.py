@@ -0,0 +1,57 @@
+from pytest_fold.utils import Results
+
+# Two modules whose tests share their names
+API = """
+def test_init():
+    pass
+
+def test_call():
+    assert 0
+"""
+CLI = """
+def test_init():
+    assert 0
+
+def test_call():
+    pass
+"""
+
+
+def test_same_named_tests_are_all_listed(fold_run):
+    store, result = fold_run({"test_api": API, "test_cli": CLI})
+    result.assert_outcomes(passed=2, failed=2)
+    results = Results(store.open_run())
+
+    assert [test.title for test in results.test_results] == [
+        "test_api.py::test_init",
+        "test_api.py::test_call",
+        "test_cli.py::test_init",
+        "test_cli.py::test_call",
+    ]
+    assert sorted(results.tests_failures) == [
+        "test_api.py::test_call",
+        "test_cli.py::test_init",
+    ]
+    assert "assert 0" in results.tests_failures["test_cli.py::test_init"]
+
+    root = results.test_tree.root
+    assert root.size == len(results.durations.totals) == 4
+    assert [
+        (child.name, [(test.nodeid, test.title) for test in child.children()])
+        for child in root.children()
+    ] == [
+        (
+            "test_api.py",
+            [
+                ("test_api.py::test_call", "test_api.py::test_call"),
+                ("test_api.py::test_init", "test_api.py::test_init"),
+            ],
+        ),
+        (
+            "test_cli.py",
+            [
+                ("test_cli.py::test_call", "test_cli.py::test_call"),
+                ("test_cli.py::test_init", "test_cli.py::test_init"),
+            ],
+        ),
+    ]
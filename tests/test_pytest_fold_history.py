@@ -0,0 +1,177 @@
+import pytest
+
+from _pytest.reports import TestReport
+from pytest_fold.history import (
+    RunHistory,
+    format_regression,
+    history_for_run,
+    slower_for_run,
+)
+
+
+def make_reports(nodeid: str, outcome: str = "passed", call: float = 0.1) -> list:
+    """A test's setup, call and teardown reports, its call failing if 'failed'"""
+    location = ("test_x.py", 0, nodeid)
+    longrepr = "assert 0" if outcome == "failed" else None
+    return [
+        TestReport(nodeid, location, {"slow": 1}, "passed", None, "setup"),
+        TestReport(nodeid, location, {}, outcome, longrepr, "call", duration=call),
+        TestReport(nodeid, location, {}, "passed", None, "teardown"),
+    ]
+
+
+def run_reports(outcomes: dict, calls: dict = None) -> list:
+    calls = calls or {}
+    return [
+        report
+        for nodeid, outcome in outcomes.items()
+        for report in make_reports(nodeid, outcome, calls.get(nodeid, 0.1))
+    ]
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = RunHistory(tmp_path / "history.db")
+    yield history
+    history.close()
+
+
+def test_newly_failing_and_passing(history):
+    history.record_run(
+        run_reports({"t::a": "passed", "t::b": "failed", "t::c": "passed"}), "run-1"
+    )
+    history.record_run(
+        run_reports(
+            {"t::a": "failed", "t::b": "passed", "t::c": "passed", "t::d": "failed"}
+        ),
+        "run-2",
+    )
+
+    assert history.newly_failing() == ["t::a", "t::d"]
+    assert history.newly_passing() == ["t::b"]
+    first = history.run_key("run-1")
+    assert history.newly_failing(first) == ["t::b"]
+    assert history.newly_passing(first) == []
+
+    key, run_id, _, total, failing = history.runs()[0]
+    assert (key, run_id, total, failing) == (history.run_key(), "run-2", 4, 2)
+
+
+def test_newly_failing_and_passing_after_a_subset_run(history):
+    history.record_run(
+        run_reports({"t::a": "passed", "t::b": "failed", "t::c": "failed"}), "run-1"
+    )
+    # A run of 't::a' only, e.g. with -k
+    history.record_run(run_reports({"t::a": "failed"}), "run-2")
+    history.record_run(
+        run_reports({"t::a": "failed", "t::b": "failed", "t::c": "passed"}), "run-3"
+    )
+
+    # Each test is compared with the last run that ran it: 't::b' and 't::c' with
+    # run-1, not with run-2
+    assert history.newly_failing() == []
+    assert history.newly_passing() == ["t::c"]
+    assert history.newly_failing(history.run_key("run-2")) == ["t::a"]
+
+
+def test_outcome_history(history):
+    for run_id, outcome in (("run-1", "passed"), ("run-2", "failed")):
+        history.record_run(run_reports({"t::a": outcome}), run_id)
+
+    (latest, latest_outcome, _, tb_hash), (first, first_outcome, _, no_hash) = [
+        (run_id, outcome, call, tb_hash)
+        for run_id, _, outcome, call, tb_hash in history.outcome_history("t::a")
+    ]
+    assert (latest, latest_outcome, first, first_outcome) == (
+        "run-2",
+        "FAILED",
+        "run-1",
+        "PASSED",
+    )
+    assert len(tb_hash) == 16
+    assert no_hash is None
+
+
+def test_tui_queries(tmp_path):
+    path = tmp_path / "history.db"
+    assert history_for_run(path=path) == {}
+
+    history = RunHistory(path)
+    for run_id, outcome in (("run-1", "passed"), ("run-2", "failed")):
+        history.record_run(run_reports({"t::a": outcome}), run_id)
+    history.close()
+
+    found = history_for_run(tmp_path / "runs" / "run-2", path)
+    assert list(found["Newly failing"]) == ["t::a"]
+    assert found["Newly passing"] == {}
+    assert "FAILED" in found["Newly failing"]["t::a"].splitlines()[0]
+    assert history_for_run(tmp_path / "runs" / "unknown", path) == {}
+
+
+def test_slower_than_usual(history):
+    # A steady baseline with a little noise, and a test that is always slow
+    for run in range(6):
+        history.record_run(
+            run_reports(
+                {"t::a": "passed", "t::b": "passed", "t::slow": "passed"},
+                {"t::a": 0.10 + run * 0.001, "t::b": 0.10, "t::slow": 2.0},
+            ),
+            f"run-{run}",
+        )
+    history.record_run(
+        run_reports(
+            {"t::a": "passed", "t::b": "passed", "t::slow": "passed"},
+            # 't::b' is slower, but by less than REGRESSION_MIN_SECONDS
+            {"t::a": 0.5, "t::b": 0.14, "t::slow": 2.0},
+        ),
+        "run-6",
+    )
+
+    slower = history.slower_than_usual()
+    assert list(slower) == ["t::a"]
+    duration, median, mad, runs = slower["t::a"]
+    assert (duration, runs) == (0.5, 6)
+    assert median == pytest.approx(0.1025)
+    assert mad == pytest.approx(0.0015)
+
+    # Too few runs before it to form a baseline
+    assert history.slower_than_usual(min_runs=7) == {}
+    assert history.slower_than_usual(history.run_key("run-3")) == {}
+
+
+def test_slower_than_usual_after_subset_runs(history):
+    for run in range(6):
+        history.record_run(run_reports({"t::a": "passed"}), f"run-{run}")
+    # Runs of other tests only, e.g. with -k
+    for run in range(6, 30):
+        history.record_run(run_reports({"t::b": "passed"}), f"run-{run}")
+    history.record_run(run_reports({"t::a": "passed"}, {"t::a": 1.0}), "run-30")
+
+    assert history.slower_than_usual()["t::a"] == (1.0, 0.1, 0.0, 6)
+    assert history.slower_than_usual(window=3, min_runs=3)["t::a"][3] == 3
+
+
+def test_format_regression():
+    assert format_regression(0.5, 0.25, 0.01, 6) == (
+        "call took 0.500s in this run (+100%); "
+        "usual: median 0.250s, MAD 0.010s over the previous 6 runs"
+    )
+    assert format_regression(0.5, 0.0, 0.0, 6).startswith(
+        "call took 0.500s in this run;"
+    )
+
+
+def test_tui_slower_than_usual(tmp_path):
+    path = tmp_path / "history.db"
+    assert slower_for_run(path=path) == {}
+
+    history = RunHistory(path)
+    for run in range(6):
+        history.record_run(run_reports({"t::a": "passed"}), f"run-{run}")
+    history.record_run(run_reports({"t::a": "passed"}, {"t::a": 1.0}), "run-6")
+    history.close()
+
+    slower = slower_for_run(tmp_path / "runs" / "run-6", path)
+    assert list(slower) == ["t::a"]
+    assert slower["t::a"].startswith("call took 1.000s in this run (+900%)")
+    assert slower_for_run(tmp_path / "runs" / "run-5", path) == {}
@@ -0,0 +1,92 @@
+import pytest
+
+from pytest_fold import utils
+from pytest_fold.keywords import KeywordIndex, bitset, count, set_bits
+
+
+def make_test_info(nodeid: str, category: str, keywords: set) -> utils.TestInfo:
+    name = nodeid.split("::")[-1]
+    return utils.TestInfo(
+        title=name,
+        nodeid=nodeid,
+        category=category,
+        keywords={name, *keywords},
+    )
+
+
+@pytest.fixture
+def keyword_index():
+    return KeywordIndex(
+        [
+            make_test_info("tests/unit/test_a.py::test_read", "PASSED", {"slow"}),
+            make_test_info(
+                "tests/unit/test_a.py::test_write", "FAILED", {"network_io"}
+            ),
+            make_test_info(
+                "tests/e2e/test_b.py::test_sync", "PASSED", {"slow", "Network"}
+            ),
+            make_test_info("tests/e2e/test_b.py::test_quick", "SKIPPED", set()),
+        ]
+    )
+
+
+def selected(index: KeywordIndex, expression: str) -> list:
+    return index.titles_of(index.select(expression))
+
+
+def test_keyword_index_expressions(keyword_index):
+    assert selected(keyword_index, "") == [
+        "test_read",
+        "test_write",
+        "test_sync",
+        "test_quick",
+    ]
+    assert selected(keyword_index, "slow") == ["test_read", "test_sync"]
+    # Case-insensitive substrings of keywords, module paths included
+    assert selected(keyword_index, "NETWORK") == ["test_write", "test_sync"]
+    assert selected(keyword_index, "tests/unit") == ["test_read", "test_write"]
+    assert selected(keyword_index, "slow and not network") == ["test_read"]
+    assert selected(keyword_index, "e2e or write") == [
+        "test_write",
+        "test_sync",
+        "test_quick",
+    ]
+    assert selected(keyword_index, "not (slow or network)") == ["test_quick"]
+    assert selected(keyword_index, "nothing") == []
+
+
+def test_keyword_index_by_outcome(keyword_index):
+    by_outcome = keyword_index.by_outcome(keyword_index.select("slow or network"))
+    assert {category: count(bits) for category, bits in by_outcome.items()} == {
+        "PASSED": 2,
+        "FAILED": 1,
+        "SKIPPED": 0,
+    }
+    assert keyword_index.titles_of(by_outcome["PASSED"], limit=1) == ["test_read"]
+
+
+@pytest.mark.parametrize("expression", ["slow and", "slow(1)", "(slow"])
+def test_keyword_index_rejects_invalid_expressions(keyword_index, expression):
+    with pytest.raises(ValueError):
+        keyword_index.select(expression)
+
+
+def test_bitsets():
+    bits = bitset([0, 3, 64], 70)
+    assert bits == 1 | 1 << 3 | 1 << 64
+    assert set_bits(bits) == [0, 3, 64]
+    assert set_bits(bits, limit=2) == [0, 3]
+    assert count(bits) == 3
+    assert bitset([], 0) == 0
+
+
+def test_keyword_index_covers_same_named_tests(fold_run):
+    module = "def test_init():\n    pass\n"
+    store, _ = fold_run({"test_api": module, "test_cli": module})
+    index = utils.Results(store.open_run()).keyword_index
+
+    assert index.nodeids_of(index.select("init")) == [
+        "test_api.py::test_init",
+        "test_cli.py::test_init",
+    ]
+    assert index.titles_of(index.select("test_cli")) == ["test_cli.py::test_init"]
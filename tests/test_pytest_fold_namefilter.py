@@ -0,0 +1,61 @@
+from pytest_fold import namefilter
+from pytest_fold.namefilter import NameFilter
+
+TITLES = [
+    "test_login_ok",
+    "test_login_bad_password",
+    "TestCart.test_add_item",
+    "TestCart.test_remove_item",
+    "test_logout",
+]
+
+
+def filtered(name_filter: NameFilter, query: str) -> list:
+    name_filter.set_query(query)
+    while not name_filter.advance():
+        pass
+    return name_filter.matching_titles()
+
+
+def brute_force(titles: list, query: str) -> list:
+    return [title for title in titles if namefilter.name_matcher(query)(title.lower())]
+
+
+def test_name_filter_substring_and_fuzzy():
+    name_filter = NameFilter(TITLES)
+    assert filtered(name_filter, "") == TITLES
+    assert filtered(name_filter, "LOGIN") == TITLES[:2]
+    assert filtered(name_filter, "cart.") == TITLES[2:4]
+    # A subsequence within one name, not across names
+    assert filtered(name_filter, "~tlbp") == ["test_login_bad_password"]
+    assert filtered(name_filter, "~okt") == []
+    assert filtered(name_filter, "~") == TITLES
+
+
+def test_name_filter_narrows_and_backspaces(monkeypatch):
+    monkeypatch.setattr(namefilter, "BLOCK_SIZE", 4)
+    titles = [f"test_{index}_{'even' if index % 2 else 'odd'}" for index in range(50)]
+    name_filter = NameFilter(titles)
+
+    for query in ("1", "1_", "1_e", "1_ev", "1_e", "1", "", "~t1e", "~t1ev"):
+        assert filtered(name_filter, query) == brute_force(titles, query)
+    # Backspacing to a completed query shows its matches without filtering
+    for query in ("2", "2_", "2_e", "2_ev"):
+        filtered(name_filter, query)
+    name_filter.set_query("2_e")
+    assert name_filter.done
+    assert name_filter.matching_titles() == brute_force(titles, "2_e")
+
+
+def test_name_filter_continues_within_budget(monkeypatch):
+    monkeypatch.setattr(namefilter, "BLOCK_SIZE", 2)
+    name_filter = NameFilter(TITLES * 10)
+    name_filter.set_query("logout")
+    # No time to filter: one block is scanned per call, and the matches found so
+    # far are shown after each
+    shown = [name_filter.matching_titles()]
+    while not name_filter.advance(budget=0):
+        shown.append(name_filter.matching_titles())
+    assert len(shown) == 1 + len(name_filter.blocks)
+    assert shown == sorted(shown, key=len)
+    assert name_filter.matching_titles() == ["test_logout"] * 10
@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        (["--fold-memory"], "--fold-memory needs --fold"),
+        (["--fold-cprofile=all"], "--fold-cprofile needs --fold"),
+    ],
+)
+def test_options_needing_fold(pytester, args, message):
+    pytester.makepyfile("def test_pass():\n    pass\n")
+    result = pytester.runpytest_inprocess("-p", "pytest_fold.plugin", *args)
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines([f"*{message}*"])
@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import pytest
+
+from pytest_fold.profiling import FoldProfiler
+
+
+def test_profiler_disabled_records_nothing():
+    profiler = FoldProfiler()
+
+    @profiler.profiled("f")
+    def f(x):
+        return x + 1
+
+    with profiler.timer("block"):
+        pass
+    assert f(1) == 2
+    assert profiler.as_dict() == {}
+
+
+def test_profiler_times_blocks_functions_and_coroutines(tmp_path):
+    profiler = FoldProfiler()
+    profiler.enabled = True
+
+    @profiler.profiled("f")
+    def f():
+        pass
+
+    @profiler.profiled("coroutine")
+    async def coroutine():
+        return "done"
+
+    with profiler.timer("block", 10):
+        f()
+    f()
+    profiler.add("added", 0.5, 3)
+    assert asyncio.run(coroutine()) == "done"
+
+    data = profiler.as_dict()
+    assert {name: entry["calls"] for name, entry in data.items()} == {
+        "added": 1,
+        "block": 1,
+        "coroutine": 1,
+        "f": 2,
+    }
+    assert data["block"]["bytes"] == 10
+    assert data["added"] == {"calls": 1, "seconds": 0.5, "bytes": 3}
+
+    # Slowest first, after the header
+    lines = profiler.report_lines()
+    assert lines[1].startswith("added")
+    assert len(lines) == 5
+
+    profiler.write_json(tmp_path / "profile.json")
+    assert json.loads((tmp_path / "profile.json").read_text()) == data
+
+    profiler.reset()
+    assert profiler.as_dict() == {}
+
+
+def test_profiler_records_failing_calls():
+    profiler = FoldProfiler()
+    profiler.enabled = True
+
+    @profiler.profiled("f")
+    def f():
+        raise KeyError
+
+    with pytest.raises(KeyError):
+        f()
+    assert profiler.calls["f"] == 1
@@ -0,0 +1,72 @@
+import pytest
+
+from pytest_fold import query
+
+
+def test_index_selects_and_reads_details(run_dir):
+    with query.RunIndex(run_dir) as index:
+        assert {test.nodeid.split("::")[1]: test.category for test in index.tests} == {
+            "test_pass": "PASSED",
+            "test_fail": "FAILED",
+            "test_error": "ERROR",
+            "test_skip": "SKIPPED",
+            "test_xfail": "XFAIL",
+            "test_long_output": "PASSED",
+        }
+
+        def names(*args, **kwargs):
+            return [
+                index.tests[position].title
+                for position in index.select(*args, **kwargs)
+            ]
+
+        assert names({"FAILED", "ERROR"}) == ["test_fail", "test_error"]
+        assert names(keywords="slow and not skip") == ["test_long_output"]
+        assert names({"PASSED"}, match="pass$") == ["test_pass"]
+        with pytest.raises(ValueError):
+            index.select(match="(")
+
+        details = index.details(index.select({"FAILED"})[0])
+        assert "assert 1 == 2" in details["traceback"]
+        assert details["message"] == "assert 1 == 2"
+        assert "about to fail" in details["caplog"]
+        assert index.details(index.select(match="test_pass")[0])["capstdout"] == (
+            "hello from test_pass\n"
+        )
+        assert index.details(index.select(match="test_skip")[0]) == {
+            "traceback": "",
+            "message": "Skipped: not today",
+            "caplog": "",
+            "capstderr": "",
+            "capstdout": "",
+        }
+    assert index._details_file is None
+
+
+def test_index_of_run_stored_without_one(run_dir):
+    with query.RunIndex(run_dir) as index:
+        tests = index.tests
+        details = [index.details(position) for position in range(len(tests))]
+    (run_dir / query.INDEXFILE).unlink()
+
+    # Read from the pickled reports instead
+    with query.RunIndex(run_dir) as index:
+        assert index.tests == tests
+        assert [index.details(position) for position in range(len(tests))] == details
+
+
+def test_query_commands(run_dir, capsys):
+    query.main(["tests", "-l", "-o", "failed", "-o", "error"])
+    assert capsys.readouterr().out == (
+        "FAILED\ttest_suite.py::test_fail\nERROR\ttest_suite.py::test_error\n"
+    )
+    query.main(["traceback", "-k", "fail"])
+    out = capsys.readouterr().out
+    assert out.startswith("# test_suite.py::test_fail\n")
+    assert "assert 1 == 2" in out
+    query.main(["output", "-m", "test_pass"])
+    assert capsys.readouterr().out == (
+        "# test_suite.py::test_pass\nhello from test_pass\n\n"
+    )
+    query.main(["section", "summary"])
+    assert "FAILED test_suite.py::test_fail" in capsys.readouterr().out
@@ -0,0 +1,77 @@
+from _pytest.reports import TestReport
+from pytest_fold.utils import Results
+
+
+def rerun_reports(nodeid: str, outcome: str) -> dict:
+    name = nodeid.split("::")[1]
+    location = ("test_suite.py", 0, name)
+    return {
+        when: TestReport(nodeid, location, {name: 1}, result, None, when)
+        for when, result in (
+            ("setup", "passed"),
+            ("call", outcome),
+            ("teardown", "passed"),
+        )
+    }
+
+
+def test_merge_rerun_tests(run_dir):
+    results = Results(run_dir)
+    count = len(results.test_results)
+    assert "test_fail" in results.tests_failures
+    assert results.keyword_index.titles_of(results.keyword_index.select("new")) == []
+
+    changed = results.merge_tests(
+        {
+            "test_suite.py::test_fail": rerun_reports(
+                "test_suite.py::test_fail", "passed"
+            ),
+            "test_suite.py::test_new": rerun_reports(
+                "test_suite.py::test_new", "passed"
+            ),
+        }
+    )
+
+    assert changed == {"FAILED", "PASSED"}
+    assert "test_fail" not in results.tests_failures
+    assert results.tests_passes["test_fail"] == ""
+    assert results.tests_all["test_fail"] == ""
+    assert len(results.test_results) == count + 1
+    new = results.test_results[results.positions["test_suite.py::test_new"]]
+    assert (new.title, new.category) == ("test_new", "PASSED")
+    assert results.nodeids_by_title["test_new"] == "test_suite.py::test_new"
+    # Indexes over the tests are built again
+    assert results.keyword_index.titles_of(results.keyword_index.select("new")) == [
+        "test_new"
+    ]
+    assert results.merge_tests({}) == set()
+
+
+def test_merge_rerun_tests_by_nodeid(run_dir):
+    results = Results(run_dir)
+    position = results.positions["test_suite.py::test_fail"]
+
+    # A new test of the same name as one of the run's is told apart by its nodeid
+    results.merge_tests(
+        {"other.py::test_fail": rerun_reports("other.py::test_fail", "passed")}
+    )
+    assert results.tests_passes["other.py::test_fail"] == ""
+    assert results.nodeids_by_title["test_fail"] == "test_suite.py::test_fail"
+    assert "test_fail" in results.tests_failures
+
+    # and a rerun test keeps its title and place
+    results.merge_tests(
+        {
+            "test_suite.py::test_fail": rerun_reports(
+                "test_suite.py::test_fail", "passed"
+            )
+        }
+    )
+    assert results.test_results[position].title == "test_fail"
+    assert results.positions["test_suite.py::test_fail"] == position
+    assert sorted(results.tests_passes) == [
+        "other.py::test_fail",
+        "test_fail",
+        "test_long_output",
+        "test_pass",
+    ]
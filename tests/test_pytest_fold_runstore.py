@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pytest_fold.runstore import LATEST, RunStore, run_started, session_running
+from pytest_fold.utils import REPORTFILE
+
+
+def completed_run(store: RunStore, run_id: str, size: int = 10, used: int = 0):
+    """A run directory as a finished session leaves it, last used at 'used'"""
+    run_dir = store.runs_dir / run_id
+    run_dir.mkdir(parents=True)
+    (run_dir / REPORTFILE.name).write_bytes(b"x" * size)
+    os.utime(run_dir, (used, used))
+    return run_dir
+
+
+def exited_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_create_run_makes_unique_directories(tmp_path):
+    store = RunStore(tmp_path)
+    first, second = store.create_run(), store.create_run()
+    assert first != second
+    assert first.parent == second.parent == tmp_path / "runs"
+    assert first.name.split("-")[2] == str(os.getpid())
+
+
+def test_latest_points_at_the_published_run(tmp_path):
+    store = RunStore(tmp_path)
+    assert store.latest() is None
+    assert store.open_run() is None
+
+    run_dir = store.create_run()
+    # Not completed yet: its report file has not been written
+    assert store.open_run(run_dir.name) is None
+    (run_dir / REPORTFILE.name).write_bytes(b"")
+    store.publish(run_dir)
+
+    assert (tmp_path / LATEST).read_text() == run_dir.name
+    assert store.latest() == run_dir.name
+    assert store.open_run() == run_dir
+    assert not list(tmp_path.glob(".latest-*"))
+
+
+def test_evicts_least_recently_used_runs_beyond_max_runs(tmp_path):
+    store = RunStore(tmp_path, max_runs=2)
+    for used, run_id in enumerate(("20240101-000001-1", "20240101-000002-1")):
+        completed_run(store, run_id, used=1000 + used)
+    # Reopening a run makes it recently used
+    store.open_run("20240101-000001-1")
+    latest = completed_run(store, "20240101-000003-1", used=0)
+    store.publish(latest)
+
+    # The latest run is kept even though it was least recently used
+    assert sorted(run[0] for run in store.runs()) == [
+        "20240101-000001-1",
+        "20240101-000003-1",
+    ]
+
+
+def test_evicts_runs_beyond_max_bytes(tmp_path):
+    store = RunStore(tmp_path, max_runs=0, max_bytes=250)
+    for used in range(3):
+        completed_run(store, f"20240101-00000{used}-1", size=100, used=used)
+    store.publish(store.runs_dir / "20240101-000002-1")
+    assert [run[0] for run in store.runs()] == [
+        "20240101-000001-1",
+        "20240101-000002-1",
+    ]
+
+
+def test_evicts_runs_abandoned_by_exited_sessions(tmp_path):
+    store = RunStore(tmp_path)
+    pid = exited_pid()
+    abandoned = store.runs_dir / f"20240101-000001-{pid}"
+    running = store.runs_dir / f"20240101-000002-{os.getpid()}"
+    later = store.runs_dir / f"20240101-000009-{pid}"
+    for run_dir in (abandoned, running, later):
+        run_dir.mkdir(parents=True)
+    store.publish(completed_run(store, "20240101-000005-1"))
+
+    assert not abandoned.exists()
+    # Still being written, or started after the latest run
+    assert running.exists()
+    assert later.exists()
+
+
+def test_run_started():
+    assert run_started("20240101-000001-12") < run_started("20240101-000002-3-1")
+    assert run_started("not-a-run") == float("inf")
+
+
+@pytest.mark.skipif(os.name != "posix", reason="only known on POSIX systems")
+def test_session_running():
+    assert session_running(f"20240101-000001-{os.getpid()}")
+    assert not session_running(f"20240101-000001-{exited_pid()}")
+    assert not session_running("20240101-000001")
@@ -0,0 +1,94 @@
+import logging
+import pickle
+
+from _pytest.reports import TestReport
+from pytest_fold.spill import (
+    SPILL_LOGGER,
+    CaptureSpill,
+    SpillReader,
+    SpilledText,
+    spill_marker_matcher,
+)
+from pytest_fold.utils import REPORTFILE, merge_reports
+
+LONG_OUTPUT = "".join(f"line {line}\n" for line in range(500))
+
+
+def stored_reports(run_dir) -> dict:
+    with open(run_dir / REPORTFILE.name, "rb") as report_file:
+        return merge_reports(pickle.load(report_file))
+
+
+def test_spilled_output_is_trimmed_and_loaded(run_dir, bundle):
+    phases = stored_reports(run_dir)["test_suite.py::test_long_output"]
+    stdout = dict(phases["call"].sections)["Captured stdout call"]
+    assert len(stdout) <= 1000
+    assert stdout.startswith("line 0\n")
+    assert stdout.endswith("line 499\n")
+    assert spill_marker_matcher.search(stdout)
+    # Later phases' copies of the section are spilled once
+    assert dict(phases["teardown"].sections)["Captured stdout call"] == stdout
+
+    for reader in (
+        SpillReader(lambda: open(run_dir / "spill.bin", "rb")),
+        bundle.spill_reader(),
+    ):
+        text = SpilledText(stdout, reader)
+        loads = 0
+        while text.gap is not None:
+            text.load(size=500)
+            loads += 1
+        assert text.text == LONG_OUTPUT
+        assert loads > 1
+        reader.file.close()
+
+
+def test_capture_spill_keeps_sections_within_budget(tmp_path):
+    spill = CaptureSpill(tmp_path / "spill.bin", budget=1000)
+    short = TestReport("t::a", ("t", 0, "a"), {}, "passed", None, "call")
+    short.sections = [("Captured stdout call", "short\n")]
+    long = TestReport("t::b", ("t", 0, "b"), {}, "passed", None, "call")
+    long.sections = [("Captured stdout call", LONG_OUTPUT)]
+
+    assert spill.trim_test({"call": short}) == [short]
+    (trimmed,) = spill.trim_test({"call": long})
+    spill.close()
+    # The reports pytest sees are left whole
+    assert long.sections == [("Captured stdout call", LONG_OUTPUT)]
+    assert trimmed is not long
+    ((_, content),) = trimmed.sections
+    assert len(content) <= 1000
+    marker = spill_marker_matcher.search(content)
+    size, _, offset = marker.groups()
+    spilled = (tmp_path / "spill.bin").read_bytes()
+    assert (int(size), int(offset)) == (len(spilled), 0)
+    # Its head and tail are kept whole, around the marker's line
+    head, tail = content[: marker.start()], content[marker.end() + 1 :]
+    assert head + spilled.decode() + tail == LONG_OUTPUT
+
+
+def test_capture_spill_keeps_log_records_within_budget(tmp_path):
+    spill = CaptureSpill(tmp_path / "spill.bin", budget=1000)
+    messages = [f"record {number}" for number in range(200)]
+    levels = [logging.INFO] * 200
+    levels[100] = logging.ERROR
+    logs = [[0.0] * 200, levels, ["app"] * 200, messages]
+    report = TestReport("t::a", ("t", 0, "a"), {}, "passed", None, "call")
+    report.pyfold_logs = logs
+
+    (trimmed,) = spill.trim_test({"call": report})
+    spill.close()
+    assert report.pyfold_logs is logs
+    times, levels, loggers, kept = trimmed.pyfold_logs
+    assert sum(map(len, kept)) <= 1000
+    assert (kept[0], kept[-1]) == ("record 0", "record 199")
+    (position,) = [
+        index for index, logger in enumerate(loggers) if logger == SPILL_LOGGER
+    ]
+    assert levels[position] == logging.ERROR
+    size, title, offset = spill_marker_matcher.search(kept[position]).groups()
+    spilled = (tmp_path / "spill.bin").read_text().splitlines()
+    assert (int(size), int(offset)) == ((tmp_path / "spill.bin").stat().st_size, 0)
+    assert title == f"{len(spilled)} log records"
+    assert len(kept) - 1 + len(spilled) == 200
+    assert spilled[0].endswith("  " + messages[position])
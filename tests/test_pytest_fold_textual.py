@@ -0,0 +1,45 @@
+import asyncio
+from types import SimpleNamespace
+
+from rich.text import Text
+
+from pytest_fold.tui_textual import FoldApp
+
+
+class ClickedApp:
+    """The parts of a FoldApp that clicking a tree node uses"""
+
+    handle_tree_click = FoldApp.handle_tree_click
+
+    def __init__(self) -> None:
+        self.test_results = SimpleNamespace(unmarked_output="full output")
+        self.rerun_args = []
+        self.shown = None
+
+    async def show_test_text(self, text: str) -> None:
+        self.shown = text
+
+
+def click(app: ClickedApp, label: str, data: dict) -> str:
+    node = SimpleNamespace(label=Text(label), data=data)
+    asyncio.run(app.handle_tree_click(SimpleNamespace(node=node)))
+    return app.shown
+
+
+def test_tree_clicks_dispatch_on_node_data():
+    app = ClickedApp()
+    assert click(app, "Full Output", {"full_output": True}) == "full output"
+    assert click(app, "Summary", {"text": "session starts"}) == "session starts"
+    # A view tree's entry of the same label as the Summary tree
+    views = {"Summary": "slowest tests", "Full Output of x": "y"}
+    assert click(app, "Summary", {"results": views}) == "slowest tests"
+    assert click(app, "Full Output of x", {"results": views}) == "y"
+    assert app.rerun_args == []
+
+    tests = {"test_a": "output of test_a"}
+    assert click(app, "test_a", {"results": tests, "nodeid": "t.py::test_a"}) == (
+        "output of test_a"
+    )
+    assert app.rerun_args == ["t.py::test_a"]
+    # Headers are ignored
+    assert click(app, "Durations:", {}) == "output of test_a"
@@ -0,0 +1,65 @@
+import warnings
+from pathlib import Path
+
+from pytest_fold.warningsummary import WARNINGSFILE, WarningCollector, WarningSummary
+
+
+def warning_message(message: str, category=UserWarning, filename=None, lineno=10):
+    return warnings.WarningMessage(
+        message, category, filename or "/src/project/pkg/mod.py", lineno
+    )
+
+
+def test_warnings_are_aggregated_by_template_and_location(tmp_path):
+    collector = WarningCollector(Path("/src/project"))
+    for index in range(3):
+        for number in range(100):
+            collector.add(
+                warning_message(f"value {number} is deprecated"), f"t::test_{index}"
+            )
+    collector.add(warning_message("value 1 is deprecated", lineno=20), "t::test_0")
+    collector.add(warning_message("config", DeprecationWarning, "/usr/lib/x.py"))
+    collector.write(tmp_path)
+
+    summary = WarningSummary(tmp_path)
+    assert [
+        (group.category, group.location, group.count, group.tests)
+        for group in summary.groups
+    ] == [
+        ("UserWarning", "pkg/mod.py:10", 300, ["t::test_0", "t::test_1", "t::test_2"]),
+        ("UserWarning", "pkg/mod.py:20", 1, ["t::test_0"]),
+        ("DeprecationWarning", "/usr/lib/x.py:10", 1, [""]),
+    ]
+    assert summary.groups[0].example == "value 0 is deprecated"
+    assert summary.groups[0].template != summary.groups[0].example
+
+
+def test_warnings_summary_views(tmp_path):
+    collector = WarningCollector(tmp_path)
+    for index in range(5):
+        collector.add(warning_message("slow path"), f"t::test_{index}")
+    collector.add(warning_message("at import"))
+    collector.write(tmp_path)
+
+    views = WarningSummary(tmp_path).views(tests_shown=2)
+    (label, text), (_, outside_tests) = views.items()
+    assert label.startswith("5 x UserWarning: slow path")
+    assert text.splitlines()[3:] == [
+        "5 tests affected:",
+        "  t::test_0",
+        "  t::test_1",
+        "  ... 3 more",
+    ]
+    assert "Issued outside tests" in outside_tests
+
+
+def test_warnings_summary_without_warnings_file(tmp_path):
+    assert not WarningSummary(tmp_path)
+    assert not WarningSummary()
+    assert not (tmp_path / WARNINGSFILE).exists()
+
+
+def test_warnings_summary_from_data():
+    data = {"tests": ["t::a"], "warnings": [["W", "m", "f.py:1", "m", 2, [0]]]}
+    (group,) = WarningSummary(data=data).groups
+    assert (group.count, group.tests) == (2, ["t::a"])
@@ -0,0 +1,94 @@
+import pickle
+import random
+
+import pytest
+
+from _pytest.reports import TestReport
+from pytest_fold.utils import merge_reports, report_category
+
+WORKERS = 64
+TESTS_PER_WORKER = 50
+
+# (category, [(when, outcome, wasxfail), ...]) for each kind of test result
+PHASES = {
+    "PASSED": [
+        ("setup", "passed", False),
+        ("call", "passed", False),
+        ("teardown", "passed", False),
+    ],
+    "FAILED": [
+        ("setup", "passed", False),
+        ("call", "failed", False),
+        ("teardown", "passed", False),
+    ],
+    "ERROR": [("setup", "failed", False), ("teardown", "passed", False)],
+    "SKIPPED": [("setup", "skipped", False), ("teardown", "passed", False)],
+    "XFAIL": [
+        ("setup", "passed", False),
+        ("call", "skipped", True),
+        ("teardown", "passed", False),
+    ],
+    "XPASS": [
+        ("setup", "passed", False),
+        ("call", "passed", True),
+        ("teardown", "passed", False),
+    ],
+}
+
+
+def make_reports(nodeid: str, category: str, worker: str) -> list:
+    reports = []
+    for when, outcome, wasxfail in PHASES[category]:
+        report = TestReport(nodeid, ("test_x.py", 0, nodeid), {}, outcome, None, when)
+        if wasxfail:
+            report.wasxfail = "reason"
+        report.worker_id = worker
+        reports.append(report)
+    return reports
+
+
+@pytest.fixture
+def xdist_run():
+    """Reports from many workers, interleaved as they would arrive at the controller"""
+    rng = random.Random(1234)
+    expected = {}
+    per_worker = []
+    for worker in range(WORKERS):
+        stream = []
+        for index in range(TESTS_PER_WORKER):
+            nodeid = f"test_x.py::test_{worker}_{index}"
+            expected[nodeid] = rng.choice(list(PHASES))
+            stream.extend(make_reports(nodeid, expected[nodeid], f"gw{worker}"))
+        per_worker.append(stream)
+
+    arrived = []
+    while any(per_worker):
+        stream = rng.choice([s for s in per_worker if s])
+        arrived.append(stream.pop(0))
+    # Pytest re-reports some phases in its terminal summaries
+    arrived.extend(rng.sample(arrived, len(arrived) // 10))
+    return expected, arrived
+
+
+def test_merge_reports_from_many_workers(xdist_run):
+    expected, arrived = xdist_run
+    merged = merge_reports(arrived)
+
+    assert set(merged) == set(expected)
+    for nodeid, phases in merged.items():
+        assert [when for when, _, _ in PHASES[expected[nodeid]]] == sorted(
+            phases, key=("setup", "call", "teardown").index
+        )
+        assert report_category(phases) == expected[nodeid]
+        assert {report.worker_id for report in phases.values()} == {
+            f"gw{nodeid.split('_')[2]}"
+        }
+
+
+def test_merged_reports_survive_pickling(xdist_run):
+    expected, arrived = xdist_run
+    merged = merge_reports(pickle.loads(pickle.dumps(arrived)))
+
+    assert {
+        nodeid: report_category(phases) for nodeid, phases in merged.items()
+    } == expected